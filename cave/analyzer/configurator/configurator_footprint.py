@@ -7,6 +7,8 @@ from bokeh.plotting import show
 
 from cave.analyzer.base_analyzer import BaseAnalyzer
 from cave.plot.configurator_footprint import ConfiguratorFootprintPlotter
+from cave.reader.scenario_cache import ScenarioCache
+from cave.utils.surrogate_backend import get_backend_from_options
 
 
 class ConfiguratorFootprint(BaseAnalyzer):
@@ -84,7 +86,7 @@ class ConfiguratorFootprint(BaseAnalyzer):
         self.final_incumbent = min(incumbents, key=incumbents.get)
 
         if self.scenario.feature_array is None:
-            self.scenario.feature_array = np.array([[]])
+            self.scenario = ScenarioCache.derive(self.scenario, feature_array=np.array([[]]))
 
         self.cfp = ConfiguratorFootprintPlotter(
                        scenario=self.scenario,
@@ -96,7 +98,8 @@ class ConfiguratorFootprint(BaseAnalyzer):
                        use_timeslider=self.use_timeslider and self.num_quantiles > 1,
                        num_quantiles=self.num_quantiles,
                        timeslider_log=self.timeslider_log,
-                       output_dir=self.output_dir)
+                       output_dir=self.output_dir,
+                       backend=get_backend_from_options(self.runscontainer.analyzing_options))
 
     def get_name(self):
         return "Configurator Footprint"
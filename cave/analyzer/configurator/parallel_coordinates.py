@@ -9,13 +9,17 @@ from bokeh.embed import components
 from bokeh.layouts import column
 from bokeh.models import Div
 from bokeh.palettes import Viridis256
+from smac.configspace import convert_configurations_to_array
 from smac.runhistory.runhistory import RunHistory
 from smac.scenario.scenario import Scenario
+from smac.tae.execute_ta_run import StatusType
 from smac.utils.validate import Validator
 
 from cave.analyzer.base_analyzer import BaseAnalyzer
 from cave.plot.parallel_plot.parallel_plot import parallel_plot
 from cave.utils.hpbandster_helpers import format_budgets
+from cave.utils.prediction_cache import PredictionCache, validate_epm
+from cave.utils.representative_instances import RepresentativeInstances
 from cave.utils.timing import timing
 
 __author__ = "Joshua Marben"
@@ -45,6 +49,7 @@ class ParallelCoordinates(BaseAnalyzer):
                  params: Union[int, List[str]]=None,
                  n_configs: int=None,
                  max_runs_epm: int=None,
+                 epm_memory_limit: float=None,
                  ):
         """This function prepares the data from a SMAC-related format (using runhistories and parameters) to a more
         general format (using a dataframe). The resulting dataframe is passed to the parallel_coordinates-routine
@@ -59,17 +64,23 @@ class ParallelCoordinates(BaseAnalyzer):
         pc_sort_by: str
             defines the pimp-method by which to choose the plotted parameters
         max_runs_epm: int
-            maximum number of runs to train the epm with. this should prevent MemoryErrors
+            maximum number of runs estimated by the epm (configurations times instances), configurations are dropped
+            to meet it (default and incumbent are always kept). this should prevent MemoryErrors, -1 for no limit
+        epm_memory_limit: float
+            additional bound, memory budget in MB for estimating the costs of the configurations with the epm, the
+            configurations and instances are predicted in tiles that fit into it
         """
         super().__init__(runscontainer,
                          pc_sort_by=pc_sort_by,
                          params=params,
                          n_configs=n_configs,
-                         max_runs_epm=max_runs_epm)
+                         max_runs_epm=max_runs_epm,
+                         epm_memory_limit=epm_memory_limit)
 
         self.params = self.options.getint('params')
         self.n_configs = self.options.getint('n_configs')
         self.max_runs_epm = self.options.getint('max_runs_epm')
+        self.epm_memory_limit = self.options.getfloat('epm_memory_limit')
         self.pc_sort_by = self.options['pc_sort_by']
 
         self.data = None  # save data here so bokeh-plots can be recreated fast.
@@ -181,9 +192,9 @@ class ParallelCoordinates(BaseAnalyzer):
 
         # Define set of configurations (limiting to max and choosing most interesting ones)
         all_configs = original_rh.get_all_configs()
-        # max_runs_epm is the maximum total number of runs considered for epm to limit maximum possible number configs
+        # max_runs_epm is the maximum total number of runs estimated by the epm (if positive), limiting the configs
         max_configs = int(self.max_runs_epm / (len(scenario.train_insts) + len(scenario.test_insts)))
-        if len(all_configs) > max_configs:
+        if self.max_runs_epm > 0 and len(all_configs) > max_configs:
             self.logger.debug("Limiting number of configs to train epm from %d to %d (based on max runs %d) and "
                               "choosing the ones with the most runs (for parallel coordinates)",
                               len(all_configs), max_configs, self.max_runs_epm)
@@ -196,11 +207,14 @@ class ParallelCoordinates(BaseAnalyzer):
                 all_configs.append(incumbent)
 
         # Get costs for those configurations
-        epm_rh = RunHistory()
-        epm_rh.update(validated_rh)
-        if scenario.feature_dict:  # if instances are available
-            epm_rh.update(timing(validator.validate_epm)(all_configs, 'train+test', 1, runhistory=validated_rh))
-        config_to_cost = OrderedDict({c: epm_rh.get_cost(c) for c in all_configs})
+        if scenario.feature_dict and validator.epm is not None:  # if instances are available
+            config_to_cost = self._estimate_costs(all_configs, validated_rh, validator, scenario)
+        else:
+            epm_rh = RunHistory()
+            epm_rh.update(validated_rh)
+            if scenario.feature_dict:
+                epm_rh.update(timing(validate_epm)(validator, all_configs, 'train+test', 1, runhistory=validated_rh))
+            config_to_cost = OrderedDict({c: epm_rh.get_cost(c) for c in all_configs})
 
         data = OrderedDict()
         data['cost'] = list(config_to_cost.values())
@@ -210,6 +224,64 @@ class ParallelCoordinates(BaseAnalyzer):
         df = pd.DataFrame(data=data)
         return df
 
+    def _estimate_costs(self, configs, validated_rh, validator, scenario):
+        """Average cost of the configurations, like the cost of a runhistory with the validated runs and epm-estimates
+        of all other pairs of configuration and train- or test-instance (see `RunHistory.get_cost`): every
+        instance-seed-pair of the validated runs counts once (on its highest budget, capped runs are ignored) and
+        instances without a properly executed run (not crashed, aborted or capped) are estimated with the validator's
+        epm. The marginal predictions over all instances go through the `PredictionCache` and are computed in tiles
+        that fit into `epm_memory_limit` (see `predict_marginalized`), the predictions of properly observed pairs are
+        subtracted afterwards. If [EPM][representative_instances] is set, the marginalization is approximated by
+        representative instances.
+
+        Returns
+        -------
+        config_to_cost: OrderedDict[Configuration, float]
+            average cost per configuration
+        """
+        instances = sorted(set(validator._get_instances('train+test')))
+        inst_to_idx = {inst: idx for idx, inst in enumerate(instances)}
+        id_to_row = {validated_rh.config_ids[c]: row for row, c in enumerate(configs) if c in validated_rh.config_ids}
+        runs = {}       # (config-row, instance, seed) -> (budget, cost)
+        proper = set()  # (config-row, instance-index) with a properly executed run
+        for k, v in validated_rh.data.items():
+            row = id_to_row.get(k.config_id)
+            if row is None or v.status == StatusType.CAPPED:
+                continue
+            key = (row, k.instance_id, k.seed)
+            if key not in runs or k.budget > runs[key][0]:
+                runs[key] = (k.budget, v.cost)
+            if k.instance_id in inst_to_idx and v.status not in [StatusType.CRASHED, StatusType.ABORT]:
+                proper.add((row, inst_to_idx[k.instance_id]))
+        observed_sum, n_observed = np.zeros(len(configs)), np.zeros(len(configs))
+        for (row, _, _), (_, cost) in runs.items():
+            observed_sum[row] += cost
+            n_observed[row] += 1
+
+        vectors = convert_configurations_to_array(configs)
+        features = np.array([scenario.feature_dict[inst] for inst in instances])
+        n_jobs = self.runscontainer.n_jobs
+        n_representatives = self.runscontainer.analyzing_options['EPM'].getint('representative_instances')
+        if n_representatives > 0:
+            representatives = RepresentativeInstances.from_features(instances, features, n_representatives)
+            mean, _ = timing(representatives.predict_marginalized)(validator.epm, vectors,
+                                                                   memory_limit=self.epm_memory_limit, n_jobs=n_jobs)
+            representatives.estimate_error(validator.epm, vectors, purpose=self.name,
+                                           memory_limit=self.epm_memory_limit, n_jobs=n_jobs)
+        else:
+            mean, _ = timing(PredictionCache.predict_marginalized)(validator.epm, vectors, features,
+                                                                   memory_limit=self.epm_memory_limit, n_jobs=n_jobs)
+        estimated_sum = mean[:, 0] * len(instances)
+        n_estimated = np.full(len(configs), float(len(instances)))
+        if proper:
+            rows, cols = np.array(sorted(proper)).T
+            predicted, _ = PredictionCache.predict(validator.epm, vectors[rows], [instances[c] for c in cols],
+                                                   scenario.feature_dict)
+            np.add.at(estimated_sum, rows, -predicted[:, 0])
+            np.add.at(n_estimated, rows, -1)
+        costs = (observed_sum + estimated_sum) / (n_observed + n_estimated)
+        return OrderedDict(zip(configs, costs.tolist()))
+
     def _plot_budget(self, df):
         limits = OrderedDict([('cost', {'lower': df['cost'].min(),
                                         'upper': df['cost'].max()})])
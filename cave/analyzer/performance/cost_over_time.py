@@ -13,7 +13,6 @@ from bokeh.models.sources import CDSView
 from bokeh.palettes import Dark2_5
 from bokeh.plotting import figure, ColumnDataSource, show
 from smac.configspace import convert_configurations_to_array
-from smac.epm.rf_with_instances import RandomForestWithInstances
 from smac.epm.util_funcs import get_types
 from smac.runhistory.runhistory import RunHistory, RunKey
 from smac.runhistory.runhistory2epm import RunHistory2EPM4Cost
@@ -25,6 +24,10 @@ from cave.reader.runs_container import RunsContainer
 from cave.utils.bokeh_routines import get_checkbox
 from cave.utils.hpbandster_helpers import get_incumbent_trajectory, format_budgets
 from cave.utils.io import export_bokeh
+from cave.utils.model_registry import ModelRegistry
+from cave.utils.prediction_cache import PredictionCache
+from cave.utils.representative_instances import RepresentativeInstances
+from cave.utils.surrogate_backend import get_backend_from_options
 
 Line = namedtuple('Line', ['name', 'time', 'mean', 'upper', 'lower', 'config'])
 
@@ -127,15 +130,24 @@ class CostOverTime(BaseAnalyzer):
                 self.logger.debug("Training model with data of shape X: %s, y: %s", str(X.shape), str(y.shape))
 
                 types, bounds = get_types(self.scenario.cs, self.scenario.feature_array)
-                epm = RandomForestWithInstances(self.scenario.cs,
-                                                types=types,
-                                                bounds=bounds,
-                                                seed=self.rng.randint(MAXINT),
-                                                instance_features=self.scenario.feature_array,
-                                                ratio_features=1.0)
-                epm.train(X, y)
+                epm = ModelRegistry.get_forest(self.scenario.cs,
+                                               types=types,
+                                               bounds=bounds,
+                                               X=X,
+                                               y=y,
+                                               seed=self.rng.randint(MAXINT),
+                                               instance_features=self.scenario.feature_array,
+                                               purpose='cost over time',
+                                               backend=get_backend_from_options(self.runscontainer.analyzing_options),
+                                               ratio_features=1.0)
             config_array = convert_configurations_to_array(configs)
-            mean, var = epm.predict_marginalized_over_instances(config_array)
+            n_representatives = self.runscontainer.analyzing_options['EPM'].getint('representative_instances')
+            if n_representatives > 0 and self.scenario.feature_dict:
+                representatives = RepresentativeInstances.from_scenario(self.scenario, n_representatives)
+                mean, var = representatives.predict_marginalized(epm, config_array, n_jobs=self.runscontainer.n_jobs)
+                representatives.estimate_error(epm, config_array, purpose=self.name, n_jobs=self.runscontainer.n_jobs)
+            else:
+                mean, var = PredictionCache.predict_marginalized(epm, config_array)
             var = np.zeros(mean.shape)
             # We don't want to show the uncertainty of the model but uncertainty over multiple optimizer runs
             # This variance is computed in an outer loop.
@@ -5,6 +5,7 @@ import numpy as np
 from ConfigSpace.hyperparameters import NumericalHyperparameter, CategoricalHyperparameter, OrdinalHyperparameter, \
     Constant
 from pandas import DataFrame
+from smac.runhistory.runhistory import DataOrigin
 
 from cave.analyzer.base_analyzer import BaseAnalyzer
 from cave.utils.helpers import get_config_origin
@@ -104,9 +105,11 @@ class OverviewTable(BaseAnalyzer):
         general['----------'] = '----------'
 
         combined_run = self.runscontainer.get_aggregated(False, False)[0]
-        combined_stats = self._stats_for_run(combined_run.original_runhistory,
+        combined_stats = self._stats_for_run(combined_run.run_store,
                                              combined_run.scenario,
-                                             combined_run.incumbent)
+                                             combined_run.incumbent,
+                                             runs_per_config=self.runscontainer.get_metadata().get_runs_per_config(
+                                                 len(combined_run.run_store.configs)))
         for k, v in combined_stats.items():
             general[k] = v
 
@@ -134,30 +137,41 @@ class OverviewTable(BaseAnalyzer):
                                  run.reduced_to_budgets)
             self.logger.debug("Path to folder for run no. {}: {}".format(idx, str(run.path_to_folder)))
             name = os.path.basename(run.path_to_folder) if identify == 'parallel' else str(run.reduced_to_budgets[0])
-            runspec[name] = self._stats_for_run(run.original_runhistory,
+            runspec[name] = self._stats_for_run(run.run_store,
                                                 run.scenario,
                                                 run.incumbent)
         return runspec
 
-    def _stats_for_run(self, rh, scenario, incumbent):
+    def _stats_for_run(self, run_store, scenario, incumbent, runs_per_config=None):
+        """
+        runs_per_config can be passed, if already known (e.g. from the container's metadata for the combined run)
+        """
         result = OrderedDict()
 
-        all_configs = rh.get_all_configs()
+        # Only consider the original runs of the configurator
+        indices = run_store.select(origins=[DataOrigin.INTERNAL])
+        all_configs = run_store.get_all_configs(indices)
         default = scenario.cs.get_default_configuration()
 
         # Runtime statistics
-        all_ta_runtimes = [run_value.time for run_value in rh.data.values()]
+        all_ta_runtimes = run_store.time[indices]
         result['Total time spent evaluating configurations'] = "{:.2f} sec".format(np.sum(all_ta_runtimes))
         result['Average time per configuration (mean / std)'] = '{:5.2f} sec (± {:5.2f})'.format(np.mean(all_ta_runtimes),
                                                                                                  np.std(all_ta_runtimes))
 
         # Number of evaluations
-        ta_evals = [len(rh.get_runs_for_config(c, only_max_observed_budget=True)) for c in all_configs]
+        if runs_per_config is None:
+            runs_per_config = run_store.count_runs_per_config(only_max_observed_budget=True, indices=indices)
+        ta_evals = runs_per_config[run_store.get_config_indices(indices)]
+
+        def n_runs(config):
+            config_idx = run_store.configs.index(config)
+            return runs_per_config[config_idx] if config_idx is not None else 0
+
         result['# evaluated configurations'] = len(all_configs)
         if not scenario.deterministic:
             result['# evaluations in total'] = np.sum(ta_evals)
-            result['# evaluations for default/incumbent'] = "{}/{}".format(len(rh.get_runs_for_config(default, only_max_observed_budget=True)),
-                                                                           len(rh.get_runs_for_config(incumbent, only_max_observed_budget=True)))
+            result['# evaluations for default/incumbent'] = "{}/{}".format(n_runs(default), n_runs(incumbent))
             result['# runs per configuration (min, mean and max)'] = "{}/{:.2f}/{}".format(
                             np.min(ta_evals), np.mean(ta_evals), np.max(ta_evals))
         # Info about configurations
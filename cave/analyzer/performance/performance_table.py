@@ -7,6 +7,7 @@ from smac.runhistory.runhistory import RunHistory
 from smac.scenario.scenario import Scenario
 
 from cave.analyzer.base_analyzer import BaseAnalyzer
+from cave.reader.run_store import RunStore
 from cave.utils.helpers import get_cost_dict_for_config, get_timeout, combine_runhistories
 from cave.utils.hpbandster_helpers import format_budgets
 from cave.utils.statistical_tests import paired_permutation, paired_t_student
@@ -297,15 +298,7 @@ class PerformanceTable(BaseAnalyzer):
         if isinstance(rh, list):
             rh = combine_runhistories(rh)
         self.logger.debug("Calculating oracle performance")
-        oracle = {}
-        for c in rh.get_all_configs():
-            costs = get_cost_dict_for_config(rh, c)
-            for i in costs.keys():
-                if i not in oracle:
-                    oracle[i] = costs[i]
-                elif oracle[i] > costs[i]:
-                    oracle[i] = costs[i]
-        return oracle
+        return RunStore.from_runhistory(rh).get_oracle()
 
     @timing
     def _permutation_test(self, epm_rh, default, incumbent, num_permutations, par=1):
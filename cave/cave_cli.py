@@ -16,6 +16,7 @@ matplotlib.use('agg')  # noqa
 from pimp.utils.io.cmd_reader import SmartArgsDefHelpFormatter
 
 from cave.cavefacade import CAVE
+from cave.utils.surrogate_backend import get_backend_names
 from cave.__version__ import __version__ as v
 
 __author__ = "Joshua Marben"
@@ -126,6 +127,41 @@ class CaveCLI(object):
                                help="what format the validation-files are in",
                                choices=['SMAC2', 'SMAC3', 'CSV', 'NONE'],
                                type=str.upper)
+        cave_opts.add_argument("--n_jobs",
+                               default=1,
+                               type=int,
+                               help="number of processes used to read in the configurator-folders in parallel. "
+                                    "-1 uses all available cores. ")
+        cave_opts.add_argument("--cache_dir",
+                               default=None,
+                               help="directory for a persistent cache of the read (and converted) input-data. "
+                                    "folders that did not change since the last invocation are loaded from the "
+                                    "cache. should not be inside the output-directory. ")
+        cave_opts.add_argument("--save_converted",
+                               action='store_true',
+                               help="save input-data that needs to be converted (BOHB, CSV, APT) in SMAC3-format to "
+                                    "the output-directory. by default, converted data is only kept in memory. ")
+        cave_opts.add_argument("--cache_memory_limit",
+                               default=2048,
+                               type=float,
+                               help="memory budget (in MB) for the cache of aggregated and budget-reduced runs that "
+                                    "is shared by all analyzers. least recently used runs are evicted first. ")
+        cave_opts.add_argument("--run_store_backend",
+                               default='memory',
+                               choices=['memory', 'sqlite'],
+                               help="where to keep the runs of all folders. 'sqlite' streams them into a SQLite-file "
+                                    "in the output-directory without creating runhistories and keeps them there, "
+                                    "metadata, run-counts and costs are computed by queries (folders are then read "
+                                    "sequentially). runhistories are created from the file when an analysis needs "
+                                    "them. ")
+        cave_opts.add_argument("--watch",
+                               nargs='?',
+                               const=60,
+                               default=None,
+                               type=float,
+                               help="keep watching the folders while the configurator is still running. new runs and "
+                                    "trajectory-entries are read every WATCH seconds (default 60) and the report-"
+                                    "sections that depend on them are updated. only SMAC3 and BOHB. ")
         cave_opts.add_argument("--ta_exec_dir",
                                default='.',
                                help="path to the execution-directory of the configurator run. this is the path from "
@@ -178,6 +214,23 @@ class CaveCLI(object):
                              default="all", type=str.lower,
                              choices=['fanova', 'lpi', 'ablation', 'forward_selection', 'all'])
 
+        epm_opts = parser.add_argument_group("EPM", "Fine-tune the empirical performance models (epm)")
+        epm_opts.add_argument("--epm_representative_instances",
+                              help="approximate marginalizing epm-predictions over instances by this many "
+                                   "representative instances (clusters of the instance-features), for scenarios with "
+                                   "many instances. The error of the approximation is shown in the report. "
+                                   "-1 -> use all instances. ",
+                              default=-1, type=int)
+        epm_opts.add_argument("--epm_backend",
+                              help="surrogate models trained by CAVE (for epm-validation, imputation, cost over time "
+                                   "and configurator footprint), from the registered backends (see "
+                                   "`register_backend`). ",
+                              default="smac", type=str.lower, choices=get_backend_names())
+        epm_opts.add_argument("--epm_profile",
+                              help="profile of the surrogate models, 'fast' uses fewer and shallower trees for quick "
+                                   "previews. ",
+                              default="default", type=str.lower, choices=["default", "fast"])
+
         cot_opts = parser.add_argument_group("Cost Over Time", "Fine-tune the cost over time plot")
         cot_opts.add_argument("--cot_inc_traj",
                               help="if the optimizer belongs to HpBandSter (e.g. bohb), you can choose how the "
@@ -243,6 +296,12 @@ class CaveCLI(object):
         validation_format = args_.validation_format
         validation = args_.validation
         seed = args_.seed
+        n_jobs = args_.n_jobs
+        cache_dir = args_.cache_dir
+        save_converted = args_.save_converted
+        cache_memory_limit = args_.cache_memory_limit
+        run_store_backend = args_.run_store_backend
+        watch_interval = args_.watch
         verbose_level = args_.verbose_level
         show_jupyter = args_.jupyter == 'on'
 
@@ -272,6 +331,9 @@ class CaveCLI(object):
         analyzing_options["Parallel Coordinates"]["pc_sort_by"] = str(args_.pc_sort_by)
         analyzing_options["Parameter Importance"]["whisker_quantiles_plot"] = str(args_.pimp_whiskers)
         analyzing_options["Parameter Importance"]["interactive_bokeh_plots"] = str(args_.pimp_interactive)
+        analyzing_options["EPM"]["representative_instances"] = str(args_.epm_representative_instances)
+        analyzing_options["EPM"]["surrogate_backend"] = str(args_.epm_backend)
+        analyzing_options["EPM"]["surrogate_profile"] = str(args_.epm_profile)
 
         # Initialize CAVE
         cave = CAVE(folders,
@@ -284,6 +346,11 @@ class CaveCLI(object):
                     seed=seed,
                     verbose_level=verbose_level,
                     analyzing_options=analyzing_options,
+                    n_jobs=n_jobs,
+                    cache_dir=cache_dir,
+                    save_converted=save_converted,
+                    cache_memory_limit=cache_memory_limit,
+                    run_store_backend=run_store_backend,
                     )
 
         # Check if CAVE was successfully initialized
@@ -294,7 +361,10 @@ class CaveCLI(object):
             logging.getLogger().debug("CAVE is called with arguments: " + str(args_))
 
         # Analyze (with options defined in initialization via the analyzing_options
-        cave.analyze()
+        if watch_interval is not None:
+            cave.watch(interval=watch_interval)
+        else:
+            cave.analyze()
 
 
     def _check_deprecated(self, args_):
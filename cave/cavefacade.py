@@ -2,6 +2,7 @@ import logging
 import os
 import shutil
 import tempfile
+import time
 import typing
 from collections import OrderedDict
 from functools import wraps
@@ -9,6 +10,7 @@ from importlib import reload
 from typing import Union, List
 
 import numpy as np
+import pandas as pd
 
 from cave.__version__ import __version__ as cave_version
 from cave.analyzer.apt.apt_overview import APTOverview
@@ -38,6 +40,9 @@ from cave.html.html_builder import HTMLBuilder
 from cave.reader.runs_container import RunsContainer
 from cave.utils.exceptions import Deactivated, NotApplicable
 from cave.utils.helpers import load_default_options
+from cave.utils.model_registry import ModelRegistry
+from cave.utils.prediction_cache import PredictionCache
+from cave.utils.representative_instances import RepresentativeInstances
 from cave.utils.timing import timing
 
 __author__ = "Joshua Marben"
@@ -90,6 +95,11 @@ class CAVE(object):
                  show_jupyter: bool=True,
                  verbose_level: str='OFF',
                  analyzing_options=None,
+                 n_jobs: int=1,
+                 cache_dir: str=None,
+                 save_converted: bool=False,
+                 cache_memory_limit: float=2048,
+                 run_store_backend: str='memory',
                  **kwargs
                  ):
         """
@@ -119,6 +129,21 @@ class CAVE(object):
             from [OFF, INFO, DEBUG, DEV_DEBUG and WARNING]
         analyzing_options: string or dict
             options-dictionary following CAVE's options-syntax
+        n_jobs: int
+            number of processes to read in the folders in parallel, -1 uses all available cores
+        cache_dir: string
+            optional, directory for a persistent cache of the read (and converted) input-data, so unchanged folders
+            don't need to be read again on the next invocation (should not be inside the output_dir)
+        save_converted: bool
+            if True, input-data in formats that need conversion (BOHB, CSV, APT) is saved in SMAC3-format to the
+            output_dir, by default it's only kept in memory
+        cache_memory_limit: float
+            memory budget (in MB) for the cache of aggregated and budget-reduced runs, that is shared between all
+            analyzers (None for unbounded)
+        run_store_backend: str
+            from [memory, sqlite], 'sqlite' streams the runs of all folders into a SQLite-file in the output_dir and
+            keeps them there, metadata, run-counts and costs are computed by queries (RunHistories are created from
+            the file when an analysis needs them)
         """
         self.show_jupyter = show_jupyter
         if self.show_jupyter:
@@ -153,6 +178,11 @@ class CAVE(object):
                                            file_format=self.file_format,  # TODO remove?
                                            validation_format=self.validation_format,  # TODO remove?
                                            analyzing_options=analyzing_options,
+                                           n_jobs=n_jobs,
+                                           cache_dir=cache_dir,
+                                           save_converted=save_converted,
+                                           cache_memory_limit=cache_memory_limit,
+                                           run_store_backend=run_store_backend,
                                            )
 
         # create builder for html-website, decide for suitable logo
@@ -186,6 +216,9 @@ class CAVE(object):
         # Save jupyter-flag (needs to be False while analyzing) and reset it later.
         flag_show_jupyter = self.show_jupyter
         self.show_jupyter = False
+        # Count trained and reused surrogate models per report
+        ModelRegistry.reset_stats()
+        RepresentativeInstances.reset_errors()
 
         # Process analyzing-options
         if isinstance(options, str):
@@ -249,13 +282,109 @@ class CAVE(object):
         self.apt_overview(d=self._get_dict(self.website, title))
         self.apt_tensorboard(d=self._get_dict(self.website, title))
 
+        self._add_model_summary()
         self._build_website()
 
+        self.logger.debug("Cache of derived runs: %s", str(dict(self.runscontainer.get_cache_stats())))
+        self.logger.debug("Cache of epm-predictions: %s", str(dict(PredictionCache.get_stats())))
         self.logger.info("CAVE finished. Report is located in %s", os.path.join(self.output_dir, 'report.html'))
 
         # Set jupyter-flag as it was before.
         self.show_jupyter = flag_show_jupyter
 
+    def watch(self,
+              interval: float=60,
+              n_polls: int=None):
+        """
+        Analyze the available data and keep updating the report while the configurator is still running. Every
+        `interval` seconds, new runs and trajectory-entries are read from the folders (only what was added since the
+        last poll, see `RunsContainer.update`) and only the analyzers whose inputs changed are run again. Stop with
+        Ctrl+C.
+
+        Parameters
+        ----------
+        interval: float
+            seconds between two polls of the folders
+        n_polls: int
+            stop after this many polls, if None, watch until interrupted
+        """
+        self.analyze()
+        self.logger.info("Watching %s for new data every %.1f seconds (stop with Ctrl+C)", str(self.folders), interval)
+        n = 0
+        try:
+            while n_polls is None or n < n_polls:
+                time.sleep(interval)
+                n += 1
+                changed = self.runscontainer.update()
+                if changed:
+                    self.logger.info("New %s, updating report", ' and '.join(sorted(changed)))
+                    self._refresh(changed)
+        except KeyboardInterrupt:
+            self.logger.info("Stopped watching. Report is located in %s", os.path.join(self.output_dir, 'report.html'))
+
+    def _refresh(self, changed):
+        """ Run the analyzers again whose inputs (from ['runs', 'configs', 'incumbent', 'trajectory'], see
+        `RunsContainer.update`) changed. Analyzers that are based on models of all runs (parameter importance,
+        configurator footprint and parallel coordinates) are only run again if the incumbent or the set of evaluated
+        configurations changed, so their estimates reflect the runs at their last refresh. Feature-analysis only
+        depends on the scenario and is never run again. """
+        flag_show_jupyter = self.show_jupyter
+        self.show_jupyter = False
+
+        title = "Performance Analysis"
+        refresh = [(self.overview_table, self.website, {'runs', 'trajectory'}),
+                   (self.compare_default_incumbent, self._get_dict(self.website, "Meta Data"), {'incumbent'}),
+                   (self.performance_table, self._get_dict(self.website, title), {'incumbent'}),
+                   (self.plot_ecdf, self._get_dict(self.website, title), {'incumbent'}),
+                   (self.plot_scatter, self._get_dict(self.website, title), {'incumbent'}),
+                   (self.algorithm_footprints, self._get_dict(self.website, title), {'incumbent'}),
+                   ]
+        title = "Budget Analysis"
+        if self.runscontainer.get_budgets() is not None:
+            refresh.extend([(self.bohb_incumbents_per_budget, self._get_dict(self.website, title), {'runs'}),
+                            (self.budget_correlation, self._get_dict(self.website, title), {'runs'})])
+            if self.runscontainer.file_format == "BOHB":
+                refresh.append((self.bohb_learning_curves, self._get_dict(self.website, title), {'runs'}))
+        refresh.append((self.parameter_importance, self._get_dict(self.website, "Parameter Importance"),
+                        {'incumbent'}))
+        title = "Configurators Behavior"
+        refresh.extend([(self.configurator_footprint, self._get_dict(self.website, title), {'configs', 'incumbent'}),
+                        (self.cost_over_time, self._get_dict(self.website, title), {'trajectory'}),
+                        (self.parallel_coordinates, self._get_dict(self.website, title), {'configs'}),
+                        ])
+
+        for analyzer, d, inputs in refresh:
+            if inputs & changed:
+                analyzer(d=d)
+        self._add_model_summary()
+        self._build_website()
+
+        self.show_jupyter = flag_show_jupyter
+
+    def _add_model_summary(self):
+        """ Add the number of trained and reused surrogate models (see `ModelRegistry`) and the errors of approximating
+        instance-marginalization (see `RepresentativeInstances`) to the meta data of the report """
+        stats = ModelRegistry.get_stats()
+        if not stats:
+            return
+        self.logger.info("Surrogate models (trained/reused): %s", ', '.join(["%s: %d/%d" % (purpose, s['trained'],
+                                                                                             s['reused'])
+                                                                             for purpose, s in stats.items()]))
+        df = pd.DataFrame.from_dict(stats, orient='index')
+        self._get_dict(self.website, "Meta Data")["Surrogate Models"] = {
+            'table': df.to_html(),
+            'tooltip': "Random forests trained for the analyses in this report. Models for the same data (runs, "
+                       "instance-features and seed) are only trained once and reused.",
+        }
+        errors = RepresentativeInstances.get_errors()
+        if errors:
+            self._get_dict(self.website, "Meta Data")["Instance Approximation"] = {
+                'table': pd.DataFrame.from_dict(errors, orient='index').to_html(),
+                'tooltip': "Marginalizing epm-predictions over instances is approximated by representative instances "
+                           "(clusters of the instance-features). The errors compare the approximate to the exact "
+                           "marginal cost on a sample of the configurations.",
+            }
+
     def _get_dict(self, d, layername):
         """ Get the appropriate sub-dict for this layer (or layer-run combination) and create it if necessary """
         if not isinstance(d, dict):
@@ -300,12 +429,14 @@ class CAVE(object):
                              params: Union[int, List[str]]=None,
                              n_configs: int=None,
                              max_runs_epm: int=None,
+                             epm_memory_limit: float=None,
                              ):
         return ParallelCoordinates(self.runscontainer,
                                    pc_sort_by=pc_sort_by,
                                    params=params,
                                    n_configs=n_configs,
                                    max_runs_epm=max_runs_epm,
+                                   epm_memory_limit=epm_memory_limit,
                                    )
 
     @_analyzer_type
@@ -5,7 +5,6 @@ __license__ = "BSD"
 __maintainer__ = "Joshua Marben"
 __email__ = "marbenj@cs.uni-freiburg.de"
 
-import copy
 import logging
 import os
 import time
@@ -13,7 +12,6 @@ import time
 import numpy as np
 from ConfigSpace import CategoricalHyperparameter
 from ConfigSpace.configuration_space import Configuration, ConfigurationSpace
-from ConfigSpace.util import impute_inactive_values
 from bokeh.layouts import column, row, widgetbox
 from bokeh.models import HoverTool, ColorBar, LinearColorMapper, BasicTicker, CustomJS, Slider
 from bokeh.models.filters import GroupFilter, BooleanFilter
@@ -23,14 +21,16 @@ from bokeh.plotting import figure, ColumnDataSource
 from sklearn.decomposition import PCA
 from sklearn.manifold.mds import MDS
 from sklearn.preprocessing import StandardScaler
-from smac.epm.rf_with_instances import RandomForestWithInstances
 from smac.runhistory.runhistory import RunHistory
 from smac.scenario.scenario import Scenario
 from smac.utils.constants import MAXINT
 
+from cave.reader.config_table import ConfigTable
+from cave.reader.scenario_cache import ScenarioCache
 from cave.utils.convert_for_epm import convert_data_for_epm
 from cave.utils.helpers import escape_parameter_name, get_config_origin, combine_runhistories
 from cave.utils.io import export_bokeh
+from cave.utils.model_registry import ModelRegistry
 from cave.utils.timing import timing
 
 
@@ -49,6 +49,7 @@ class ConfiguratorFootprintPlotter(object):
                  timeslider_log: bool=True,
                  rng=None,
                  output_dir: str=None,
+                 backend=None,
                  ):
         """
         Creating an interactive plot, visualizing the configuration search space.
@@ -82,6 +83,8 @@ class ConfiguratorFootprintPlotter(object):
             random number generator
         output_dir: str
             output directory
+        backend: SurrogateBackend
+            creates the random forest for the contour-plot, if None, smac's RandomForestWithInstances is used
         """
         self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
         self.rng = rng
@@ -99,12 +102,14 @@ class ConfiguratorFootprintPlotter(object):
         self.contour_step_size = contour_step_size
         self.output_dir = output_dir
         self.timeslider_log = timeslider_log
+        self.backend = backend
 
         # Preprocess input
         self.default = scenario.cs.get_default_configuration()
         self.final_incumbent = final_incumbent
 
         self.configs_in_run = {label : rh.get_all_configs() for label, rh in zip(self.rh_labels, self.rhs)}
+        self.config_table = None  # all plotted configurations, set in get_conf_matrix
 
     def run(self):
         """
@@ -121,11 +126,11 @@ class ConfiguratorFootprintPlotter(object):
         contour_data = {}
         if not any([label.startswith('budget') for label in self.rh_labels]):
             contour_data['combined'] = self.get_pred_surface(self.combined_rh, X_scaled=red_dists,
-                                                             conf_list=copy.deepcopy(conf_list),
+                                                             config_table=self.config_table,
                                                              contour_step_size=self.contour_step_size)
         for label, rh in zip(self.rh_labels, self.rhs):
             contour_data[label] = self.get_pred_surface(self.combined_rh, X_scaled=red_dists,
-                                                        conf_list=copy.deepcopy(conf_list),
+                                                        config_table=self.config_table,
                                                         contour_step_size=self.contour_step_size)
 
         return self.plot(red_dists,
@@ -137,7 +142,7 @@ class ConfiguratorFootprintPlotter(object):
                          timeslider_labels=timeslider_labels)
 
     @timing
-    def get_pred_surface(self, rh, X_scaled, conf_list: list, contour_step_size):
+    def get_pred_surface(self, rh, X_scaled, config_table: ConfigTable, contour_step_size):
         """fit epm on the scaled input dimension and
         return data to plot a contour plot of the empirical performance
 
@@ -147,8 +152,8 @@ class ConfiguratorFootprintPlotter(object):
             runhistory
         X_scaled: np.array
             configurations in scaled 2dim
-        conf_list: list
-            list of Configuration objects
+        config_table: ConfigTable
+            all configurations, ids correspond to the rows of X_scaled
         contour_step_size: float
             step-size for contour
 
@@ -157,48 +162,37 @@ class ConfiguratorFootprintPlotter(object):
         contour_data: (np.array, np.array, np.array)
             x, y, Z for contour plots
         """
-        # use PCA to reduce features to also at most 2 dims
-        scen = copy.deepcopy(self.scenario)  # pca changes feats
+        # use PCA to reduce features to also at most 2 dims (on a variant of the shared scenario)
+        scen = self.scenario
         if scen.feature_array.shape[1] > 2:
             self.logger.debug("Use PCA to reduce features to from %d dim to 2 dim", scen.feature_array.shape[1])
             # perform PCA
-            insts = scen.feature_dict.keys()
+            insts = list(scen.feature_dict.keys())
             feature_array = np.array([scen.feature_dict[i] for i in insts])
             feature_array = StandardScaler().fit_transform(feature_array)
             feature_array = PCA(n_components=2).fit_transform(feature_array)
             # inject in scenario-object
-            scen.feature_array = feature_array
-            scen.feature_dict = dict([(inst, feature_array[idx, :]) for idx, inst in enumerate(insts)])
-            scen.n_features = 2
+            scen = ScenarioCache.derive(scen,
+                                        feature_array=feature_array,
+                                        feature_dict=dict([(inst, feature_array[idx, :]) for idx, inst in
+                                                           enumerate(insts)]),
+                                        n_features=2)
 
         # convert the data to train EPM on 2-dim featurespace (for contour-data)
         self.logger.debug("Convert data for epm.")
-        X, y, types = convert_data_for_epm(scenario=scen, runhistory=rh, impute_inactive_parameters=True, logger=self.logger)
+        X, y, types = convert_data_for_epm(scenario=scen, runhistory=rh, impute_inactive_parameters=True, logger=self.logger,
+                                           backend=self.backend)
         types = np.array(np.zeros((2 + scen.feature_array.shape[1])), dtype=np.uint)
         num_params = len(scen.cs.get_hyperparameters())
 
-        # impute missing values in configs and insert MDS'ed (2dim) configs to the right positions
-        conf_dict = {}
-        # Remove forbidden clauses (this is necessary to enable the impute_inactive_values-method, see #226)
-        cs_no_forbidden = copy.deepcopy(conf_list[0].configuration_space)
-        cs_no_forbidden.forbidden_clauses = []
-        for idx, c in enumerate(conf_list):
-            c.configuration_space = cs_no_forbidden
-            conf_list[idx] = impute_inactive_values(c)
-            conf_dict[str(conf_list[idx].get_array())] = X_scaled[idx, :]
-
-        # Debug compare elements:
-        c1, c2 = {str(z) for z in X}, {str(z) for z in conf_dict.keys()}
-        self.logger.debug("{} elements not in both sets, {} elements in both sets, X (len {}) and conf_dict (len {}) "
-                          "(might be a problem related to forbidden clauses?)".format(len(c1 ^ c2), len(c1 & c2), len(c1 ^ c2), len(c1), len(c2)))
-        # self.logger.debug("Elements: {}".format(str(c1 ^ c2)))
-
-        X_trans = []  # X_trans is the same as X but with reduced 2-dim features (so shape is (N, 2) instead of (N, M))
-        for x in X:
-            x_scaled_conf = conf_dict[str(x[:num_params])]
-            # append scaled config + pca'ed features (total of 4 values) per config/feature-sample
-            X_trans.append(np.concatenate((x_scaled_conf, x[num_params:]), axis=0))
-        X_trans = np.array(X_trans)
+        # impute missing values in configs (on the vectors, exactly as convert_data_for_epm does) and insert MDS'ed
+        # (2dim) configs to the right positions
+        scaled_rows = {vector.tobytes(): idx for idx, vector in enumerate(config_table.imputed_vectors())}
+        rows = [scaled_rows[np.ascontiguousarray(x[:num_params], dtype=np.float64).tobytes()] for x in X]
+
+        # X_trans is the same as X but with reduced 2-dim features (so shape is (N, 2) instead of (N, M))
+        # append scaled config + pca'ed features (total of 4 values) per config/feature-sample
+        X_trans = np.hstack((X_scaled[rows, :], X[:, num_params:]))
 
         self.logger.debug("Train random forest for contour-plot. Shape of X: {}, shape of X_trans: {}".format(X.shape, X_trans.shape))
         self.logger.debug("Faking configspace to be able to train rf...")
@@ -206,14 +200,16 @@ class ConfiguratorFootprintPlotter(object):
         fake_cs = ConfigurationSpace(name="fake-cs-for-configurator-footprint")
 
         bounds = np.array([(0, np.nan), (0, np.nan)], dtype=object)
-        model = RandomForestWithInstances(fake_cs,
-                                          types, bounds,
-                                          seed = self.rng.randint(MAXINT),
-                                          instance_features=np.array(scen.feature_array),
-                                          ratio_features=1.0)
-
         start = time.time()
-        model.train(X_trans, y)
+        model = ModelRegistry.get_forest(fake_cs,
+                                         types, bounds,
+                                         X=X_trans,
+                                         y=y,
+                                         seed = self.rng.randint(MAXINT),
+                                         instance_features=np.array(scen.feature_array),
+                                         purpose='configurator footprint',
+                                         backend=self.backend,
+                                         ratio_features=1.0)
         self.logger.debug("Fitting random forest took %f time", time.time() - start)
 
         x_min, x_max = X_scaled[:, 0].min() - 1, X_scaled[:, 0].max() + 1
@@ -352,22 +348,24 @@ class ConfiguratorFootprintPlotter(object):
         rh: RunHistory
             reduced runhistory
         """
-        configs = rh.get_all_configs()
-        if max_configs <= 0 or max_configs > len(configs):  # keep all
+        config_ids = list(rh.ids_config.keys())
+        if max_configs <= 0 or max_configs > len(config_ids):  # keep all
             return rh
 
-        runs = [(c, len(rh.get_runs_for_config(c, only_max_observed_budget=False))) for c in configs]
-        if not keep:
-            keep = []
-        runs = sorted(runs, key=lambda x: x[1])[-self.max_plot:]
+        # Work on the integer config-ids of the runhistory, so configurations don't need to be hashed per run
+        n_runs = {c_id: 0 for c_id in config_ids}
+        for k in rh.data.keys():
+            n_runs[k.config_id] += 1
+        runs = sorted([(c_id, n_runs[c_id]) for c_id in config_ids], key=lambda x: x[1])[-self.max_plot:]
+        keep = [rh.config_ids.get(c) for c in (keep if keep else [])]
         keep = [r[0] for r in runs] + keep
         self.logger.info("Reducing number of configs from %d to %d, dropping from the fewest evaluations",
-                         len(configs), len(keep))
+                         len(config_ids), len(keep))
+        keep = set(keep)
 
         new_rh = RunHistory()
         for k, v in list(rh.data.items()):
-            c = rh.ids_config[k.config_id]
-            if c in keep:
+            if k.config_id in keep:
                 new_rh.add(config=rh.ids_config[k.config_id],
                            cost=v.cost, time=v.time, status=v.status,
                            instance_id=k.instance_id, seed=k.seed)
@@ -400,17 +398,15 @@ class ConfiguratorFootprintPlotter(object):
         labels: List[str]
             labels for timeslider (i.e. wallclock-times)
         """
-        conf_list = []
-        conf_matrix = []
-        # Get all configurations. Index of c in conf_list serves as identifier
+        # Get all configurations. The id of c in the config-table (and index in conf_list) serves as identifier
+        config_table = ConfigTable(self.scenario.cs)
         for c in rh.get_all_configs():
-            if c not in conf_list:
-                conf_matrix.append(c.get_array())
-                conf_list.append(c)
+            config_table.intern(c)
         for inc in [a for b in incs for a in b]:
-            if inc not in conf_list:
-                conf_matrix.append(inc.get_array())
-                conf_list.append(inc)
+            config_table.intern(inc)
+        self.config_table = config_table
+        conf_list = list(config_table)
+        conf_matrix = config_table.vectors
 
         # Sanity check, number quantiles must be smaller than the number of configs
         if self.num_quantiles >= len(conf_list):
@@ -422,7 +418,7 @@ class ConfiguratorFootprintPlotter(object):
         # screenshots of the number of runs per config at different points
         # in (i.e. different quantiles of) the runhistory, LAST quantile
         # is full history!!
-        labels, runs_per_quantile = self._get_runs_per_config_quantiled(rh, conf_list, quantiles=self.num_quantiles)
+        labels, runs_per_quantile = self._get_runs_per_config_quantiled(rh, config_table, quantiles=self.num_quantiles)
         assert(len(runs_per_quantile) == self.num_quantiles)
 
         # Get minimum and maximum for sizes of dots
@@ -432,10 +428,10 @@ class ConfiguratorFootprintPlotter(object):
         self.logger.debug("Gathered %d configurations from 1 runhistories." % len(conf_list))
 
         runs_per_quantile = np.array([np.array(run) for run in runs_per_quantile])
-        return np.array(conf_matrix), np.array(conf_list), runs_per_quantile, labels
+        return conf_matrix, np.array(conf_list), runs_per_quantile, labels
 
     @timing
-    def _get_runs_per_config_quantiled(self, rh, conf_list, quantiles):
+    def _get_runs_per_config_quantiled(self, rh, config_table, quantiles):
         """Returns a list of lists, each sublist representing the current state
         at that timestep (quantile). The current state means a list of times
         each config was evaluated at that timestep.
@@ -444,8 +440,8 @@ class ConfiguratorFootprintPlotter(object):
         ----------
         rh: RunHistory
             rh to be split up
-        conf_list: list
-            list of all Configuration objects that appear in runhistory
+        config_table: ConfigTable
+            all configurations that appear in runhistory
         quantiles: int
             number of fractions to split rh into
 
@@ -500,17 +496,19 @@ class ConfiguratorFootprintPlotter(object):
             raise RuntimeError("Sanity check on range-creation in configurator footprint went wrong. "
                                "Please report this Error on \"https://github.com/automl/CAVE/issues\" and provide the debug.txt-file.")
 
-        tmp_rh = RunHistory()
-        for i, j in zip(ranges[:-1], ranges[1:]):
-            for idx in range(i, j):
-                k, v = as_list[idx]
-                tmp_rh.add(config=rh.ids_config[k.config_id],
-                           cost=v.cost, time=v.time, status=v.status,
-                           instance_id=k.instance_id, seed=k.seed,
-                           additional_info=v.additional_info)
+        # Count runs per config-id in the table, runs on multiple budgets only count once per instance-seed-pair
+        table_ids = {c_id: config_table.index(c) for c_id, c in rh.ids_config.items()}
+        run_config_ids, seen = np.full(len(as_list), -1, dtype=np.int64), set()
+        for idx, (k, _) in enumerate(as_list):
+            key = (k.config_id, k.instance_id, k.seed)
+            if key not in seen:
+                seen.add(key)
+                run_config_ids[idx] = table_ids[k.config_id]
+        for j in ranges[1:]:
             if timestamps:
                 labels.append("{0:.2f}".format(timestamps[j - 1]))
-            r_p_q_p_c.append([len(tmp_rh.get_runs_for_config(c, only_max_observed_budget=False)) for c in conf_list])
+            counted = run_config_ids[:j]
+            r_p_q_p_c.append(list(np.bincount(counted[counted >= 0], minlength=len(config_table))))
         self.logger.debug("Labels: " + str(labels))
         return labels, r_p_q_p_c
 
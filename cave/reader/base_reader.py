@@ -1,8 +1,9 @@
-import glob
 import logging
 import os
 from contextlib import contextmanager
+from itertools import islice
 
+from cave.reader.directory_index import DirectoryIndex
 from cave.utils.exceptions import NotUniqueError
 
 
@@ -16,6 +17,30 @@ def changedir(newdir):
         os.chdir(olddir)
 
 
+# Readers for custom file-formats, file-format -> reader-class (see `register_reader`)
+_custom_readers = {}
+
+
+def register_reader(file_format, reader_cls):
+    """Make a reader for a custom file-format available to CAVE (e.g. `CAVE(..., file_format=file_format)`).
+
+    Parameters
+    ----------
+    file_format: str
+        name of the format
+    reader_cls: type
+        subclass of BaseReader, instantiated with `(folder, ta_exec_dir)`
+    """
+    if not issubclass(reader_cls, BaseReader):
+        raise ValueError("%s is not a subclass of BaseReader" % reader_cls)
+    _custom_readers[file_format] = reader_cls
+
+
+def get_custom_reader(file_format):
+    """ Reader-class registered for `file_format`, None if there is none """
+    return _custom_readers.get(file_format)
+
+
 class BaseReader(object):
     """
     Abstract base class to inherit reader from.
@@ -24,8 +49,16 @@ class BaseReader(object):
     Please note that it is strongly encouraged to build a converter (from
     `BaseConverter <apidoc/cave.reader.conversion.base_converter.BaseConverter>`_ ) instead of designing a new reader.
     Conversion aims to make it easy and feasible to quickly support new file-formats.
+
+    Readers can either create the complete RunHistory in `get_runhistory` or yield the runs lazily in batches by
+    overriding `iter_runs` (and `iter_trajectory`). Streamed runs are added to CAVE's run-store (in memory or SQLite)
+    batch by batch, so only one batch is held as python-objects at a time. Use `register_reader` to make a reader
+    for a new file-format available.
     """
 
+    # Number of runs (or trajectory-entries) per batch, if not specified otherwise
+    batch_size = 10000
+
     def __init__(self, folder, ta_exec_dir):
         self.logger = logging.getLogger("cave.reader")
         self.folder = folder
@@ -50,6 +83,52 @@ class BaseReader(object):
         """Create trajectory (list with dicts as entries)"""
         raise NotImplemented()
 
+    def iter_runs(self, config_space, batch_size=None):
+        """Yield the original runs in batches. Override this to read runs lazily, the default implementation creates
+        the RunHistory (see `get_runhistory`) and yields its runs.
+
+        Parameters
+        ----------
+        config_space: ConfigurationSpace
+            configuration space of the runs
+        batch_size: int
+            maximum number of runs per batch, `self.batch_size` if None
+
+        Yields
+        ------
+        runs: List[dict]
+            run-records, keyword-arguments of `RunHistory.add` (config, cost, time, status, instance_id, seed, budget,
+            additional_info)
+        """
+        rh = self.get_runhistory(config_space)
+        records = (dict(config=rh.ids_config[k.config_id], cost=v.cost, time=v.time, status=v.status,
+                        instance_id=k.instance_id, seed=k.seed, budget=k.budget, additional_info=v.additional_info)
+                   for k, v in rh.data.items())
+        yield from _batches(records, batch_size or self.batch_size)
+
+    def iter_trajectory(self, config_space, batch_size=None):
+        """Yield the trajectory in batches. Override this together with `iter_runs`, the default implementation
+        yields the entries of `get_trajectory`.
+
+        Parameters
+        ----------
+        config_space: ConfigurationSpace
+            configuration space of the incumbents
+        batch_size: int
+            maximum number of entries per batch, `self.batch_size` if None
+
+        Yields
+        ------
+        entries: List[dict]
+            trajectory-entries (like the entries of `get_trajectory`)
+        """
+        yield from _batches(iter(self.get_trajectory(config_space)), batch_size or self.batch_size)
+
+    @property
+    def streams_runs(self):
+        """ Whether this reader yields its runs lazily (overrides `iter_runs`) """
+        return type(self).iter_runs is not BaseReader.iter_runs
+
     @classmethod
     def check_for_files(cls, path):
         raise NotImplemented()
@@ -58,8 +137,9 @@ class BaseReader(object):
     def get_glob_file(cls, folder, fn, raise_on_failure=True):
         """
         If a file is not found in the expected path structure, we can check if it's unique in the subfolders and if so, return it.
+        The lookup uses the shared DirectoryIndex of the folder, so the folder is only scanned once.
         """
-        globbed = glob.glob(os.path.join(folder, '**', fn), recursive=True)
+        globbed = DirectoryIndex.get(folder).find(fn)
         if len(globbed) == 1:
             return globbed[0]
         elif len(globbed) < 1:
@@ -70,3 +150,12 @@ class BaseReader(object):
                 raise NotUniqueError("The file \"{}\" exists {} times in \"{}\", but not in the expected place.".format(
                     fn, len(globbed), folder))
         return ""
+
+
+def _batches(iterator, batch_size):
+    """ Lists of up to `batch_size` consecutive items of `iterator` """
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,144 @@
+import numpy as np
+from ConfigSpace.configuration_space import Configuration
+
+
+class ConfigTable(object):
+    """
+    Interned configurations of a configuration space. Every configuration is stored once and referenced by an integer
+    id (its index in the table). The vector-representations (`Configuration.get_array()`) of all configurations are
+    kept in one dense matrix, so computations on many configurations (distances, imputation of inactive values,
+    conversion for EPMs) work on rows of that matrix instead of on single Configuration-objects.
+
+    Configurations are identified by their vector, so interning and lookups don't need to hash Configuration-objects
+    (which is expensive, since they are hashed by their dictionary-representation).
+
+    Configuration-objects are only needed for display and for smac's interfaces (e.g. RunHistory). Objects passed to
+    `intern` are kept as they are, because recreating a configuration from its vector is not exact for floats (which
+    changes the configuration's hash). For configurations interned from vectors, objects are created on access.
+    """
+
+    def __init__(self, configuration_space=None):
+        """
+        Parameters
+        ----------
+        configuration_space: ConfigurationSpace
+            configuration space of all configurations in the table, if None, it is taken from the first interned
+            configuration
+        """
+        self.configuration_space = configuration_space
+        self._ids = {}       # vector.tobytes() -> id
+        self._configs = []   # id -> Configuration (None if not created yet)
+        self._origins = []   # id -> origin (only used to create Configurations from vectors)
+        self._matrix = None  # dense matrix of all vectors, rows are appended to `self._rows` until accessed
+        self._rows = []
+
+    @classmethod
+    def from_vectors(cls, configuration_space, vectors, origins=None, configs=None):
+        """ Table with the configurations of a vector-matrix (e.g. attached from shared memory). The matrix is used
+        without copying, Configuration-objects that are not given are created on access. """
+        table = cls(configuration_space)
+        table._matrix = vectors
+        table._configs = list(configs) if configs is not None else [None] * len(vectors)
+        table._origins = list(origins) if origins is not None else [None] * len(vectors)
+        table._ids = {table._key(vector): idx for idx, vector in enumerate(vectors)}
+        return table
+
+    def __len__(self):
+        return len(self._configs)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def __contains__(self, config):
+        return self.index(config) is not None
+
+    def __getitem__(self, idx):
+        """ Configuration with the given id (created on access, if interned from a vector) """
+        idx = int(idx)
+        config = self._configs[idx]
+        if config is None:
+            config = Configuration(self.configuration_space, vector=self.vectors[idx], origin=self._origins[idx])
+            self._configs[idx] = config
+        return config
+
+    def get_configs(self, ids):
+        """ List of Configurations for the given ids """
+        return [self[idx] for idx in ids]
+
+    def _key(self, vector):
+        # -0.0 and 0.0 are the same value, but have a different byte-representation
+        return (np.asarray(vector, dtype=np.float64) + 0.0).tobytes()
+
+    def intern(self, config):
+        """ Return the id of the configuration, adding it to the table if necessary. """
+        if self.configuration_space is None:
+            self.configuration_space = config.configuration_space
+        vector = config.get_array()
+        key = self._key(vector)
+        idx = self._ids.get(key)
+        if idx is None:
+            idx = self._append(key, vector, config.origin)
+            self._configs[idx] = config
+        return idx
+
+    def intern_vector(self, vector, origin=None):
+        """ Return the id of the configuration with this vector-representation, adding it if necessary. """
+        if self.configuration_space is None:
+            raise ValueError("Can't intern vectors without a configuration space")
+        key = self._key(vector)
+        idx = self._ids.get(key)
+        if idx is None:
+            idx = self._append(key, vector, origin)
+        return idx
+
+    def _append(self, key, vector, origin):
+        idx = len(self._configs)
+        self._ids[key] = idx
+        self._configs.append(None)
+        self._origins.append(origin)
+        self._rows.append(np.asarray(vector, dtype=np.float64))
+        return idx
+
+    def get_origins(self):
+        """ Origins of all configurations (one per id) """
+        return list(self._origins)
+
+    def get_created_configs(self):
+        """ Configuration-objects of all configurations (one per id, None if not created yet) """
+        return list(self._configs)
+
+    def index(self, config):
+        """ Id of the configuration or None, if not in the table """
+        return self._ids.get(self._key(config.get_array()))
+
+    @property
+    def vectors(self):
+        """ Matrix with the vector-representations of all configurations (one row per id) """
+        if self._matrix is None or self._rows:
+            n_dims = len(self.configuration_space.get_hyperparameters()) if self.configuration_space else 0
+            blocks = ([self._matrix] if self._matrix is not None else [np.empty((0, n_dims))]) + \
+                     ([np.vstack(self._rows)] if self._rows else [])
+            self._matrix = np.concatenate(blocks)
+            self._rows = []
+        return self._matrix
+
+    def imputed_vectors(self, ids=None):
+        """Vector-representations with inactive hyperparameters set to their default value. This equals
+        `ConfigSpace.util.impute_inactive_values` (with the default strategy), but works on all vectors at once and
+        without (inexact) conversion between vector- and value-representation.
+
+        Parameters
+        ----------
+        ids: List[int]
+            only return vectors of these configurations, if None, return all
+
+        Returns
+        -------
+        vectors: np.array
+            matrix with one row per configuration, without nan-values
+        """
+        vectors = self.vectors if ids is None else self.vectors[np.asarray(ids, dtype=np.int64)]
+        defaults = np.array([hp.normalized_default_value for hp in self.configuration_space.get_hyperparameters()],
+                            dtype=np.float64)
+        return np.where(np.isnan(vectors), defaults, vectors)
@@ -1,5 +1,7 @@
 import copy
+import hashlib
 import logging
+import numbers
 import os
 import tempfile
 from collections import OrderedDict
@@ -7,14 +9,25 @@ from contextlib import contextmanager
 
 import numpy as np
 from pimp.importance.importance import Importance
-from smac.runhistory.runhistory import RunHistory, DataOrigin
+from smac.epm.util_funcs import get_types
+from smac.runhistory.runhistory import DataOrigin
 from smac.utils.io.input_reader import InputReader
 from smac.utils.validate import Validator
 from smac import __version__ as smac_version
 
+from cave.reader.base_reader import get_custom_reader
+from cave.reader.run_store import RunStore, RunStoreView
+from cave.reader.scenario_cache import ScenarioCache
+from cave.reader.shared_run_data import SharedRunData
+from cave.reader.sqlite_run_store import SQLiteRunView
 from cave.reader.smac2_reader import SMAC2Reader
 from cave.reader.smac3_reader import SMAC3Reader
-from cave.utils.helpers import scenario_sanity_check
+from cave.utils.convert_for_epm import convert_data_for_epm
+from cave.utils.helpers import scenario_sanity_check, share_runhistory
+from cave.utils.model_registry import ModelRegistry
+from cave.utils.prediction_cache import validate_epm
+from cave.utils.representative_instances import RepresentativeInstances
+from cave.utils.surrogate_backend import get_backend_from_options
 from cave.utils.timing import timing
 
 
@@ -26,6 +39,10 @@ class ConfiguratorRun(object):
     trajectory and handling original/validated data appropriately.
     To create a ConfiguratorRun from a folder, use Configurator.from_folder()
     """
+    # Rough memory per run in a smac RunHistory (keys, values and cost-structures) and per sample in pimp's models
+    _BYTES_PER_RUNHISTORY_ENTRY = 500
+    _BYTES_PER_MODEL_SAMPLE = 1000
+
     def __init__(self,
                  scenario,
                  original_runhistory,
@@ -38,6 +55,7 @@ class ConfiguratorRun(object):
                  validation_format=None,
                  reduced_to_budgets=None,
                  output_dir=None,
+                 run_store=None,
                  ):
         """
         Parameters
@@ -46,7 +64,11 @@ class ConfiguratorRun(object):
             scenario
         original_runhistory, validated_runhistory: RunHistory
             runhistores containing only the original evaluated data (during optimization process) or the validated data
-            where points of interest are reevaluated after the optimization process
+            where points of interest are reevaluated after the optimization process. The runs are copied into the
+            run-store and the runhistories are recreated from it on first access. If a run_store is passed, both are
+            None (the validated runhistory then contains all real runs, like the one of runs aggregated over folders).
+            The original runs can also be passed as a RunStore, which is then used as the run-store without copying,
+            or as a `SQLiteRunView` on the runs of the folder, then all runs are kept in the `SQLiteRunStore`
         trajectory: List[dict]
             a trajectory of the best performing configurations at each point in time
         options: dict
@@ -61,6 +83,9 @@ class ConfiguratorRun(object):
             budgets, with which this cr is associated
         output_dir: str
             where to save analysis-data for this cr
+        run_store: RunStore
+            optional, store (usually a `RunStoreView` on the runs of a budget or folders) with the real runs, used
+            instead of original and validated runhistory
         """
         self.logger = logging.getLogger("cave.ConfiguratorRun.{}".format(path_to_folder))
         self.rng = np.random.RandomState(42)
@@ -70,8 +95,6 @@ class ConfiguratorRun(object):
         self.reduced_to_budgets = [None] if reduced_to_budgets is None else reduced_to_budgets
 
         self.scenario = scenario
-        self.original_runhistory = original_runhistory
-        self.validated_runhistory = validated_runhistory
         self.trajectory = trajectory
         self.ta_exec_dir = ta_exec_dir
         self.file_format = file_format
@@ -86,18 +109,117 @@ class ConfiguratorRun(object):
         self.incumbent = self.trajectory[-1]['incumbent'] if self.trajectory else None
         self.feature_names = self._get_feature_names()
 
-        # Create combined runhistory to collect all "real" runs
-        self.combined_runhistory = RunHistory()
-        self.combined_runhistory.update(self.original_runhistory, origin=DataOrigin.INTERNAL)
-        if self.validated_runhistory is not None:
-            self.combined_runhistory.update(self.validated_runhistory, origin=DataOrigin.EXTERNAL_SAME_INSTANCES)
+        # All runhistories are backed by one columnar store with the real runs (original runs are INTERNAL, validated
+        # runs are EXTERNAL) and created from (views on) it on first access. RunHistories passed in are not kept.
+        self._validated_is_combined = run_store is not None
+        self._validated_runs = None  # view on the validated runs, None if there is no validated data
+        if run_store is None and isinstance(original_runhistory, SQLiteRunView):
+            # The runs stay in the sqlite-store, validated runs are added to it
+            if validated_runhistory is not None:
+                original_runhistory.update(validated_runhistory, origin=DataOrigin.EXTERNAL_SAME_INSTANCES)
+                self._validated_runs = original_runhistory.derive(unique=False,
+                                                                  origins=[DataOrigin.EXTERNAL_SAME_INSTANCES])
+            run_store = original_runhistory
+        elif run_store is None:
+            if isinstance(original_runhistory, RunStore):
+                store = original_runhistory
+            else:
+                store = RunStore.from_runhistory(original_runhistory, origin=DataOrigin.INTERNAL)
+            if validated_runhistory is not None:
+                n_original = len(store)
+                store.update(validated_runhistory, origin=DataOrigin.EXTERNAL_SAME_INSTANCES)
+                self._validated_runs = store.view(np.arange(n_original, len(store)))
+            # Runs both in original and validated data are kept in the store, but only once in the combined view
+            run_store = store.view(store.unique_indices())
+        self.run_store = run_store
+        self._original_runhistory = None
+        self._validated_runhistory = None
+        self._combined_runhistory = None
+
+        # Importance-object (pimp), validator and runs estimated by the epm are expensive (training an epm), so
+        # they are only created on first access (see the respective properties). The estimated runs are kept in an
+        # overlay on the run-store (see `RunStore.overlay`), so they don't duplicate the real runs.
+        self._pimp = None
+        self._validator = None
+        self.epm_overlay = None
+        self._epm_runhistory = None
 
-        # Create runhistory with estimated runs (create Importance-object of pimp and use epm-model for validation)
-        self.epm_runhistory = RunHistory()
-        self.epm_runhistory.update(self.combined_runhistory)
+        # Set during execution, to share information between Analyzers
+        self.share_information = {'parameter_importance': OrderedDict(),
+                                  'feature_importance': OrderedDict(),
+                                  'evaluators': OrderedDict(),
+                                  'validator': None,
+                                  'hpbandster_result': None,  # Only for file-format BOHB
+                                  }
 
-        # Initialize importance and validator
-        self._init_pimp_and_validator()
+    def __getstate__(self):
+        """ Loggers and the pimp-object are not (reliably) picklable, they are recreated when needed. Runs kept in a
+        `SQLiteRunStore` are pickled like runs read into memory. """
+        d = dict(self.__dict__)
+        del d['logger']
+        d['_pimp'], d['_validator'] = None, None
+        if isinstance(self.run_store, SQLiteRunView) and not self._validated_is_combined:
+            store = self.run_store.derive(unique=False).materialize()
+            d['run_store'] = store.view(store.unique_indices())
+            if self._validated_runs is not None:
+                d['_validated_runs'] = store.view(store.select(origins=[DataOrigin.EXTERNAL_SAME_INSTANCES]))
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.logger = logging.getLogger("cave.ConfiguratorRun.{}".format(self.path_to_folder))
+
+    @property
+    def original_runhistory(self):
+        """Runhistory with the runs gathered during optimization."""
+        if self._original_runhistory is None:
+            self._original_runhistory = self.run_store.to_runhistory(
+                self.run_store.select(origins=[DataOrigin.INTERNAL]))
+        return self._original_runhistory
+
+    @property
+    def validated_runhistory(self):
+        """Runhistory with validation-data (None if not available). For runs created from a store (aggregated or
+        reduced to budgets), this is the combined runhistory."""
+        if self._validated_runhistory is None:
+            if self._validated_is_combined:
+                return self.combined_runhistory
+            if self._validated_runs is not None:
+                self._validated_runhistory = self._validated_runs.to_runhistory()
+        return self._validated_runhistory
+
+    @property
+    def combined_runhistory(self):
+        """Runhistory with all "real" runs (original and validated), created from the run-store on first access."""
+        if self._combined_runhistory is None:
+            self._combined_runhistory = self.run_store.to_runhistory()
+        return self._combined_runhistory
+
+    @property
+    def pimp(self):
+        """Importance-object of pimp, created (and its epm trained) on first access."""
+        if self._pimp is None:
+            self._init_pimp_and_validator()
+        return self._pimp
+
+    @property
+    def validator(self):
+        """Validator using the epm of pimp, created on first access."""
+        if self._validator is None:
+            self._init_pimp_and_validator()
+        return self._validator
+
+    @property
+    def epm_runhistory(self):
+        """Runhistory containing all real runs and the epm-estimated runs of default and incumbent on all
+        instances. Estimation is performed on first access."""
+        if self._epm_runhistory is None:
+            self._init_epm_runhistory()
+        return self._epm_runhistory
+
+    def _init_epm_runhistory(self):
+        """ Create runhistory with estimated runs (uses the epm-model of pimp for validation) """
+        self.epm_overlay = self.run_store.overlay()
         try:
             self._validate_default_and_incumbents("epm", self.ta_exec_dir)
         except KeyError as err:
@@ -108,29 +230,143 @@ class ConfiguratorRun(object):
                 self.logger.warning(msg)
             else:
                 self.logger.debug(msg)
+        # Real runs take precedence over estimated ones (already existing runs are ignored by the runhistory), they
+        # are shared with the combined runhistory, only the estimated runs are added
+        self._epm_runhistory = self.epm_overlay.to_runhistory(
+            runhistory=share_runhistory(self.combined_runhistory, self.epm_overlay.get_all_configs()))
 
-        # Set during execution, to share information between Analyzers
-        self.share_information = {'parameter_importance': OrderedDict(),
-                                  'feature_importance': OrderedDict(),
-                                  'evaluators': OrderedDict(),
-                                  'validator': None,
-                                  'hpbandster_result': None,  # Only for file-format BOHB
-                                  }
+    def append(self, runs, trajectory=None):
+        """Append new runs (and trajectory-entries) of a folder that is still written by the configurator (see
+        `FolderWatcher <apidoc/cave.reader.folder_watcher>`_). Only the new runs are added to the run-store, all
+        lazily created objects (runhistories, pimp, validator and epm-runs) are reset and recreated on next access.
+
+        Parameters
+        ----------
+        runs: RunStore
+            new original runs
+        trajectory: List[dict]
+            new entries of the trajectory
+        """
+        if isinstance(self.run_store, RunStoreView) and not self._validated_is_combined:
+            # The view is on the store owned by this run, new runs take precedence over validated ones
+            store = self.run_store.store
+            store.extend(runs)
+            self.run_store = store.view(store.unique_indices())
+        elif isinstance(self.run_store, SQLiteRunView) and not self._validated_is_combined:
+            # The runs of the folder are kept in a sqlite-store, the view includes the new runs
+            self.run_store.extend(runs)
+        else:
+            if isinstance(self.run_store, (RunStoreView, SQLiteRunView)):
+                self.run_store = self.run_store.materialize()
+            self.run_store.extend(runs)
+        if trajectory:
+            self.trajectory.extend(trajectory)
+            self.incumbent = self.trajectory[-1]['incumbent']
+        self._original_runhistory = None
+        self._validated_runhistory = None
+        self._combined_runhistory = None
+        self._pimp = None
+        self._validator = None
+        self.epm_overlay = None
+        self._epm_runhistory = None
+        self.logger.debug("Appended %d runs and %d trajectory-entries", len(runs), len(trajectory or []))
+
+    def estimate_memory(self):
+        """ Rough estimate of the memory used by this run in bytes (used to bound caches, see `RunCache`) """
+        n_bytes = self.run_store.nbytes
+        if not self._validated_is_combined:
+            # Views of runs read from a folder point to stores owned by this run (derived runs share the container's)
+            stores = {id(v.store): v.store for v in [self.run_store, self._validated_runs] if
+                      isinstance(v, RunStoreView)}
+            n_bytes += sum([store.nbytes for store in stores.values()])
+        if self.epm_overlay is not None:
+            n_bytes += self.epm_overlay.nbytes
+        runhistories = [rh for rh in [self._original_runhistory, self._validated_runhistory,
+                                      self._combined_runhistory] if rh is not None]
+        n_bytes += sum([len(rh.data) for rh in runhistories]) * self._BYTES_PER_RUNHISTORY_ENTRY
+        if self._epm_runhistory is not None:
+            # Shares the real runs with the combined runhistory
+            n_bytes += len(self.epm_overlay) * self._BYTES_PER_RUNHISTORY_ENTRY
+        if self._pimp is not None:
+            n_bytes += len(self.run_store) * self._BYTES_PER_MODEL_SAMPLE
+        return n_bytes
+
+    def move_runs(self, sqlite_store, folder):
+        """Move the real runs (original and validated) of a run read from a folder into a `SQLiteRunStore`, the
+        run-store and the validated runs are views on the store afterwards.
+
+        Parameters
+        ----------
+        sqlite_store: SQLiteRunStore
+            store the runs are added to
+        folder: str
+            folder the runs belong to
+        """
+        store = self.run_store.store if isinstance(self.run_store, RunStoreView) else self.run_store
+        sqlite_store.extend(store, folder=folder)
+        self.run_store = SQLiteRunView(sqlite_store, folders=[folder])
+        if self._validated_runs is not None:
+            self._validated_runs = self.run_store.derive(unique=False, origins=[DataOrigin.EXTERNAL_SAME_INSTANCES])
+
+    def share_runs(self, directory=None):
+        """Move the real runs (original and validated) and the features of the scenario of a run read from a folder
+        into shared memory (see `SharedRunData <apidoc/cave.reader.shared_run_data>`_), e.g. to return a run read in a
+        worker-process without pickling them. The run holds no runs until `attach_runs` is called with the returned
+        handle (usually in another process).
+
+        Parameters
+        ----------
+        directory: str
+            directory of the shared memory (see `SharedArrays`)
+
+        Returns
+        -------
+        handle: SharedRunDataHandle
+            picklable handle of the shared runs
+        """
+        if not isinstance(self.run_store, RunStoreView) or self._validated_is_combined:
+            raise ValueError("Only the runs of a folder (read into memory) can be shared")
+        views = {'run_store': self.run_store.indices}
+        if self._validated_runs is not None:
+            views['validated_runs'] = self._validated_runs.indices
+        handle = SharedRunData(self.run_store.store, self.scenario, views=views, directory=directory).handle
+        self.run_store, self._validated_runs, self.scenario = None, None, None
+        return handle
+
+    def attach_runs(self, handle):
+        """Attach to runs shared with `share_runs`, without copying them. The shared memory is removed once the runs
+        are attached (they are released with this run).
+
+        Parameters
+        ----------
+        handle: SharedRunDataHandle
+            handle returned by `share_runs`
+        """
+        store, self.scenario, views = handle.attach()
+        handle.remove()
+        self.run_store = store.view(views['run_store'])
+        if 'validated_runs' in views:
+            self._validated_runs = store.view(views['validated_runs'])
 
     def get_identifier(self):
         return self.identify(self.path_to_folder, self.reduced_to_budgets)
 
     @classmethod
     def identify(cls, path, budget):
+        """ Identifier of a run, stable across processes and invocations (used for caching and output-directories).
+        Numerical budgets are normalized to floats, so `[1]` and `[1.0]` are identified as the same budget. """
         path = path if path is not None else "all_folders"
+        if isinstance(budget, (list, tuple)):
+            budget = [float(b) if isinstance(b, numbers.Real) else b for b in budget]
         budget = str(budget) if budget is not None else "all_budgets"
         res = "_".join([path, budget]).replace('/', '_')
-        if len(res) > len(str(hash(res))):
-            res = str(hash(res))
+        digest = hashlib.sha1(res.encode()).hexdigest()[:20]
+        if len(res) > len(digest):
+            res = digest
         return res
 
     def get_budgets(self):
-        return set([k.budget for k in self.original_runhistory.data.keys()])
+        return set(self.run_store.get_budgets(self.run_store.select(origins=[DataOrigin.INTERNAL])))
 
     @classmethod
     def from_folder(cls,
@@ -140,6 +376,7 @@ class ConfiguratorRun(object):
                     file_format: str='SMAC3',
                     validation_format: str='NONE',
                     output_dir=None,
+                    sqlite_store=None,
                     ):
         """Initialize scenario, runhistory and incumbent from folder
 
@@ -153,9 +390,13 @@ class ConfiguratorRun(object):
             in the scenario-object. since instance- and PCS-files are necessary,
             specify the path to the execution-dir of SMAC here
         file_format: string
-            from [SMAC2, SMAC3, BOHB, APT, CSV]
+            from [SMAC2, SMAC3, BOHB, APT, CSV] or a format registered with `register_reader`
         validation_format: string
             from [SMAC2, SMAC3, APT, CSV, NONE], in which format to look for validated data
+        sqlite_store: SQLiteRunStore
+            optional, out-of-core store that the runs of the folder are kept in (the run-store is a `SQLiteRunView`).
+            SMAC3-runhistories and runs of streaming readers (see `BaseReader.iter_runs`) are added to the store
+            without creating a RunHistory
         """
         logger = logging.getLogger("cave.ConfiguratorRun.{}".format(folder))
         logger.debug("Loading from \'%s\' with ta_exec_dir \'%s\' with file-format '%s' and validation-format %s. ",
@@ -171,7 +412,18 @@ class ConfiguratorRun(object):
 
         scenario = reader.get_scenario()
         scenario_sanity_check(scenario, logger)
-        original_runhistory = reader.get_runhistory(scenario.cs)
+        if sqlite_store is not None and isinstance(reader, SMAC3Reader):
+            sqlite_store.ingest_runhistory_json(reader.get_runhistory_fn(), scenario.cs, folder=folder)
+            original_runhistory = SQLiteRunView(sqlite_store, folders=[folder])
+        elif reader.streams_runs:
+            # Runs are added to the store batch by batch, without creating a RunHistory
+            if sqlite_store is not None:
+                sqlite_store.consume(reader.iter_runs(scenario.cs), folder=folder)
+                original_runhistory = SQLiteRunView(sqlite_store, folders=[folder])
+            else:
+                original_runhistory = RunStore().consume(reader.iter_runs(scenario.cs))
+        else:
+            original_runhistory = reader.get_runhistory(scenario.cs)
         validated_runhistory = None
 
         if validation_format == "NONE" or validation_format is None:
@@ -186,19 +438,22 @@ class ConfiguratorRun(object):
                         "it for evaluation. #configs in validated rh: %d",
                         folder, len(validated_runhistory.config_ids))
 
-        trajectory = reader.get_trajectory(scenario.cs)
+        trajectory = [entry for batch in reader.iter_trajectory(scenario.cs) for entry in batch]
 
-        return cls(scenario,
-                   original_runhistory,
-                   validated_runhistory,
-                   trajectory,
-                   options,
-                   path_to_folder=folder,
-                   ta_exec_dir=ta_exec_dir,
-                   file_format=file_format,
-                   validation_format=validation_format,
-                   output_dir=output_dir,
-                   )
+        cr = cls(scenario,
+                 original_runhistory,
+                 validated_runhistory,
+                 trajectory,
+                 options,
+                 path_to_folder=folder,
+                 ta_exec_dir=ta_exec_dir,
+                 file_format=file_format,
+                 validation_format=validation_format,
+                 output_dir=output_dir,
+                 )
+        if sqlite_store is not None and not isinstance(cr.run_store, SQLiteRunView):
+            cr.move_runs(sqlite_store, folder)
+        return cr
 
     def get_incumbent(self):
         return self.incumbent
@@ -209,7 +464,8 @@ class ConfiguratorRun(object):
         """
         Create ParameterImportance-object and use it's trained model for validation and further predictions.
         We pass a combined (original + validated) runhistory, so that the returned model will be based on as much
-        information as possible
+        information as possible. If another surrogate backend (or profile) is chosen in the [EPM]-options, a model of
+        that backend is trained on the same runs for validation instead.
 
         Parameters
         ----------
@@ -218,19 +474,46 @@ class ConfiguratorRun(object):
         """
         self.logger.debug("Using '%s' as output for pimp", alternative_output_dir if alternative_output_dir else
                           self.output_dir)
-        self.pimp = Importance(scenario=copy.deepcopy(self.scenario),
-                               runhistory=self.combined_runhistory,
-                               incumbent=self.incumbent if self.incumbent else self.default,
-                               save_folder=alternative_output_dir if alternative_output_dir is not None else self.output_dir,
-                               seed=self.rng.randint(1, 100000),
-                               max_sample_size=self.options['fANOVA'].getint("pimp_max_samples"),
-                               fANOVA_pairwise=self.options['fANOVA'].getboolean("fanova_pairwise"),
-                               preprocess=False,
-                               verbose=False,  # disable progressbars in pimp...
-                               )
+        incumbent = self.incumbent if self.incumbent else self.default
+        seed = self.rng.randint(1, 100000)
+        max_sample_size = self.options['fANOVA'].getint("pimp_max_samples")
+        fanova_pairwise = self.options['fANOVA'].getboolean("fanova_pairwise")
+        # Runs with the same data (e.g. aggregated over a single folder) share the Importance-object and its model
+        fingerprint = ModelRegistry.fingerprint('pimp', self.run_store.fingerprint(),
+                                                ModelRegistry.scenario_fingerprint(self.scenario),
+                                                incumbent.get_array(), seed, max_sample_size, fanova_pairwise)
+        self._pimp = ModelRegistry.get(fingerprint,
+                                       lambda: Importance(scenario=ScenarioCache.derive(self.scenario),
+                                                          runhistory=self.combined_runhistory,
+                                                          incumbent=incumbent,
+                                                          save_folder=alternative_output_dir if alternative_output_dir
+                                                          is not None else self.output_dir,
+                                                          seed=seed,
+                                                          max_sample_size=max_sample_size,
+                                                          fANOVA_pairwise=fanova_pairwise,
+                                                          preprocess=False,
+                                                          verbose=False,  # disable progressbars in pimp...
+                                                          ),
+                                       purpose='parameter importance (pimp)')
         # Validator (initialize without trajectory)
-        self.validator = Validator(self.scenario, None, None)
-        self.validator.epm = self.pimp.model
+        self._validator = Validator(self.scenario, None, None)
+        backend = get_backend_from_options(self.options)
+        if backend.name == 'smac' and backend.profile == 'default':
+            self._validator.epm = self._pimp.model
+        else:
+            self._validator.epm = self._train_epm(backend, seed)
+
+    def _train_epm(self, backend, seed):
+        """ Train a model of the surrogate backend on the combined runhistory (censored runtimes are imputed) """
+        X, y, _ = convert_data_for_epm(self.scenario, self.combined_runhistory, rng=np.random.RandomState(seed),
+                                       logger=self.logger, backend=backend)
+        if self.scenario.run_obj == 'runtime':
+            # The data is log-transformed for runtime-scenarios, the validator's model predicts runtimes (like pimp's)
+            y = np.exp(y)
+        types, bounds = get_types(self.scenario.cs, self.scenario.feature_array)
+        return ModelRegistry.get_forest(self.scenario.cs, types, bounds, X, y, seed,
+                                        instance_features=self.scenario.feature_array, purpose='epm-validation',
+                                        backend=backend)
 
     @timing
     def _validate_default_and_incumbents(self,
@@ -255,8 +538,16 @@ class ConfiguratorRun(object):
             with _changedir(ta_exec_dir):
                 # TODO determine # repetitions
                 new_rh = self.validator.validate('def+inc', 'train+test', 1, -1, runhistory=self.combined_runhistory)
-            self.validated_runhistory.update(new_rh)
-            self.combined_runhistory_rh.update(new_rh)
+            if not self._validated_is_combined:
+                validated = self._validated_runs.materialize() if self._validated_runs is not None else \
+                    self.run_store.overlay()
+                validated.update(new_rh, origin=DataOrigin.EXTERNAL_SAME_INSTANCES)
+                self._validated_runs = validated.view(np.arange(len(validated)))
+            if isinstance(self.run_store, (RunStoreView, SQLiteRunView)):
+                self.run_store = self.run_store.materialize()
+            self.run_store.update(new_rh, origin=DataOrigin.EXTERNAL_SAME_INSTANCES)
+            self.run_store.drop_duplicates()
+            self._validated_runhistory, self._combined_runhistory = None, None
         elif method == "epm":
             # Only do test-instances if features for test-instances are available
             instance_mode = 'train+test'
@@ -267,8 +558,13 @@ class ConfiguratorRun(object):
                                     "unintended usage and may lead to errors for some analysis-methods.")
                 instance_mode = 'train'
 
-            new_rh = self.validator.validate_epm('def+inc', instance_mode, 1, runhistory=self.combined_runhistory)
-            self.epm_runhistory.update(new_rh)
+            representatives = None
+            n_representatives = self.options['EPM'].getint('representative_instances')
+            if n_representatives > 0 and self.scenario.feature_dict:
+                representatives = RepresentativeInstances.from_scenario(self.scenario, n_representatives)
+            new_rh = validate_epm(self.validator, 'def+inc', instance_mode, 1, runhistory=self.combined_runhistory,
+                                  representatives=representatives)
+            self.epm_overlay.update(new_rh, origin=DataOrigin.EXTERNAL_SAME_INSTANCES)
         else:
             raise ValueError("Missing data method illegal (%s)", method)
         self.validator.traj = None  # Avoid usage-mistakes
@@ -325,9 +621,12 @@ class ConfiguratorRun(object):
 
     @classmethod
     def get_reader(cls, name, folder, ta_exec_dir):
-        """ Returns an appropriate reader for the specified format. """
+        """ Returns an appropriate reader for the specified format (formats registered with
+        `cave.reader.base_reader.register_reader` take precedence). """
         # TODO make autodetect format (here? where?)
-        if name == 'SMAC3':
+        if get_custom_reader(name) is not None:
+            return get_custom_reader(name)(folder, ta_exec_dir)
+        elif name == 'SMAC3':
             return SMAC3Reader(folder, ta_exec_dir)
         elif name == 'BOHB':
             return SMAC3Reader(folder, ta_exec_dir)
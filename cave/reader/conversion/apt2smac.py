@@ -18,7 +18,7 @@ class APT2SMAC(BaseConverter):
             "converted_dest=%s", str(folders), str(ta_exec_dirs), str(output_dir), str(converted_dest))
 
         # Using temporary files for the intermediate smac-result-like format if no output_dir specified
-        if not output_dir:
+        if not output_dir and self.write_to_disk:
             output_dir = tempfile.mkdtemp()
             self.logger.debug("Temporary directory for intermediate SMAC3-results: %s", output_dir)
         if ta_exec_dirs is None or len(ta_exec_dirs) == 0:
@@ -27,7 +27,8 @@ class APT2SMAC(BaseConverter):
             ta_exec_dirs = [ta_exec_dirs[0] for _ in folders]
 
         self.logger.info("Assuming APT builds on hpbandster-format...")
-        results = HpBandSter2SMAC().convert(folders, ta_exec_dirs, output_dir, converted_dest)
+        results = HpBandSter2SMAC(write_to_disk=self.write_to_disk,
+                                  n_jobs=self.n_jobs).convert(folders, ta_exec_dirs, output_dir, converted_dest)
 
         self.logger.info("Assuming APT logs in tensorboard-files")
         tf_paths = {}
@@ -37,7 +38,10 @@ class APT2SMAC(BaseConverter):
             for root, d_names, f_names in os.walk(folder):
                 for f in f_names:
                     if 'tfevents' in f:
-                        dst = shutil.copyfile(os.path.join(root, f), os.path.join(result['new_path'], f))
+                        if self.write_to_disk:
+                            dst = shutil.copyfile(os.path.join(root, f), os.path.join(result['new_path'], f))
+                        else:
+                            dst = os.path.join(root, f)
                         tf_paths[folder].append(dst)
         for f, paths in tf_paths.items():
             if len(paths) == 0:
@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ProcessPoolExecutor
 
 
 class BaseConverter(object):
@@ -8,10 +9,54 @@ class BaseConverter(object):
     You can pass additional (arbitrary) python objects to CAVE by simply placing them in the returned dictionary.
     All custom key-value pairs in the dictionary will be available in CAVE's
     `RunsContainer <apidoc/cave.reader.runs_container>`_ as a dictionary `RunsContainer.share_information`.
+
+    By default, the converted data is only kept in memory. Only if `write_to_disk` is set, the converted runs are also
+    saved in SMAC3-format to the output-directory (e.g. to analyze them with other tools).
     """
-    def __init__(self):
+    def __init__(self, write_to_disk=False, n_jobs=1):
+        """
+        Parameters
+        ----------
+        write_to_disk: bool
+            if True, save converted runs in SMAC3-format to `output_dir/converted_dest`
+        n_jobs: int
+            number of processes to convert folders in parallel
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        self.write_to_disk = write_to_disk
+        self.n_jobs = n_jobs
+
+    def __getstate__(self):
+        d = dict(self.__dict__)
+        del d['logger']
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
         self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
 
+    def _map(self, func, *iterables):
+        """Apply func to the folders (and according arguments) in `iterables`, using `self.n_jobs` processes.
+
+        Parameters
+        ----------
+        func: callable
+            picklable function (e.g. a method of this converter) that converts a single folder
+        iterables: List
+            arguments for func, one list per argument
+
+        Returns
+        -------
+        results: List
+            results of func, in the same order as the arguments
+        """
+        args = list(zip(*iterables))
+        if self.n_jobs <= 1 or len(args) <= 1:
+            return [func(*a) for a in args]
+        self.logger.info("Converting %d folders using %d processes", len(args), min(self.n_jobs, len(args)))
+        with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(args))) as executor:
+            return list(executor.map(func, *zip(*args)))
+
     def convert(self, folders, ta_exec_dirs=None, output_dir=None, converted_dest='converted_input_data'):
         """Convert specific format results into SMAC3-format.
 
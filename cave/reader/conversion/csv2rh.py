@@ -8,10 +8,11 @@ from ConfigSpace import ConfigurationSpace
 from ConfigSpace.hyperparameters import UniformFloatHyperparameter
 from ConfigSpace.read_and_write import pcs
 from ConfigSpace.util import deactivate_inactive_hyperparameters, fix_types
-from smac.runhistory.runhistory import RunHistory, DataOrigin
+from smac.runhistory.runhistory import DataOrigin
 from smac.tae.execute_ta_run import StatusType
 from smac.utils.io.input_reader import InputReader
 
+from cave.reader.run_store import RunStore, NO_SEED
 from cave.utils.io import load_csv_to_pandaframe
 
 
@@ -89,8 +90,9 @@ class CSV2RH(object):
                              not c in parameters]
 
         for c in set(self.valid_values).intersection(set(data.columns)):
-            # Cast to numeric
-            data[c] = data[c].apply(pd.to_numeric, errors='ignore')
+            # Cast to numeric (element-wise, values that cannot be interpreted as numbers are kept)
+            numeric = pd.to_numeric(data[c], errors='coerce')
+            data[c] = numeric.where(numeric.notna() | data[c].isna(), data[c])
 
         data, id_to_config = self.extract_configs(data, cs, id_to_config)
         data, id_to_inst_feats = self.extract_instances(data, feature_names,
@@ -99,23 +101,33 @@ class CSV2RH(object):
                           'seed' in data.columns, 'cost' in data.columns,
                           'time' in data.columns, 'status' in data.columns, 'budget' in data.columns)
 
-        # Create RunHistory
-        rh = RunHistory()
-
-        def add_to_rh(row):
-            new_status = self._interpret_status(row['status']) if 'status' in row else StatusType.SUCCESS
-            rh.add(config=id_to_config[row['config_id']],
-                   cost=row['cost'],
-                   time=row['time'] if 'time' in row else -1,
-                   status=new_status,
-                   instance_id=row['instance_id'] if 'instance_id' in row else None,
-                   seed=row['seed'] if 'seed' in row else None,
-                   budget=row['budget'] if 'budget' in row else 0,
-                   additional_info=None,
-                   origin=DataOrigin.INTERNAL)
-
-        data.apply(add_to_rh, axis=1)
-        return rh
+        # Create RunHistory (via a RunStore, which is filled in bulk)
+        store = RunStore()
+        n_runs = len(data)
+        config_codes, config_uniques = pd.factorize(data['config_id'])
+        config_map = np.array([store.intern_config(id_to_config[c]) for c in config_uniques], dtype=np.int32)
+        if 'instance_id' in data.columns:
+            inst_codes, inst_uniques = pd.factorize(data['instance_id'])
+            inst_map = np.array([store.intern_instance(i) for i in inst_uniques], dtype=np.int32)
+            instance_idx = inst_map[inst_codes]
+        else:
+            instance_idx = np.full(n_runs, store.intern_instance(None), dtype=np.int32)
+        if 'seed' in data.columns:
+            seed = pd.to_numeric(data['seed']).fillna(NO_SEED).values
+        else:
+            seed = np.full(n_runs, NO_SEED)
+        store.add_runs(config_idx=config_map[config_codes],
+                       instance_idx=instance_idx,
+                       seed=seed,
+                       budget=data['budget'].values if 'budget' in data.columns else np.zeros(n_runs),
+                       cost=data['cost'].values,
+                       time=data['time'].values if 'time' in data.columns else np.full(n_runs, -1),
+                       status=(self._interpret_status_column(data['status']) if 'status' in data.columns
+                               else np.full(n_runs, StatusType.SUCCESS.value)),
+                       origin=np.full(n_runs, DataOrigin.INTERNAL.value),
+                       )
+        self.run_store = store
+        return store.to_runhistory()
 
     def create_cs_from_pandaframe(self, data):
         # TODO use from pyimp after https://github.com/automl/ParameterImportance/issues/72 is implemented
@@ -168,6 +180,23 @@ class CSV2RH(object):
             status = StatusType.CRASHED
         return status
 
+    def _interpret_status_column(self, status):
+        """Interpret a column of status-strings at once (see `_interpret_status`).
+
+        Parameters
+        ----------
+        status: pd.Series
+            status-strings
+
+        Returns
+        -------
+        status: np.array
+            values of the interpreted StatusTypes
+        """
+        codes, uniques = pd.factorize(status.astype(str))
+        values = np.array([self._interpret_status(str(s)).value for s in uniques], dtype=np.int8)
+        return values[codes]
+
     def extract_configs(self, data, cs: ConfigurationSpace, id_to_config=None):
         """
         After completion, every unique configuration in the data will have a
@@ -212,19 +241,17 @@ class CSV2RH(object):
                              "containing the necessary information.")
 
         if 'config_id' not in data.columns:
-            # Map to configurations
-            ids_in_order = []
-            data['config_id'] = -1
-
-            def add_config(row):
-                values = {name: row[name] for name in parameters if row[name] != ''}
+            # Map to configurations, every unique combination of parameter-values is only interpreted once
+            group_idx = data[parameters].astype(str).groupby(parameters, sort=False).ngroup().values
+            first_rows = data[parameters][~pd.Series(group_idx).duplicated().values]
+            group_to_id = np.empty(len(first_rows), dtype=np.int64)
+            for idx, row in enumerate(first_rows.to_dict('records')):
+                values = {name: value for name, value in row.items() if value != ''}
                 config = deactivate_inactive_hyperparameters(fix_types(values, cs), cs)
                 if config not in config_to_id:
                     config_to_id[config] = len(config_to_id)
-                row['config_id'] = config_to_id[config]
-                return row
-
-            data = data.apply(add_config, axis=1)
+                group_to_id[idx] = config_to_id[config]
+            data['config_id'] = group_to_id[group_idx]
             id_to_config = {conf: name for name, conf in config_to_id.items()}
 
         data["config_id"] = pd.to_numeric(data["config_id"])
@@ -271,21 +298,18 @@ class CSV2RH(object):
         if 'instance_id' in data.columns and not features:
             raise ValueError("Instances defined via \'instance_id\'-column, but no instance features available.")
         elif 'instance_id' not in data.columns and feature_names:
-            # Add new column for instance-ids
-            data['instance_id'] = -1
-            self.old = None
-
-            def add_instance(row):
-                row_features = tuple([str(row[idx]) for idx in feature_names])
+            # Add new column for instance-ids, every unique feature-vector is only interpreted once
+            str_features = data[feature_names].astype(str)
+            group_idx = str_features.groupby(feature_names, sort=False).ngroup().values
+            first_rows = str_features[~pd.Series(group_idx).duplicated().values]
+            group_to_id = np.empty(len(first_rows), dtype=np.int64)
+            for idx, row_features in enumerate(first_rows.itertuples(index=False, name=None)):
                 if row_features not in inst_feats_to_id:
                     new_id = len(inst_feats_to_id)
                     inst_feats_to_id[row_features] = new_id
-                    id_to_inst_feats[new_id] = features
-                row['instance_id'] = inst_feats_to_id[row_features]
-                self.old = row_features
-                return row
-
-            data = data.apply(add_instance, axis=1)
+                    id_to_inst_feats[new_id] = row_features
+                group_to_id[idx] = inst_feats_to_id[row_features]
+            data['instance_id'] = group_to_id[group_idx]
         else:
             self.logger.info("No instances detected.")
         id_to_inst_feats = {i: np.array(f).astype('float64') for i, f in id_to_inst_feats.items()}
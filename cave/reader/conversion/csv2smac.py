@@ -13,6 +13,7 @@ from smac.utils.io.traj_logging import TrajLogger
 from cave.reader.base_reader import changedir
 from cave.reader.conversion.base_converter import BaseConverter
 from cave.reader.conversion.csv2rh import CSV2RH
+from cave.reader.directory_index import DirectoryIndex
 from cave.utils.helpers import get_folder_basenames
 from cave.utils.io import load_config_csv, load_csv_to_pandaframe
 
@@ -27,9 +28,10 @@ class CSV2SMAC(BaseConverter):
                           "converted_dest=%s", str(folders), str(ta_exec_dirs), str(output_dir), str(converted_dest))
 
         # Using temporary files for the intermediate smac-result-like format if no output_dir specified
-        if not output_dir:
+        if not output_dir and self.write_to_disk:
             output_dir = tempfile.mkdtemp()
             self.logger.debug("Temporary directory for intermediate SMAC3-results: %s", output_dir)
+        output_dir = output_dir if output_dir else ''
         if ta_exec_dirs is None or len(ta_exec_dirs) == 0:
             ta_exec_dirs = ['.']
         if len(ta_exec_dirs) != len(folders):
@@ -39,53 +41,58 @@ class CSV2SMAC(BaseConverter):
         # Actual conversion #
         #####################
         folder_basenames = get_folder_basenames(folders)
-        result = OrderedDict()
-        for f, f_base, ta_exec_dir in zip(folders, folder_basenames, ta_exec_dirs):  # Those are the parallel runs
-            converted_folder_path = os.path.join(output_dir, converted_dest, f_base)
-            self.logger.debug("Processing folder=%s, f_base=%s, ta_exec_dir=%s. Saving to %s.",
-                              f, f_base, ta_exec_dir, converted_folder_path)
-            if not os.path.exists(converted_folder_path):
-                self.logger.debug("%s doesn't exist. Creating...", converted_folder_path)
-                os.makedirs(converted_folder_path)
-
-            # Get and write scenario # (todo: enhancement: make scenario-file optional (build from scratch))
-            scenario_file_path = os.path.join(converted_folder_path, 'scenario.txt')
-            scenario = self.get_scenario(f, ta_exec_dir=ta_exec_dir, out_path=scenario_file_path)
-
-            # Read Configuration Space
-            config_space = scenario.cs
-            #config_space = self.load_configspace(f)
+        converted_folder_paths = [os.path.join(output_dir, converted_dest, f_base) for f_base in folder_basenames]
+        # Those are the parallel runs
+        converted = self._map(self._convert_folder, folders, ta_exec_dirs, converted_folder_paths)
+        return OrderedDict(zip(folders, converted))
+
+    def _convert_folder(self, folder, ta_exec_dir, converted_folder_path):
+        """ Convert a single folder (executed in a worker-process if n_jobs > 1) """
+        self.logger.debug("Processing folder=%s, ta_exec_dir=%s (converted path: %s, write to disk: %s)",
+                          folder, ta_exec_dir, converted_folder_path, self.write_to_disk)
+        if self.write_to_disk and not os.path.exists(converted_folder_path):
+            self.logger.debug("%s doesn't exist. Creating...", converted_folder_path)
+            os.makedirs(converted_folder_path)
+
+        # Get scenario # (todo: enhancement: make scenario-file optional (build from scratch))
+        scenario_file_path = os.path.join(converted_folder_path, 'scenario.txt') if self.write_to_disk else ''
+        scenario = self.get_scenario(folder, ta_exec_dir=ta_exec_dir, out_path=scenario_file_path)
+
+        # Read Configuration Space
+        config_space = scenario.cs
+        if self.write_to_disk:
             scenario.paramfile = os.path.join(converted_folder_path, 'configspace.json')
             with open(scenario.paramfile, 'w') as new_file:
                 new_file.write(pcs_json.write(config_space))
 
-            # Read runhistory.csv and write runhistory.json(s)
-            runhistory = self.get_runhistory(f, scenario, 'runhistory.csv')
+        # Read runhistory.csv (and write runhistory.json(s))
+        runhistory = self.get_runhistory(folder, scenario, 'runhistory.csv')
+        if self.write_to_disk:
             runhistory.save_json(os.path.join(converted_folder_path, 'runhistory.json'))
-            try:
-                validated_runhistory = self.get_runhistory(f, scenario, 'validated_runhistory.csv')
+        try:
+            validated_runhistory = self.get_runhistory(folder, scenario, 'validated_runhistory.csv')
+            if self.write_to_disk:
                 validated_runhistory.save_json(os.path.join(converted_folder_path, 'validated_runhistory.json'))
-            except FileNotFoundError:
-                validated_runhistory = None
-                self.logger.debug("No file detected at \"%s\"", os.path.join(f, 'validated_runhistory.csv'))
+        except FileNotFoundError:
+            validated_runhistory = None
+            self.logger.debug("No file detected at \"%s\"", os.path.join(folder, 'validated_runhistory.csv'))
 
-            # Read trajectory. # (todo: enhancement: make trajectory-file (read it from runhistory?))
-            trajectory = self.get_trajectory(f, config_space, scenario, converted_folder_path)
+        # Read trajectory. # (todo: enhancement: make trajectory-file (read it from runhistory?))
+        trajectory = self.get_trajectory(folder, config_space, scenario, converted_folder_path)
 
+        if self.write_to_disk:
             # After (possibly) changing paths and options (or creating the object), (over)write to new location
             scenario.output_dir_for_this_run = converted_folder_path
             scenario.write()
 
-            result[f] = {
-                'new_path': converted_folder_path,
-                'config_space': config_space,
-                'runhistory': runhistory,
-                'validated_runhistory': validated_runhistory,
-                'scenario': scenario,
-                'trajectory': trajectory,
-            }
-
-        return result
+        return {
+            'new_path': converted_folder_path,
+            'config_space': config_space,
+            'runhistory': runhistory,
+            'validated_runhistory': validated_runhistory,
+            'scenario': scenario,
+            'trajectory': trajectory,
+        }
 
     def get_runhistory(self, folder, scenario, filename='runhistory.csv'):
         """Reads runhistory in csv-format:
@@ -155,7 +162,7 @@ class CSV2SMAC(BaseConverter):
 
         Sideeffect
         ----------
-        Writes trajectory to trajectory-file in output-dir
+        Writes trajectory to trajectory-file in output-dir (only if `self.write_to_disk`)
 
         Returns
         -------
@@ -168,7 +175,7 @@ class CSV2SMAC(BaseConverter):
                                     "-file at \'{}\'.".format(traj_fn))
 
         csv_data = load_csv_to_pandaframe(traj_fn, self.logger, apply_numeric=False)
-        traj_logger = TrajLogger(output_path, Stats(scenario))
+        traj_logger = TrajLogger(output_path if self.write_to_disk else None, Stats(scenario))
 
         csv_data, configs = CSV2RH().extract_configs(csv_data, cs, self.id_to_config)
         def add_to_traj(row):
@@ -183,13 +190,14 @@ class CSV2SMAC(BaseConverter):
                 "budget": float(row["budget"]) if "budget" in row else 0,
             }
             traj_logger.trajectory.append(new_entry)
-            traj_logger._add_in_alljson_format(train_perf=new_entry['cost'],
-                                               incumbent_id=row['config_id'],
-                                               incumbent=new_entry['incumbent'],
-                                               budget=new_entry['budget'],
-                                               ta_time_used=new_entry['cpu_time'],
-                                               wallclock_time=new_entry['wallclock_time'],
-                                               )
+            if self.write_to_disk:
+                traj_logger._add_in_alljson_format(train_perf=new_entry['cost'],
+                                                   incumbent_id=row['config_id'],
+                                                   incumbent=new_entry['incumbent'],
+                                                   budget=new_entry['budget'],
+                                                   ta_time_used=new_entry['cpu_time'],
+                                                   wallclock_time=new_entry['wallclock_time'],
+                                                   )
         csv_data.apply(add_to_traj, axis=1)
 
         return traj_logger.trajectory
@@ -214,9 +222,10 @@ class CSV2SMAC(BaseConverter):
     @classmethod
     def check_for_files(cls, path):
         """ Returns True if all files needed for CSV formatted results are detected in target folder """
-        if (os.path.isfile(os.path.join(path, 'scenario.txt'))
-            and os.path.isfile(os.path.join(path, 'runhistory.csv'))
-            and os.path.isfile(os.path.join(path, 'trajectory.csv'))
+        index = DirectoryIndex.get(path)
+        if (index.isfile('scenario.txt')
+            and index.isfile('runhistory.csv')
+            and index.isfile('trajectory.csv')
         ):
             return True
         return False
@@ -1,4 +1,4 @@
-import itertools
+import json
 import os
 import tempfile
 from collections import OrderedDict
@@ -33,9 +33,10 @@ class HpBandSter2SMAC(BaseConverter):
                           " converted_dest=%s", str(folders), str(ta_exec_dirs), str(output_dir), str(converted_dest))
 
         # Using temporary files for the intermediate smac-result-like format if no output_dir specified
-        if not output_dir:
+        if not output_dir and self.write_to_disk:
             output_dir = tempfile.mkdtemp()
             self.logger.debug("Temporary directory for intermediate SMAC3-results: %s", output_dir)
+        output_dir = output_dir if output_dir else ''
         if ta_exec_dirs is None or len(ta_exec_dirs) == 0:
             ta_exec_dirs = ['.']
         if len(ta_exec_dirs) != len(folders):
@@ -43,7 +44,7 @@ class HpBandSter2SMAC(BaseConverter):
 
         # Get a list with alternative interpretations of the configspace-file
         # (if it's a .pcs-file, for .json-files it's a length-one-list)
-        cs_interpretations = self.load_configspace(folders[0])
+        cs_interpretations = self.load_configspace(folders[0], folders)
         self.logger.debug("Loading with %d configspace alternative options...", len(cs_interpretations))
         self.logger.info("Assuming BOHB treats target algorithms as deterministic (and does not re-evaluate)")
 
@@ -51,35 +52,42 @@ class HpBandSter2SMAC(BaseConverter):
         # Actual conversion #
         #####################
         folder_basenames = get_folder_basenames(folders)
-        result = OrderedDict()
-        for f, f_base, ta_exec_dir in zip(folders, folder_basenames, ta_exec_dirs):  # Those are the parallel runs
-            converted_folder_path = os.path.join(output_dir, converted_dest, f_base)
-            self.logger.debug("Processing folder=%s, f_base=%s, ta_exec_dir=%s. Saving to %s.",
-                              f, f_base, ta_exec_dir, converted_folder_path)
-            if not os.path.exists(converted_folder_path):
-                self.logger.debug("%s doesn't exist. Creating...", converted_folder_path)
-                os.makedirs(converted_folder_path)
-
-            # Original hpbandster-formatted result-object
-            hp_result = logged_results_to_HBS_result(f)
-            result[f] = self.hpbandster2smac(f, hp_result, cs_interpretations, converted_folder_path)
-
-        return result
-
-    def load_configspace(self, folder):
+        converted_folder_paths = [os.path.join(output_dir, converted_dest, f_base) for f_base in folder_basenames]
+        # Those are the parallel runs
+        converted = self._map(self._convert_folder, folders, converted_folder_paths, [cs_interpretations] * len(folders))
+        return OrderedDict(zip(folders, converted))
+
+    def _convert_folder(self, folder, converted_folder_path, cs_options):
+        """ Convert a single folder (executed in a worker-process if n_jobs > 1) """
+        from hpbandster.core.result import logged_results_to_HBS_result
+        self.logger.debug("Processing folder=%s (converted path: %s, write to disk: %s)",
+                          folder, converted_folder_path, self.write_to_disk)
+        if self.write_to_disk and not os.path.exists(converted_folder_path):
+            self.logger.debug("%s doesn't exist. Creating...", converted_folder_path)
+            os.makedirs(converted_folder_path)
+
+        # Original hpbandster-formatted result-object
+        hp_result = logged_results_to_HBS_result(folder)
+        return self.hpbandster2smac(folder, hp_result, cs_options, converted_folder_path)
+
+    def load_configspace(self, folder, config_folders=None):
         """
-        Will try to load the configspace. cs_options will be a list containing all possible
-        combinations of interpretation for Categoricals. If this issue will be fixed, we can drop this procedure.
+        Will try to load the configspace. For .pcs-files the type of categorical values (bool, int or str) is lost, so
+        the type is inferred for each categorical individually from the values observed in the hpbandster-results
+        (configs.json). If this issue will be fixed, we can drop this procedure.
 
         Parameters
         ----------
         folder: str
             path to folder in which to look for configspace
+        config_folders: List[str]
+            folders with configs.json-files from which to infer the types of categoricals, defaults to [folder]
 
         Returns
         -------
         cs_options: list[ConfigurationSpace]
-            list with possible interpretations for config-space-file. Only contains multiple items if file-format is pcs.
+            list with the interpretation of the config-space-file (always contains a single item, kept as list for
+            backwards compatibility).
         """
         cs_options = []
         cs_fn_json = os.path.join(folder, 'configspace.json')
@@ -92,9 +100,10 @@ class HpBandSter2SMAC(BaseConverter):
         elif os.path.exists(cs_fn_pcs):
             with open(cs_fn_pcs, 'r') as fh:
                 cs = pcs_new.read(fh.readlines())
-            # Create alternative interpretations
             categoricals = [hp for hp in cs.get_hyperparameters() if isinstance(hp, CategoricalHyperparameter)]
             non_categoricals = [hp for hp in cs.get_hyperparameters() if not isinstance(hp, CategoricalHyperparameter)]
+            observed = self._observed_values(config_folders if config_folders else [folder],
+                                             [hp.name for hp in categoricals])
 
             def _get_interpretations(choices):
                 """ Generate different interpretations for critical categorical hyperparameters that are not seamlessly
@@ -104,26 +113,50 @@ class HpBandSter2SMAC(BaseConverter):
                     result.append([True, False])
                 if all([c.isdigit() for c in choices]):
                     result.append([int(c) for c in choices])
-                result.append(choices)
+                result.append(list(choices))
                 return result
 
-            choices_per_cat = [_get_interpretations(hp.choices) for hp in categoricals]
-            combinations = itertools.product(*choices_per_cat)
-            self.logger.debug(combinations)
-            for combi in combinations:
-                bcs = ConfigurationSpace()
-                for hp in non_categoricals:
-                    bcs.add_hyperparameter(hp)
-                for name, choices in zip([hp.name for hp in categoricals], combi):
-                    bcs.add_hyperparameter(CategoricalHyperparameter(name, choices))
-                bcs.add_conditions(cs.get_conditions())
-                cs_options.append(bcs)
-
-            self.logger.debug("Sampled %d interpretations of \"%s\"", len(cs_options), cs_fn_pcs)
+            bcs = ConfigurationSpace()
+            for hp in non_categoricals:
+                bcs.add_hyperparameter(hp)
+            for hp in categoricals:
+                interpretations = _get_interpretations(hp.choices)
+                # Choose the first interpretation that contains all observed values (with matching types)
+                values = observed[hp.name]
+                choices = next((i for i in interpretations if values <= set([(type(c), c) for c in i])),
+                               interpretations[0])
+                self.logger.debug("Interpreting choices of \"%s\" as %s", hp.name, str(choices))
+                bcs.add_hyperparameter(CategoricalHyperparameter(hp.name, choices))
+            bcs.add_conditions(cs.get_conditions())
+            cs_options.append(bcs)
         else:
             raise ValueError("Missing pcs-file at '%s.[pcs|json]'!" % os.path.join(folder, 'configspace'))
         return cs_options
 
+    def _observed_values(self, folders, names):
+        """Collect all values of the given hyperparameters in hpbandster's configs.json-files.
+
+        Returns
+        -------
+        observed: Dict[str, Set[Tuple[type, object]]]
+            mapping hyperparameter-names to the (type, value)-pairs observed
+        """
+        observed = {name: set() for name in names}
+        for folder in folders:
+            configs_fn = os.path.join(folder, 'configs.json')
+            if not os.path.exists(configs_fn):
+                self.logger.debug("No configs.json in %s to infer types of categoricals", folder)
+                continue
+            with open(configs_fn, 'r') as fh:
+                for line in fh:
+                    if not line.strip():
+                        continue
+                    config = json.loads(line)[1]
+                    for name in names:
+                        if name in config:
+                            observed[name].add((type(config[name]), config[name]))
+        return observed
+
     def _get_config(self, config_id, id2config, cs):
         config = Configuration(cs, id2config[config_id]['config'])
         try:
@@ -145,8 +178,8 @@ class HpBandSter2SMAC(BaseConverter):
         cs_options: list[ConfigurationSpace]
             the configuration spaces. in the best case it's a single element, but for pcs-format we need to guess
             through a list of possible configspaces
-        output_dir_base: str
-            the output-dir to save the smac-runs to
+        output_dir: str
+            the output-dir to save the smac-runs to (only written to if `self.write_to_disk`)
         
         Returns
         -------
@@ -168,9 +201,10 @@ class HpBandSter2SMAC(BaseConverter):
         id2config_mapping = result.get_id2config_mapping()
         skipped = {'None' : 0, 'NaN' : 0}
         rh = RunHistory()
+        configs = {}  # Configurations are created only once per config_id (not for every budget)
         for run in result.get_all_runs():
             # Load config...
-            config = None
+            config = configs.get(run.config_id)
             while config is None:
                 if len(cs_options) == 0:
                     self.logger.debug("None of the alternatives worked...")
@@ -181,8 +215,10 @@ class HpBandSter2SMAC(BaseConverter):
                 try:
                     config = self._get_config(run.config_id, id2config_mapping, cs_options[0])
                 except ValueError as err:
-                    self.logger.debug("Loading config failed. Trying %d alternatives" % len(cs_options) - 1, exc_info=1)
+                    self.logger.debug("Loading config failed. Trying %d alternatives" % (len(cs_options) - 1),
+                                      exc_info=1)
                     cs_options = cs_options[1:]  # remove the failing cs-version
+            configs[run.config_id] = config
 
             # Filter corrupted loss-values (ignore them)
             if run.loss is None:
@@ -207,18 +243,19 @@ class HpBandSter2SMAC(BaseConverter):
         ##########################
         scenario = Scenario({'run_obj': 'quality',
                              'cs': cs_options[0],
-                             'output_dir': output_dir,
+                             'output_dir': output_dir if self.write_to_disk else '',
                              'deterministic': True,  # At the time of writing, BOHB is always treating ta's as deterministic
                             })
-        scenario.output_dir_for_this_run = output_dir
-        scenario.write()
+        if self.write_to_disk:
+            scenario.output_dir_for_this_run = output_dir
+            scenario.write()
 
-        with open(os.path.join(output_dir, 'configspace.json'), 'w') as fh:
-            fh.write(pcs_json.write(cs_options[0]))
+            with open(os.path.join(output_dir, 'configspace.json'), 'w') as fh:
+                fh.write(pcs_json.write(cs_options[0]))
 
-        rh.save_json(fn=os.path.join(output_dir, 'runhistory.json'))
+            rh.save_json(fn=os.path.join(output_dir, 'runhistory.json'))
 
-        trajectory = self.get_trajectory(result, output_dir, scenario, rh)
+        trajectory = self.get_trajectory(result, output_dir, scenario, rh, configs=configs)
 
         return {'new_path': output_dir,
                 'hpbandster_result': result,
@@ -229,16 +266,22 @@ class HpBandSter2SMAC(BaseConverter):
                 'trajectory': trajectory,
                 }
 
-    def get_trajectory(self, result, output_path, scenario, rh):
+    def get_trajectory(self, result, output_path, scenario, rh, configs=None):
         """
         Use hpbandster's averaging.
+
+        Parameters
+        ----------
+        configs: Dict[int, Configuration]
+            optional, already created configurations per config_id (missing ones will be added)
         """
         cs = scenario.cs
+        configs = configs if configs is not None else {}
 
-        if not output_path:
+        if not output_path and self.write_to_disk:
             output_path = tempfile.mkdtemp()
 
-        traj_logger = TrajLogger(output_path, Stats(scenario))
+        traj_logger = TrajLogger(output_path if self.write_to_disk else None, Stats(scenario))
         total_traj_dict = []
         traj_dict = result.get_incumbent_trajectory()
 
@@ -249,7 +292,9 @@ class HpBandSter2SMAC(BaseConverter):
                                                  traj_dict['times_finished'],
                                                  traj_dict['budgets'],
                                                  traj_dict['losses']):
-            incumbent = self._get_config(config_id, id2config_mapping, cs)
+            if config_id not in configs:
+                configs[config_id] = self._get_config(config_id, id2config_mapping, cs)
+            incumbent = configs[config_id]
             try:
                 incumbent_id = rh.config_ids[incumbent]
             except KeyError as err:
@@ -290,11 +335,12 @@ class HpBandSter2SMAC(BaseConverter):
                 "incumbent": incumbent,
                 "budget": budget
             })
-            traj_logger._add_in_alljson_format(train_perf,
-                                               incumbent_id,
-                                               incumbent,
-                                               budget,
-                                               ta_time_used,
-                                               wallclock_time,
-                                               )
+            if self.write_to_disk:
+                traj_logger._add_in_alljson_format(train_perf,
+                                                   incumbent_id,
+                                                   incumbent,
+                                                   budget,
+                                                   ta_time_used,
+                                                   wallclock_time,
+                                                   )
         return traj_logger.trajectory
@@ -0,0 +1,108 @@
+import fnmatch
+import logging
+import os
+
+
+class DirectoryIndex(object):
+    """
+    Index of all files in a folder (recursively), built in one pass with `os.scandir`.
+
+    Readers and the file-format-detection look up files by name anywhere in the folder (like
+    `glob.glob(folder/**/fn, recursive=True)`). Globbing walks the whole tree for every single lookup, which is slow
+    for large output-trees (e.g. SMAC2 with thousands of state-files) or on network-filesystems. The index maps the
+    basenames of all files to their paths, so a lookup is a dictionary-access (or a match over the unique basenames
+    for wildcard-patterns).
+
+    Indices are shared per folder within a process (use `DirectoryIndex.get`). If the content of a folder changes,
+    the index needs to be invalidated (see `DirectoryIndex.invalidate`).
+    As with globbing, hidden files and directories (starting with '.') are ignored.
+    """
+
+    _indices = {}  # Shared indices, mapping absolute paths to DirectoryIndex-objects
+
+    def __init__(self, folder):
+        """
+        Parameters
+        ----------
+        folder: str
+            folder to index, paths returned by this index start with this string
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        self.folder = folder
+        self.files = {}       # basename -> list of paths relative to folder
+        self.rel_paths = set()
+        self._scan()
+
+    @classmethod
+    def get(cls, folder):
+        """ Return the shared index of a folder, building it if necessary. """
+        key = os.path.abspath(folder)
+        if key not in cls._indices or cls._indices[key].folder != folder:
+            cls._indices[key] = cls(folder)
+        return cls._indices[key]
+
+    @classmethod
+    def invalidate(cls, folder=None):
+        """ Drop the shared index of a folder (or of all folders, if None), so it's rebuilt on the next access. """
+        if folder is None:
+            cls._indices.clear()
+        else:
+            cls._indices.pop(os.path.abspath(folder), None)
+
+    def _scan(self):
+        if not os.path.isdir(self.folder):
+            return
+        visited = set()
+        stack = ['']
+        while stack:
+            rel_dir = stack.pop()
+            abs_dir = os.path.join(self.folder, rel_dir)
+            real = os.path.realpath(abs_dir)
+            if real in visited:  # avoid symlink-loops
+                continue
+            visited.add(real)
+            try:
+                entries = list(os.scandir(abs_dir))
+            except OSError as err:
+                self.logger.debug("Could not scan %s: %s", abs_dir, err)
+                continue
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                rel_path = os.path.join(rel_dir, entry.name)
+                try:
+                    if entry.is_dir():
+                        stack.append(rel_path)
+                    elif entry.is_file():
+                        self.files.setdefault(entry.name, []).append(rel_path)
+                        self.rel_paths.add(rel_path)
+                except OSError:
+                    continue
+        self.logger.debug("Indexed %d files in %s", len(self.rel_paths), self.folder)
+
+    def find(self, pattern):
+        """Find all files with a basename matching the pattern anywhere in the folder.
+
+        Parameters
+        ----------
+        pattern: str
+            basename of the file, may contain shell-style wildcards (e.g. `traj-run-*.txt`)
+
+        Returns
+        -------
+        paths: List[str]
+            paths (starting with `self.folder`) of all matching files
+        """
+        if _has_wildcards(pattern):
+            names = fnmatch.filter(self.files.keys(), pattern)
+        else:
+            names = [pattern] if pattern in self.files else []
+        return sorted([os.path.join(self.folder, p) for name in names for p in self.files[name]])
+
+    def isfile(self, rel_path):
+        """ Whether a file exists at the path (relative to `self.folder`), same as `os.path.isfile` """
+        return os.path.normpath(rel_path) in self.rel_paths
+
+
+def _has_wildcards(pattern):
+    return any(c in pattern for c in '*?[')
@@ -0,0 +1,352 @@
+import io
+import json
+import logging
+import os
+
+import numpy as np
+from ConfigSpace.configuration_space import Configuration
+from smac.runhistory.runhistory import DataOrigin
+from smac.tae.execute_ta_run import StatusType
+
+from cave.reader.base_reader import BaseReader
+from cave.reader.directory_index import DirectoryIndex
+from cave.reader.run_store import RunStore
+from cave.utils.json_stream import JsonStream
+
+
+class FileTail(object):
+    """
+    Reads the lines that were appended to a file since the last read (like `tail -f`). Only complete lines are
+    returned, a partially written last line is returned with the next read.
+    """
+
+    def __init__(self, fn, skip_lines=0):
+        """
+        Parameters
+        ----------
+        fn: str
+            path to the file (doesn't need to exist yet)
+        skip_lines: int
+            number of lines at the beginning of the file that are ignored (e.g. because they have already been read)
+        """
+        self.fn = fn
+        self.skip_lines = skip_lines
+        self.offset = 0
+
+    def read_lines(self):
+        """ New complete lines (decoded, without line-breaks) """
+        if not os.path.isfile(self.fn) or os.path.getsize(self.fn) == self.offset:
+            return []
+        with open(self.fn, 'rb') as fh:
+            fh.seek(self.offset)
+            content = fh.read()
+        end = content.rfind(b'\n') + 1
+        self.offset += end
+        lines = [line for line in content[:end].decode().split('\n') if line.strip()]
+        skip, self.skip_lines = min(self.skip_lines, len(lines)), max(0, self.skip_lines - len(lines))
+        return lines[skip:]
+
+
+class FolderWatcher(object):
+    """
+    Incrementally reads the runs and trajectory of a configurator-folder that is still being written (for CAVE's
+    watch-mode). Every `poll` returns only the data that was added since the last poll, which is appended to the
+    folder's ConfiguratorRun (see `ConfiguratorRun.append`).
+
+    Use `create` to get the watcher for a file-format. Subclasses implement `poll`.
+    """
+
+    def __init__(self, folder, configurator_run):
+        """
+        Parameters
+        ----------
+        folder: str
+            folder as passed to CAVE
+        configurator_run: ConfiguratorRun
+            run with all data of the folder that has already been read
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        self.folder = folder
+        self.configurator_run = configurator_run
+        self.cs = configurator_run.scenario.cs
+
+    @classmethod
+    def create(cls, folder, configurator_run, file_format, ta_exec_dir='.'):
+        """ Watcher for a folder in the given file-format, None if the format can't be watched. """
+        if file_format == 'SMAC3':
+            return SMAC3FolderWatcher(folder, configurator_run, ta_exec_dir)
+        if file_format == 'BOHB':
+            return BOHBFolderWatcher(folder, configurator_run)
+        logging.getLogger(cls.__module__ + '.' + cls.__name__).warning(
+            "Watching folders in format %s is not supported, %s is not updated.", file_format, folder)
+        return None
+
+    def poll(self):
+        """Read the data that was added since the last poll.
+
+        Returns
+        -------
+        runs, trajectory: RunStore, List[dict]
+            new original runs and new entries of the trajectory
+        """
+        raise NotImplementedError()
+
+
+class SMAC3FolderWatcher(FolderWatcher):
+    """
+    Watches a SMAC3-folder. SMAC rewrites the runhistory.json as a whole, but only appends new runs to its
+    "data"-section (and writes pure ASCII, so characters are bytes). So the position after the last known run is
+    remembered and on every change only the rest of the file is streamed (see `JsonStream`), which holds the new runs
+    and the configurations. If the bytes before that position changed, the whole file is streamed once. New runs are
+    diffed against the original runs of the folder by their keys (configuration, instance, seed and budget). The
+    traj.json is tailed line by line.
+
+    Files that are not found (yet) are looked up again with a fresh `DirectoryIndex` of the folder on every poll.
+    """
+
+    # Bytes before the end of the known runs that are compared to detect rewritten runs
+    _signature_size = 64
+
+    def __init__(self, folder, configurator_run, ta_exec_dir='.'):
+        super().__init__(folder, configurator_run)
+        self.ta_exec_dir = ta_exec_dir
+        self.rh_fn = None
+        self.traj_tail = None
+        self._rh_stat = None
+        # Runs in the "data"-section of the file up to `self._data_end` (initially, the runs read by the reader)
+        self._n_file_runs = len(configurator_run.run_store.select(origins=[DataOrigin.INTERNAL]))
+        self._data_end = None
+        self._signature = None
+        self._resumable = True  # False, if the file isn't ASCII (positions of characters aren't positions of bytes)
+        self._n_trajectory = len(configurator_run.trajectory)
+
+    def _locate(self, fn):
+        """ Path of a file in the folder (like the reader finds it), None if it doesn't exist (yet) """
+        path = os.path.join(self.folder, fn)
+        if os.path.isfile(path):
+            return path
+        # The index of the folder was built before the file was created
+        DirectoryIndex.invalidate(self.folder)
+        return BaseReader.get_glob_file(self.folder, fn, raise_on_failure=False) or None
+
+    def poll(self):
+        runs = RunStore()
+        if self.rh_fn is None or not os.path.isfile(self.rh_fn):
+            self.rh_fn = self._locate('runhistory.json')
+        stat = os.stat(self.rh_fn) if self.rh_fn is not None else None
+        if stat is not None and (stat.st_size, stat.st_mtime_ns) != self._rh_stat:
+            try:
+                runs = self._read_new_runs()
+            except ValueError as err:
+                # SMAC is probably writing the file right now, it is read again in the next poll
+                self.logger.debug("Reading %s failed (%s), retrying on next poll", self.rh_fn, err)
+            else:
+                self._rh_stat = (stat.st_size, stat.st_mtime_ns)
+
+        if self.traj_tail is None or not os.path.isfile(self.traj_tail.fn):
+            traj_fn = self._locate('traj.json')
+            if traj_fn is not None:
+                self.traj_tail = FileTail(traj_fn, skip_lines=self._n_trajectory)
+        trajectory = []
+        for line in (self.traj_tail.read_lines() if self.traj_tail is not None else []):
+            entry = json.loads(line)
+            entry['incumbent'] = Configuration(self.cs, entry['incumbent'])
+            trajectory.append(entry)
+        self._n_trajectory += len(trajectory)
+        return runs, trajectory
+
+    def _read_signature(self, end):
+        with open(self.rh_fn, 'rb') as fh:
+            fh.seek(max(0, end - self._signature_size))
+            return fh.read(min(end, self._signature_size))
+
+    def _read_new_runs(self):
+        """ Runs of the runhistory.json that are not known yet """
+        resume = self._data_end is not None and self._read_signature(self._data_end) == self._signature
+        try:
+            items, configs, config_origins, n_file_runs, data_end = self._stream(resume)
+        except UnicodeDecodeError:
+            self.logger.debug("%s is not ASCII, reading all of it on every change", self.rh_fn)
+            self._resumable = False
+            items, configs, config_origins, n_file_runs, data_end = self._stream(False)
+
+        store = self.configurator_run.run_store
+        runs = store.overlay()
+        for k, v in items:
+            config_id = int(k[0])
+            runs.add(config=Configuration(self.cs, values=configs[config_id],
+                                          origin=config_origins.get(str(config_id), None)),
+                     cost=float(v[0]),
+                     time=float(v[1]),
+                     status=StatusType(v[2]),
+                     instance_id=k[1],
+                     seed=int(k[2]) if k[2] is not None else None,
+                     budget=float(k[3]) if len(k) == 4 else 0.0,
+                     additional_info=v[3])
+        new = runs.select_unknown(store, store.select(origins=[DataOrigin.INTERNAL]))
+        if len(new) < len(runs):
+            self.logger.debug("Ignoring %d known runs in %s", len(runs) - len(new), self.rh_fn)
+            runs = runs.view(new).materialize()
+
+        self._n_file_runs, self._data_end = n_file_runs, data_end
+        self._signature = self._read_signature(data_end) if data_end is not None else None
+        return runs
+
+    def _stream(self, resume):
+        """Stream the runhistory.json, from the end of the known runs if `resume`, otherwise from the beginning.
+
+        Returns
+        -------
+        items: List
+            new items of the "data"-section (on the first read, all after the runs read by the reader)
+        configs, config_origins: Dict, Dict
+            configurations and their origins by id in the file
+        n_file_runs, data_end: int, int
+            number of runs in the file and the position after the last of them (None if unknown)
+        """
+        with open(self.rh_fn, 'rb') as raw:
+            start, prefix = 0, ''
+            if resume:
+                raw.seek(self._data_end)
+                head = raw.read(self._signature_size)
+                separator = head.lstrip()[:1]
+                if separator in [b',', b']']:
+                    # The rest of the "data"-list (after the separator) continues a document without the known runs
+                    start = self._data_end + len(head) - len(head.lstrip()) + (1 if separator == b',' else 0)
+                    prefix = '{"data": ['
+                else:
+                    self.logger.debug("Unexpected content after the known runs in %s, reading all of it", self.rh_fn)
+                    resume = False
+            raw.seek(start)
+            # Characters are bytes in ASCII, so positions in the stream are positions in the file
+            fh = io.TextIOWrapper(raw, encoding='ascii' if self._resumable else 'utf-8', newline='')
+            stream = JsonStream(_PrefixedReader(prefix, fh), sections=['data', 'configs', 'config_origins'],
+                                object_hook=StatusType.enum_hook)
+            # On the first read, the runs read by the reader are not buffered (after a rewrite, all runs are diffed)
+            skip = self._n_file_runs if not resume and self._signature is None else 0
+            items, configs, config_origins, n_seen = [], {}, {}, 0
+            data_end = self._data_end if resume else None
+            for section, item in stream.items():
+                if section == 'data':
+                    n_seen += 1
+                    if n_seen > skip:
+                        items.append(item)
+                    if self._resumable:
+                        data_end = start + stream.tell() - len(prefix)
+                elif section == 'configs':
+                    configs[int(item[0])] = item[1]
+                elif section == 'config_origins':
+                    config_origins[item[0]] = item[1]
+        n_file_runs = (self._n_file_runs if resume else 0) + n_seen
+        return items, configs, config_origins, n_file_runs, data_end
+
+
+class _PrefixedReader(object):
+    """ File-like object that returns a prefix before the content of a file """
+
+    def __init__(self, prefix, fh):
+        self.prefix = prefix
+        self.fh = fh
+
+    def read(self, size=-1):
+        if self.prefix:
+            prefix, self.prefix = self.prefix, ''
+            return prefix
+        return self.fh.read(size)
+
+
+class BOHBFolderWatcher(FolderWatcher):
+    """
+    Watches a folder written by hpbandster's `json_result_logger`. Both configs.json and results.json are only
+    appended to, so they are tailed line by line. New results are converted like in `HpBandSter2SMAC` and the
+    incumbent-trajectory is continued with hpbandster's rules (see `hpbandster.core.result.Result`). Results that were
+    already read are recognized by hpbandster's result (if shared by the reader) or by the runs of the folder.
+    """
+
+    def __init__(self, folder, configurator_run):
+        super().__init__(folder, configurator_run)
+        self.configs_tail = FileTail(os.path.join(folder, 'configs.json'))
+        self.results_tail = FileTail(os.path.join(folder, 'results.json'))
+        self.configs = {}     # config_id -> (config-dict, config_info)
+        self._configs = {}    # config_id -> Configuration
+        # Results that are part of the converted data (results.json is read from the beginning on the first poll)
+        result = configurator_run.share_information.get('hpbandster_result')
+        if result is not None:
+            self._known = {(tuple(config_id), float(budget)) for config_id, datum in result.data.items()
+                           for budget in datum.results.keys()}
+            self._known_runs = None
+        else:
+            # Without hpbandster's result, the results are compared to the runs of the folder (configuration, budget)
+            self.logger.debug("No hpbandster-result for %s, comparing results to the read runs", folder)
+            store = configurator_run.run_store
+            internal = store.select(origins=[DataOrigin.INTERNAL])
+            self._known = None
+            self._known_runs = set(zip(store.column('config_idx')[internal].tolist(),
+                                       store.column('budget')[internal].tolist()))
+        # State of hpbandster's incumbent-trajectory
+        self._incumbent_loss = np.inf
+        self._incumbent_budget = None
+
+    def _get_config(self, config_id):
+        if config_id not in self._configs:
+            values, info = self.configs[config_id]
+            config = Configuration(self.cs, values)
+            if isinstance(info, dict) and 'model_based_pick' in info:
+                config.origin = 'Model based pick' if info['model_based_pick'] else 'Random'
+            self._configs[config_id] = config
+        return self._configs[config_id]
+
+    def _is_known(self, config_id, budget):
+        """ Whether the result is part of the data read from the folder before watching """
+        if self._known is not None:
+            return (config_id, budget) in self._known
+        config_idx = self.configurator_run.run_store.configs.index(self._get_config(config_id))
+        return (config_idx, budget) in self._known_runs
+
+    def poll(self):
+        for line in self.configs_tail.read_lines():
+            entry = json.loads(line)
+            self.configs[tuple(entry[0])] = (entry[1], entry[2] if len(entry) == 3 else 'N/A')
+
+        results = []
+        for line in self.results_tail.read_lines():
+            config_id, budget, time_stamps, result, _ = json.loads(line)
+            results.append((tuple(config_id), float(budget), time_stamps, result))
+        if self._incumbent_budget is None and results:
+            self._incumbent_budget = min([r[1] for r in results])
+
+        runs, trajectory = RunStore(), []
+        for config_id, budget, time_stamps, result in sorted(results, key=lambda r: r[2]['finished']):
+            loss = result['loss'] if result is not None else None
+            if loss is None:
+                continue
+            entry = self._continue_trajectory(config_id, budget, time_stamps, loss)
+            if self._is_known(config_id, budget):
+                continue
+            if entry is not None:
+                trajectory.append(entry)
+            if np.isnan(loss):
+                continue
+            runs.add(config=self._get_config(config_id),
+                     cost=loss,
+                     time=time_stamps['finished'] - time_stamps['started'],
+                     status=StatusType.SUCCESS,
+                     budget=budget,
+                     seed=0,
+                     additional_info={'info': result['info'], 'timestamps': time_stamps})
+        return runs, trajectory
+
+    def _continue_trajectory(self, config_id, budget, time_stamps, loss):
+        """ Trajectory-entry, if the run is a new incumbent (see `Result.get_incumbent_trajectory`) """
+        new_incumbent = budget > self._incumbent_budget or loss < self._incumbent_loss
+        if budget < self._incumbent_budget or not new_incumbent:
+            return None
+        self._incumbent_loss, self._incumbent_budget = loss, budget
+        return {'cpu_time': -1,
+                'total_cpu_time': None,
+                'wallclock_time': time_stamps['finished'],
+                'evaluations': -1,
+                'cost': loss,
+                'incumbent': self._get_config(config_id),
+                'budget': budget,
+                }
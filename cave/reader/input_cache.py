@@ -0,0 +1,167 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+
+from cave.__version__ import __version__ as cave_version
+
+
+class InputCache(object):
+    """
+    Persistent on-disk cache for parsed (and converted) configurator-runs.
+
+    Every entry is identified by a fingerprint over the CAVE-version, the reading-parameters (file-format, ...) and the
+    content of all files in the input-folder. Files that the loaded data depends on, but that lie outside of the folder
+    (e.g. instance- or feature-files referenced by a scenario) are stored with the entry and verified on loading.
+
+    Hashing the content of large files is expensive, so the content-hashes are kept in an index, mapping
+    (path, size, mtime) to the hash. Only files that changed since the last invocation are hashed again.
+    Entries are pickled with the highest available protocol, which stores numpy-arrays (see `RunStore`) as raw bytes.
+    """
+
+    index_fn = 'file_hashes.json'
+
+    def __init__(self, cache_dir):
+        """
+        Parameters
+        ----------
+        cache_dir: str
+            directory to store the cache in, will be created if necessary
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._index = self._load_index()
+        self._index_changed = False
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.cache_dir, self.index_fn), 'r') as fh:
+                return json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_index(self):
+        """ Write hashes of all files seen so far to disk """
+        if not self._index_changed:
+            return
+        tmp_fn = os.path.join(self.cache_dir, self.index_fn + '.tmp')
+        with open(tmp_fn, 'w') as fh:
+            json.dump(self._index, fh)
+        os.replace(tmp_fn, os.path.join(self.cache_dir, self.index_fn))
+        self._index_changed = False
+
+    def file_hash(self, path):
+        """Content-hash of a file, only recomputed if size or mtime changed since last time.
+
+        Parameters
+        ----------
+        path: str
+            path to file
+
+        Returns
+        -------
+        hash: str
+            sha1-hexdigest of the file's content, None if the file does not exist
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        known = self._index.get(path)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        sha = hashlib.sha1()
+        with open(path, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b''):
+                sha.update(chunk)
+        self._index[path] = [stat.st_size, stat.st_mtime_ns, sha.hexdigest()]
+        self._index_changed = True
+        return sha.hexdigest()
+
+    def fingerprint(self, folder, exclude=None, **params):
+        """Fingerprint of a folder (content of all files in it, recursively) and the parameters used to read it.
+
+        Parameters
+        ----------
+        folder: str
+            path to input-folder
+        exclude: List[str]
+            directories that are skipped, if they lie in the folder (e.g. CAVE's output_dir, that changes with every
+            invocation). The cache's own directory is always skipped
+        params: dict
+            any parameters that influence how the folder is read (will be converted to strings)
+
+        Returns
+        -------
+        fingerprint: str
+            key for this cache
+        """
+        sha = hashlib.sha1()
+        sha.update(cave_version.encode())
+        for k in sorted(params):
+            sha.update('{}={}\n'.format(k, params[k]).encode())
+        exclude = {os.path.abspath(d) for d in (exclude if exclude else []) + [self.cache_dir]}
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = sorted([d for d in dirs if os.path.abspath(os.path.join(root, d)) not in exclude])
+            for fn in sorted(files):
+                path = os.path.join(root, fn)
+                sha.update('{}:{}\n'.format(os.path.relpath(path, folder), self.file_hash(path)).encode())
+        return sha.hexdigest()
+
+    def _entry_fn(self, fingerprint):
+        return os.path.join(self.cache_dir, fingerprint + '.pkl')
+
+    def load(self, fingerprint):
+        """Load a cached object.
+
+        Parameters
+        ----------
+        fingerprint: str
+            key, as returned by `fingerprint`
+
+        Returns
+        -------
+        obj: object
+            the cached object or None, if not available or if any of the files it depends on changed
+        """
+        fn = self._entry_fn(fingerprint)
+        if not os.path.isfile(fn):
+            return None
+        try:
+            with open(fn, 'rb') as fh:
+                entry = pickle.load(fh)
+        except Exception as err:
+            self.logger.debug("Could not load cache-entry %s (%s), ignoring it", fn, err)
+            return None
+        for path, file_hash in entry['dependencies'].items():
+            if self.file_hash(path) != file_hash:
+                self.logger.debug("Cache-entry %s is outdated, %s changed", fn, path)
+                return None
+        return entry['data']
+
+    def store(self, fingerprint, obj, dependencies=None):
+        """Save an object to the cache (best effort, errors are logged but not raised).
+
+        Parameters
+        ----------
+        fingerprint: str
+            key, as returned by `fingerprint`
+        obj: object
+            picklable object
+        dependencies: List[str]
+            paths to files outside of the fingerprinted folder the object depends on
+        """
+        dependencies = {os.path.abspath(p): self.file_hash(p) for p in (dependencies if dependencies else [])}
+        fn = self._entry_fn(fingerprint)
+        try:
+            with open(fn + '.tmp', 'wb') as fh:
+                pickle.dump({'dependencies': dependencies, 'data': obj}, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(fn + '.tmp', fn)
+        except Exception as err:
+            self.logger.warning("Could not write cache-entry for %s: %s", fingerprint, err)
+            if os.path.exists(fn + '.tmp'):
+                os.remove(fn + '.tmp')
+        self.save_index()
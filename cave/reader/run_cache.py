@@ -0,0 +1,98 @@
+import logging
+from collections import OrderedDict
+
+
+class RunCache(object):
+    """
+    In-memory LRU-cache for derived ConfiguratorRuns (aggregated over parallel runs or reduced to budgets).
+
+    Analyzers request the same derived runs over and over (e.g. one run per budget), and every derived run trains its
+    own models on first use. Keeping them in this cache shares them between all analyzers of a report.
+    The cache is bounded by a memory budget: the memory of every entry is estimated (see
+    `ConfiguratorRun.estimate_memory`) and the least recently used entries are evicted, when the total exceeds the
+    budget. Since runs grow when they are used (lazily created runhistories and models), the estimates are updated on
+    every insertion. The most recently inserted run is never evicted.
+
+    Analyzers share results through the runs (`ConfiguratorRun.share_information`, e.g. parameter importance that is
+    read by parallel coordinates), so the shared information is kept per identifier outside of the evictable runs. A
+    run that is recreated after an eviction (or after `clear`) gets the information of its predecessor.
+    """
+
+    def __init__(self, max_memory=None):
+        """
+        Parameters
+        ----------
+        max_memory: int
+            memory budget in bytes, if None, the cache is unbounded
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        self.max_memory = max_memory
+        self._entries = OrderedDict()  # key -> ConfiguratorRun, in order of last usage
+        self._shared = {}              # key -> share_information of the run, survives evictions
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """Return the cached run (marking it as recently used) or None.
+
+        Parameters
+        ----------
+        key: str
+            identifier of the run (see `ConfiguratorRun.identify`)
+
+        Returns
+        -------
+        run: ConfiguratorRun
+            cached run or None, if not in cache
+        """
+        run = self._entries.get(key)
+        if run is None:
+            self.misses += 1
+            self.logger.debug("Cache miss for %s", key)
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        self.logger.debug("Cache hit for %s", key)
+        return run
+
+    def put(self, key, run):
+        """ Add a run to the cache and evict least recently used runs, if the memory budget is exceeded. """
+        if hasattr(run, 'share_information'):
+            run.share_information = self._shared.setdefault(key, run.share_information)
+        self._entries[key] = run
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def memory(self):
+        """ Estimated memory of all cached runs in bytes """
+        return sum([run.estimate_memory() for run in self._entries.values()])
+
+    def _evict(self):
+        if self.max_memory is None:
+            return
+        sizes = OrderedDict([(k, run.estimate_memory()) for k, run in self._entries.items()])
+        total = sum(sizes.values())
+        while total > self.max_memory and len(self._entries) > 1:
+            key, size = sizes.popitem(last=False)
+            del self._entries[key]
+            total -= size
+            self.evictions += 1
+            self.logger.debug("Evicted %s (estimated %.1f MB) from cache", key, size / 2 ** 20)
+
+    def clear(self):
+        """ Remove all runs (their shared information is kept) """
+        self._entries.clear()
+
+    def get_stats(self):
+        """ Statistics of the cache (hits, misses, evictions, number of entries and estimated memory in MB) """
+        return OrderedDict([('hits', self.hits),
+                            ('misses', self.misses),
+                            ('evictions', self.evictions),
+                            ('entries', len(self._entries)),
+                            ('memory_mb', self.memory() / 2 ** 20),
+                            ])
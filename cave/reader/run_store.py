@@ -0,0 +1,629 @@
+import hashlib
+import logging
+
+import numpy as np
+from smac.runhistory.runhistory import RunHistory, DataOrigin
+from smac.tae.execute_ta_run import StatusType
+
+from cave.reader.config_table import ConfigTable
+
+# Seeds in SMAC's RunHistory can be None, which is encoded with this value in the seed-column (not -1, which smac
+# uses as seed for runs estimated by an EPM)
+NO_SEED = np.iinfo(np.int64).min
+
+
+class RunStore(object):
+    """
+    Compact, columnar storage of target algorithm runs. Every run is a row in a number of numpy-arrays, configurations
+    and instances are interned (stored once in a table and referenced by their index in that table). Aggregations
+    (e.g. costs per instance or oracle performance) are computed on the arrays instead of iterating over RunHistories.
+
+    SMAC's RunHistory-objects can be created from (parts of) the store on demand (see `to_runhistory`), for all
+    APIs (pimp, smac, ...) that expect them. Subsets of the runs (e.g. of a budget or a folder) are available as
+    read-only views (see `view` and `RunStoreView`), that only hold the indices of their runs. Additional runs on top
+    of a store (e.g. estimated by an EPM) are kept in overlays (see `overlay`), that share the interned tables.
+
+    The columns are:
+
+    * *config_idx*: id of the configuration in `self.configs` (a `ConfigTable`)
+    * *instance_idx*: index of the instance in `self.instances`
+    * *seed*: seed of the run (`NO_SEED` if not available)
+    * *budget*: budget of the run (0 if not available)
+    * *cost*, *time*: cost and runtime of the run
+    * *status*: value of smac's StatusType
+    * *origin*: value of smac's DataOrigin
+    """
+
+    columns = ['config_idx', 'instance_idx', 'seed', 'budget', 'cost', 'time', 'status', 'origin']
+    dtypes = {'config_idx': np.int32,
+              'instance_idx': np.int32,
+              'seed': np.int64,
+              'budget': np.float64,
+              'cost': np.float64,
+              'time': np.float64,
+              'status': np.int8,
+              'origin': np.int8,
+              }
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        # Interned tables
+        self.configs = ConfigTable()
+        self.instances = []     # index -> instance (str or None)
+        self.instance_ids = {}  # instance -> index
+        # Arbitrary python-objects per run (e.g. timestamps for BOHB), only kept if available for any run
+        self.additional_info = []
+
+        self._data = {c: np.empty(0, dtype=self.dtypes[c]) for c in self.columns}
+        # Rows that are added one by one are buffered and only appended to the arrays on access
+        self._buffer = {c: [] for c in self.columns}
+
+    def __len__(self):
+        return len(self._data['cost']) + len(self._buffer['cost'])
+
+    def __getattr__(self, item):
+        # Columns can be accessed as attributes (e.g. `store.cost`)
+        if item in RunStore.columns:
+            return self.column(item)
+        raise AttributeError("'{}' object has no attribute '{}'".format(self.__class__.__name__, item))
+
+    def __getstate__(self):
+        self._flush()
+        d = dict(self.__dict__)
+        del d['logger']
+        return d
+
+    def __setstate__(self, d):
+        self.__dict__.update(d)
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+
+    @property
+    def nbytes(self):
+        """ Memory used by the columns and the configuration-vectors in bytes """
+        self._flush()
+        return sum([a.nbytes for a in self._data.values()]) + self.configs.vectors.nbytes
+
+    def column(self, name):
+        """ Return the array of column `name`. """
+        self._flush()
+        return self._data[name]
+
+    def _flush(self):
+        if len(self._buffer['cost']) > 0:
+            for c in self.columns:
+                self._data[c] = np.concatenate([self._data[c], np.array(self._buffer[c], dtype=self.dtypes[c])])
+                self._buffer[c] = []
+
+    ################################################################################################################
+    #  Filling the store                                                                                           #
+    ################################################################################################################
+
+    def intern_config(self, config):
+        """ Return the index of the configuration, adding it to the table if necessary. """
+        return self.configs.intern(config)
+
+    def intern_instance(self, instance):
+        """ Return the index of the instance, adding it to the table if necessary. """
+        idx = self.instance_ids.get(instance)
+        if idx is None:
+            idx = len(self.instances)
+            self.instances.append(instance)
+            self.instance_ids[instance] = idx
+        return idx
+
+    def add(self, config, cost, time, status, instance_id=None, seed=None, budget=0.0, additional_info=None,
+            origin=DataOrigin.INTERNAL):
+        """ Add a single run, same signature as smac's RunHistory.add """
+        row = {'config_idx': self.intern_config(config),
+               'instance_idx': self.intern_instance(instance_id),
+               'seed': NO_SEED if seed is None else seed,
+               'budget': 0.0 if budget is None else budget,
+               'cost': cost,
+               'time': time,
+               'status': status.value if isinstance(status, StatusType) else status,
+               'origin': origin.value if isinstance(origin, DataOrigin) else origin,
+               }
+        self._add_additional_info([additional_info], len(self))
+        for c in self.columns:
+            self._buffer[c].append(row[c])
+
+    def add_runs(self, additional_info=None, **columns):
+        """ Add runs in bulk. All columns (see `self.columns`) have to be passed as equally long array-likes,
+        configurations and instances as indices into the (already interned) tables.
+
+        Parameters
+        ----------
+        additional_info: List
+            optional, additional information per run
+        columns: Dict[str, array-like]
+            the values for every column
+        """
+        missing = set(self.columns) - set(columns.keys())
+        if missing:
+            raise ValueError("Missing columns to add runs: {}".format(missing))
+        self._flush()
+        n_before = len(self)
+        for c in self.columns:
+            self._data[c] = np.concatenate([self._data[c], np.asarray(columns[c], dtype=self.dtypes[c])])
+        if additional_info is not None:
+            self._add_additional_info(additional_info, n_before)
+
+    def _add_additional_info(self, infos, n_before):
+        if not any([i is not None for i in infos]) and not self.additional_info:
+            return
+        if len(self.additional_info) < n_before:
+            self.additional_info.extend([None] * (n_before - len(self.additional_info)))
+        self.additional_info.extend(infos)
+
+    def update(self, runhistory, origin=None):
+        """Add all runs of a RunHistory.
+
+        Parameters
+        ----------
+        runhistory: RunHistory
+            runs to add
+        origin: DataOrigin
+            if set, overwrites the origin of all added runs, else the origin is taken from the runhistory
+        """
+        n = len(runhistory.data)
+        config_map = {c_id: self.intern_config(c) for c_id, c in runhistory.ids_config.items()}
+        columns = {c: np.empty(n, dtype=self.dtypes[c]) for c in self.columns}
+        infos = []
+        for idx, (k, v) in enumerate(runhistory.data.items()):
+            columns['config_idx'][idx] = config_map[k.config_id]
+            columns['instance_idx'][idx] = self.intern_instance(k.instance_id)
+            columns['seed'][idx] = NO_SEED if k.seed is None else k.seed
+            columns['budget'][idx] = k.budget if k.budget is not None else 0.0
+            columns['cost'][idx] = v.cost
+            columns['time'][idx] = v.time
+            columns['status'][idx] = v.status.value
+            columns['origin'][idx] = (origin if origin is not None else
+                                      runhistory.external.get(k, DataOrigin.INTERNAL)).value
+            infos.append(v.additional_info)
+        self.add_runs(additional_info=infos, **columns)
+
+    def extend(self, other):
+        """Add all runs of another store, interning its configurations and instances into the tables of this store.
+
+        Parameters
+        ----------
+        other: RunStore
+            store (or view) with the runs to add
+
+        Returns
+        -------
+        indices: np.array
+            indices of the added runs in this store
+        """
+        config_map = np.array([self.intern_config(c) for c in other.configs], dtype=np.int32)
+        instance_map = np.array([self.intern_instance(i) for i in other.instances], dtype=np.int32)
+        columns = {c: other.column(c) for c in self.columns}
+        columns['config_idx'] = config_map[columns['config_idx']]
+        columns['instance_idx'] = instance_map[columns['instance_idx']]
+        infos = other.get_additional_info() if other.has_additional_info() else None
+        self._flush()
+        n_before = len(self)
+        self.add_runs(additional_info=infos, **columns)
+        return np.arange(n_before, len(self))
+
+    def consume(self, batches, origin=DataOrigin.INTERNAL):
+        """Add runs from batches of run-records (see `BaseReader.iter_runs`). Every batch is appended to the columns
+        before the next one is requested, so only one batch is held as python-objects at a time.
+
+        Parameters
+        ----------
+        batches: Iterable[List[dict]]
+            batches of run-records, keyword-arguments of `add`
+        origin: DataOrigin
+            origin of all runs
+
+        Returns
+        -------
+        self: RunStore
+            this store, to allow `RunStore().consume(batches)`
+        """
+        for batch in batches:
+            for record in batch:
+                self.add(origin=origin, **record)
+            self._flush()
+        return self
+
+    @classmethod
+    def from_runhistory(cls, runhistory, origin=None):
+        """ Create a new store from a RunHistory (see `update`) """
+        store = cls()
+        if runhistory is not None:
+            store.update(runhistory, origin=origin)
+        return store
+
+    def overlay(self):
+        """ Empty store sharing the configuration- and instance-tables with this store. Overlays hold additional runs
+        (e.g. estimated by an EPM) on top of a store, without copying the runs of the store. """
+        store = RunStore()
+        store.configs = self.configs
+        store.instances, store.instance_ids = self.instances, self.instance_ids
+        return store
+
+    def drop_duplicates(self):
+        """ Remove all runs that are duplicates (same config, instance, seed and budget) of previous runs. This
+        resembles the behaviour of `RunHistory.update`, which ignores already existing runs. """
+        keys = self._run_keys()
+        _, first = np.unique(keys, return_index=True)
+        if len(first) == len(self):
+            return
+        keep = np.sort(first)
+        self.logger.debug("Dropping %d duplicate runs", len(self) - len(keep))
+        for c in self.columns:
+            self._data[c] = self._data[c][keep]
+        if self.additional_info:
+            self.additional_info = [self.additional_info[i] if i < len(self.additional_info) else None for i in keep]
+
+    ################################################################################################################
+    #  Accessing the store                                                                                         #
+    ################################################################################################################
+
+    def view(self, indices):
+        """ Read-only view on the runs with the given indices (in the given order), without copying them """
+        return RunStoreView(self, indices)
+
+    def has_additional_info(self):
+        return len(self.additional_info) > 0
+
+    def get_additional_info(self, indices=None):
+        """ Additional information per run (None for runs without) """
+        indices = range(len(self)) if indices is None else indices
+        return [self.additional_info[i] if i < len(self.additional_info) else None for i in indices]
+
+    def fingerprint(self, indices=None):
+        """sha1-hash over the runs, configurations are hashed by their vectors and instances by their names (so the
+        hash doesn't depend on the order they were interned in). Used to recognize equal training data of models
+        (see `ModelRegistry`).
+
+        Parameters
+        ----------
+        indices: np.array
+            only consider these runs
+
+        Returns
+        -------
+        fingerprint: str
+            hex-digest
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=np.int64)
+        sha = hashlib.sha1()
+        sha.update(np.ascontiguousarray(self.configs.vectors[self.config_idx[indices]]).tobytes())
+        unique, inverse = np.unique(self.instance_idx[indices], return_inverse=True)
+        sha.update(repr([self.instances[i] for i in unique.tolist()]).encode())
+        sha.update(inverse.astype(np.int64).tobytes())
+        for c in ['seed', 'budget', 'cost', 'time', 'status', 'origin']:
+            sha.update(self.column(c)[indices].tobytes())
+        return sha.hexdigest()
+
+    def unique_indices(self, indices=None):
+        """Indices of all runs without duplicates (same config, instance, seed and budget). This resembles updating a
+        RunHistory first with all original (origin INTERNAL) and then with all other runs: the first run is kept,
+        unless it is capped and replaced by a later run that is not capped (or capped with a higher cost, see
+        `RunHistory.add`).
+
+        Parameters
+        ----------
+        indices: np.array
+            only consider these runs
+
+        Returns
+        -------
+        indices: np.array
+            indices of the kept runs, first original runs then all others (each in the order of `indices`)
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=np.int64)
+        order = np.argsort(self.origin[indices] != DataOrigin.INTERNAL.value, kind='stable')
+        candidates = indices[order]
+        _, group = np.unique(self._run_keys(candidates), return_inverse=True)
+        capped = self.status[candidates] == StatusType.CAPPED.value
+        # Per run-key: the first run that is not capped, otherwise the first capped run with the highest cost
+        priority = np.lexsort((np.arange(len(candidates)), np.where(capped, -self.cost[candidates], 0.0), capped,
+                               np.ravel(group)))
+        first = np.ones(len(priority), dtype=bool)
+        first[1:] = np.ravel(group)[priority][1:] != np.ravel(group)[priority][:-1]
+        return candidates[np.sort(priority[first])]
+
+    def select_unknown(self, known, known_indices=None):
+        """Indices of the runs that are not in another store (same configuration, instance, seed and budget), e.g. of
+        runs read again from a file that is still being written. Both stores have to share their configuration- and
+        instance-tables (see `overlay`).
+
+        Parameters
+        ----------
+        known: RunStore
+            store (or view) with the known runs
+        known_indices: np.array
+            only consider these runs of `known`
+
+        Returns
+        -------
+        indices: np.array
+            indices of the runs of this store that are not known, sorted
+        """
+        keys = self._run_keys()
+        known_keys = known._run_keys(None if known_indices is None else np.asarray(known_indices, dtype=np.int64))
+        return np.flatnonzero(~np.isin(_as_void(keys), _as_void(known_keys)))
+
+    def select(self, budgets=None, origins=None, config_indices=None, indices=None):
+        """Return the indices of all runs matching the given criteria.
+
+        Parameters
+        ----------
+        budgets: List[float]
+            only runs on these budgets
+        origins: List[DataOrigin]
+            only runs with these origins
+        config_indices: List[int]
+            only runs of these configurations (indices in `self.configs`)
+        indices: np.array
+            only consider these runs
+
+        Returns
+        -------
+        indices: np.array
+            indices of the matching runs, sorted
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if budgets is not None:
+            mask &= np.isin(self.budget, np.array([b if b is not None else 0.0 for b in budgets], dtype=np.float64))
+        if origins is not None:
+            mask &= np.isin(self.origin, [o.value if isinstance(o, DataOrigin) else o for o in origins])
+        if config_indices is not None:
+            mask &= np.isin(self.config_idx, np.asarray(config_indices))
+        if indices is not None:
+            sub_mask = np.zeros(len(self), dtype=bool)
+            sub_mask[indices] = True
+            mask &= sub_mask
+        return np.flatnonzero(mask)
+
+    def get_budgets(self, indices=None):
+        """ Sorted list of all budgets """
+        budget = self.budget if indices is None else self.budget[indices]
+        return [float(b) for b in np.unique(budget)]
+
+    def get_config_indices(self, indices=None):
+        """ Indices of all configurations with at least one run, in order of first appearance """
+        config_idx = self.config_idx if indices is None else self.config_idx[indices]
+        _, first = np.unique(config_idx, return_index=True)
+        return config_idx[np.sort(first)]
+
+    def get_all_configs(self, indices=None):
+        """ All configurations with at least one run (same as RunHistory.get_all_configs) """
+        return [self.configs[idx] for idx in self.get_config_indices(indices)]
+
+    def count_runs_per_config(self, only_max_observed_budget=True, indices=None):
+        """Number of runs per configuration.
+
+        Parameters
+        ----------
+        only_max_observed_budget: bool
+            if True, only one run per instance-seed-pair is counted (same as
+            `len(RunHistory.get_runs_for_config(config, only_max_observed_budget=True))`). Capped runs and runs on
+            different instances are never counted (see `_counted_runs`)
+        indices: np.array
+            only consider these runs
+
+        Returns
+        -------
+        counts: np.array
+            array with number of runs, indexed by configuration-index
+        """
+        indices = self._counted_runs(indices, only_max_observed_budget)
+        return np.bincount(self.config_idx[indices], minlength=len(self.configs))
+
+    def _run_keys(self, indices=None):
+        """ Structured array with (config_idx, instance_idx, seed, budget) per run """
+        indices = np.arange(len(self)) if indices is None else indices
+        keys = np.empty(len(indices), dtype=[('config_idx', np.int32), ('instance_idx', np.int32),
+                                             ('seed', np.int64), ('budget', np.float64)])
+        for c in ['config_idx', 'instance_idx', 'seed', 'budget']:
+            keys[c] = self.column(c)[indices]
+        return keys
+
+    def _counted_runs(self, indices=None, only_max_observed_budget=True):
+        """Indices of the runs that smac's RunHistory considers for the runs and costs of configurations (see
+        `RunHistory.get_runs_for_config`): capped runs and runs with origin EXTERNAL_DIFFERENT_INSTANCES are left out
+        and, if `only_max_observed_budget`, only the highest budget of every config-instance-seed-combination is used.
+        """
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=np.int64)
+        counted = (self.status[indices] != StatusType.CAPPED.value) & \
+            np.isin(self.origin[indices], [DataOrigin.INTERNAL.value, DataOrigin.EXTERNAL_SAME_INSTANCES.value])
+        indices = indices[counted]
+        if only_max_observed_budget:
+            indices = indices[self._highest_budget_runs(indices)]
+        return indices
+
+    def _highest_budget_runs(self, indices):
+        """ Positions (in `indices`) of the runs with the highest budget for each config-instance-seed-combination """
+        if len(indices) == 0:
+            return np.empty(0, dtype=np.int64)
+        order = np.lexsort((self.budget[indices], self.seed[indices],
+                            self.instance_idx[indices], self.config_idx[indices]))
+        c, i, s = self.config_idx[indices][order], self.instance_idx[indices][order], self.seed[indices][order]
+        # last element of every group (groups are contiguous after sorting)
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = (c[1:] != c[:-1]) | (i[1:] != i[:-1]) | (s[1:] != s[:-1])
+        return order[last]
+
+    def get_mean_instance_costs(self, indices=None):
+        """Average cost per configuration-instance-pair over seeds, using only the highest budget for every
+        seed and leaving out capped runs and runs on different instances (this resembles smac's
+        `RunHistory.get_instance_costs_for_config` for all configurations at once, see `_counted_runs`).
+
+        Parameters
+        ----------
+        indices: np.array
+            only consider these runs
+
+        Returns
+        -------
+        config_idx, instance_idx, cost: np.array, np.array, np.array
+            equally long arrays, one entry per evaluated configuration-instance-pair
+        """
+        indices = self._counted_runs(indices)
+        pair = self.config_idx[indices].astype(np.int64) * max(len(self.instances), 1) + self.instance_idx[indices]
+        unique_pairs, inverse = np.unique(pair, return_inverse=True)
+        cost = np.bincount(inverse, weights=self.cost[indices]) / np.bincount(inverse)
+        n_instances = max(len(self.instances), 1)
+        return ((unique_pairs // n_instances).astype(np.int32),
+                (unique_pairs % n_instances).astype(np.int32),
+                cost)
+
+    def get_instance_costs_for_config(self, config, indices=None):
+        """ Average cost per instance over seeds for a configuration (see `get_mean_instance_costs`)
+
+        Returns
+        -------
+        costs: Dict[str, float]
+            mapping instances to costs
+        """
+        config_idx = self.configs.index(config)
+        if config_idx is None:
+            return {}
+        indices = self.select(config_indices=[config_idx], indices=indices)
+        _, inst_idx, cost = self.get_mean_instance_costs(indices)
+        return {self.instances[i]: float(c) for i, c in zip(inst_idx, cost)}
+
+    def get_oracle(self, instances=None, indices=None):
+        """Best average cost per instance over all configurations.
+
+        Parameters
+        ----------
+        instances: List[str]
+            optional, only return costs for these instances
+        indices: np.array
+            only consider these runs
+
+        Returns
+        -------
+        oracle: Dict[str, float]
+            best seen performance per instance {inst : performance}
+        """
+        _, inst_idx, cost = self.get_mean_instance_costs(indices)
+        if len(cost) == 0:
+            return {}
+        minima = np.full(len(self.instances), np.inf)
+        np.minimum.at(minima, inst_idx, cost)
+        oracle = {self.instances[i]: float(minima[i]) for i in np.unique(inst_idx)}
+        if instances is not None:
+            oracle = {i: c for i, c in oracle.items() if i in set(instances)}
+        return oracle
+
+    def to_runhistory(self, indices=None, runhistory=None):
+        """Create a smac RunHistory-object containing (a subset of) the runs.
+
+        Parameters
+        ----------
+        indices: np.array
+            only add these runs, if None, add all runs
+        runhistory: RunHistory
+            optional, add the runs to this runhistory instead of a new one (runs that are already in it are ignored)
+
+        Returns
+        -------
+        runhistory: RunHistory
+            runhistory with the selected runs
+        """
+        self._flush()
+        indices = range(len(self)) if indices is None else indices
+        rh = RunHistory() if runhistory is None else runhistory
+        data = self._data
+        configs = {}
+        for idx in indices:
+            seed = int(data['seed'][idx])
+            config_idx = data['config_idx'][idx]
+            if config_idx not in configs:
+                configs[config_idx] = self.configs[config_idx]
+            rh.add(config=configs[config_idx],
+                   cost=float(data['cost'][idx]),
+                   time=float(data['time'][idx]),
+                   status=StatusType(int(data['status'][idx])),
+                   instance_id=self.instances[data['instance_idx'][idx]],
+                   seed=None if seed == NO_SEED else seed,
+                   budget=float(data['budget'][idx]),
+                   additional_info=self.additional_info[idx] if idx < len(self.additional_info) else None,
+                   origin=DataOrigin(int(data['origin'][idx])))
+        return rh
+
+
+class RunStoreView(RunStore):
+    """
+    Read-only view on a subset of the runs of a RunStore (e.g. all runs on a budget or of a folder). The view only
+    holds the indices of its runs in the parent store, the configuration- and instance-tables are shared with the
+    parent. All methods to access the store work on views as well (indices passed to them are relative to the view),
+    columns are gathered from the parent on access. Use `materialize` to get an independent, writable store.
+    """
+
+    def __init__(self, store, indices):
+        """
+        Parameters
+        ----------
+        store: RunStore
+            parent store
+        indices: np.array
+            indices of the runs in the parent store, in the order of the view
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        self.store = store
+        self.indices = np.asarray(indices, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def configs(self):
+        return self.store.configs
+
+    @property
+    def instances(self):
+        return self.store.instances
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes
+
+    def column(self, name):
+        return self.store.column(name)[self.indices]
+
+    def _flush(self):
+        pass
+
+    def _to_parent(self, indices):
+        return self.indices if indices is None else self.indices[np.asarray(indices, dtype=np.int64)]
+
+    def _read_only(self, *args, **kwargs):
+        raise NotImplementedError("RunStoreViews are read-only, use `materialize` to get a writable store.")
+
+    add = add_runs = update = extend = drop_duplicates = intern_config = intern_instance = _read_only
+
+    def view(self, indices):
+        return RunStoreView(self.store, self._to_parent(indices))
+
+    def has_additional_info(self):
+        return self.store.has_additional_info()
+
+    def get_additional_info(self, indices=None):
+        return self.store.get_additional_info(self._to_parent(indices))
+
+    def to_runhistory(self, indices=None, runhistory=None):
+        return self.store.to_runhistory(self._to_parent(indices), runhistory=runhistory)
+
+    def overlay(self):
+        return self.store.overlay()
+
+    def materialize(self):
+        """ Independent copy of the runs in this view (sharing the configuration- and instance-tables) """
+        store = self.store.overlay()
+        store.add_runs(additional_info=self.get_additional_info() if self.has_additional_info() else None,
+                       **{c: self.column(c) for c in self.columns})
+        return store
+
+
+def _as_void(keys):
+    """ Run-keys (see `RunStore._run_keys`) as opaque values, so they can be compared with `np.isin` """
+    keys = np.ascontiguousarray(keys)
+    return keys.view(np.dtype((np.void, keys.dtype.itemsize)))
@@ -1,19 +1,29 @@
+import hashlib
 import logging
 import os
 import shutil
 import tempfile
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import List
-from collections import OrderedDict
 
+import numpy as np
 from numpy.random.mtrand import RandomState
-from smac.runhistory.runhistory import RunHistory, DataOrigin
+from smac.runhistory.runhistory import DataOrigin
 
 from cave.reader.configurator_run import ConfiguratorRun
+from cave.reader.folder_watcher import FolderWatcher
+from cave.reader.input_cache import InputCache
+from cave.reader.run_cache import RunCache
+from cave.reader.run_store import RunStore, RunStoreView
+from cave.reader.runs_metadata import RunsMetadata
+from cave.reader.scenario_cache import ScenarioCache
+from cave.reader.sqlite_run_store import SQLiteRunStore, SQLiteRunView
 from cave.reader.conversion.apt2smac import APT2SMAC
 from cave.reader.conversion.csv2smac import CSV2SMAC
 from cave.reader.conversion.hpbandster2smac import HpBandSter2SMAC
 from cave.utils.helpers import combine_trajectories, load_default_options, detect_fileformat
+from cave.utils.shared_arrays import SharedArrays
 from cave.utils.apt_helpers.refitting_routine import apt_refit
 
 class RunsContainer(object):
@@ -25,6 +35,11 @@ class RunsContainer(object):
                  file_format=None,
                  validation_format=None,
                  analyzing_options=None,
+                 n_jobs=1,
+                 cache_dir=None,
+                 save_converted=False,
+                 cache_memory_limit=2048,
+                 run_store_backend='memory',
                  ):
         """
         Reads in optimizer runs. Converts data if necessary.
@@ -35,7 +50,7 @@ class RunsContainer(object):
 
         The data is organized in self.data as {folder_name : ConfiguratorRun}.
         Aggregated or reduced ConfiguratorRuns are cached by their identifier (needs to be unique from context!)
-          in self.cache as {identifier : ConfiguratorRun},-
+          in self.cache (a `RunCache <apidoc/cave.reader.run_cache>`_), so they are shared between all analyzers.
 
         In the internal data-management there are three types of runhistories: *original*, *validated* and *epm*.
         They are saved in and provided by the ConfiguratorRuns
@@ -71,6 +86,23 @@ class RunsContainer(object):
         analyzing_options: dict / ConfigParser
             contains important global configurations on how to run CAVE, see
             `options <https://github.com/automl/CAVE/blob/master/cave/utils/options/default_analysis_options.ini>`_
+        n_jobs: int
+            number of processes used to read in the folders in parallel, -1 uses all available cores
+        cache_dir: str
+            optional, directory for a persistent cache of the read (and converted) folders. If the input-files did
+            not change since the last invocation, the folders are loaded from the cache without reading or converting.
+        save_converted: bool
+            if True, data in formats that need to be converted (BOHB, CSV, APT) is also saved in SMAC3-format to
+            `output_dir/converted_input_data`, by default the converted data is only kept in memory
+        cache_memory_limit: float
+            memory budget (in MB) for the cache of aggregated and reduced ConfiguratorRuns, least recently used runs
+            are evicted when it's exceeded. None for an unbounded cache
+        run_store_backend: str
+            from [memory, sqlite], where the runs of all folders are kept. With 'sqlite', the runs are (streamed)
+            into a `SQLiteRunStore <apidoc/cave.reader.sqlite_run_store>`_ in `output_dir/runs.sqlite` without
+            creating RunHistories and kept there: the run-stores of all ConfiguratorRuns (also of budgets and
+            aggregations) are views on the file, the metadata and aggregations of the runs are computed by queries.
+            Folders are then read sequentially
         """
         ################################################################################################################
         #  Initialize and find suitable parameters                                                                     #
@@ -94,10 +126,32 @@ class RunsContainer(object):
         self.validation_format = validation_format
 
         self.analyzing_options = load_default_options(analyzing_options, file_format)
+        self.n_jobs = os.cpu_count() if n_jobs == -1 else max(1, n_jobs)
+        self.input_cache = InputCache(cache_dir) if cache_dir else None
+        self.save_converted = save_converted
+        if run_store_backend not in ['memory', 'sqlite']:
+            raise ValueError("run_store_backend must be one of [memory, sqlite], not %s" % run_store_backend)
+        self.sqlite_store = SQLiteRunStore(os.path.join(self.output_dir, 'runs.sqlite')) \
+            if run_store_backend == 'sqlite' else None
 
         # Main focus on this mapping pRun2budget2data:
         self.data = OrderedDict()   # mapping parallel runs to their budgets
-        self.cache = OrderedDict()  # Reuse already generated ConfiguratorRuns
+        # All runs of all folders in one store, derived runs are views on it (created on first use)
+        self._container_store = None
+        self._folder_indices = {}   # mapping folders to the indices of their runs in the container-store
+        # Budgets, folders and counts of all runs, computed from the container-store on first use (reset on changes)
+        self._metadata = None
+        # Reuse already generated ConfiguratorRuns
+        self.cache = RunCache(int(cache_memory_limit * 2 ** 20) if cache_memory_limit is not None else None)
+        # Watchers for new data in the folders, created on the first `update`
+        self._watchers = None
+
+        ################################################################################################################
+        #  Load folders from the persistent cache, if their input did not change                                       #
+        ################################################################################################################
+        runs, fingerprints = self._load_from_cache()
+        cached = set(runs.keys())
+        to_process = [(f, ta_exec_dir) for f, ta_exec_dir in zip(self.folders, self.ta_exec_dirs) if f not in runs]
 
         ################################################################################################################
         #  Convert if necessary, determine what folders and what budgets                                               #
@@ -107,13 +161,13 @@ class RunsContainer(object):
                       'CSV'  : CSV2SMAC,
                       'APT'  : APT2SMAC,
                       }
-        if self.file_format in converters:
-            self.logger.debug("Converting %d %s folders to SMAC-format", len(folders), self.file_format)
-            converter = converters[self.file_format]()
-            input_data = converter.convert(self.folders,
-                                           ta_exec_dirs=self.ta_exec_dirs,
-                                           output_dir=self.output_dir,
-                                           )
+        if self.file_format in converters and to_process:
+            self.logger.debug("Converting %d %s folders to SMAC-format", len(to_process), self.file_format)
+            converter = converters[self.file_format](write_to_disk=self.save_converted, n_jobs=self.n_jobs)
+            input_data.update(converter.convert([f for f, _ in to_process],
+                                                ta_exec_dirs=[ta_exec_dir for _, ta_exec_dir in to_process],
+                                                output_dir=self.output_dir,
+                                                ))
             # Also setting ta_exec_dirs to cwd, since we are now using the converted paths...
             self.ta_exec_dirs = ['.' for _ in range(len(self.folders))]
 
@@ -122,7 +176,10 @@ class RunsContainer(object):
         #  there is one ConfiguratorRun-object (they can be easily aggregated)                                         #
         ################################################################################################################
         self.logger.debug("Reading in folders: %s with ta_exec_dirs: %s", str(self.folders), str(self.ta_exec_dirs))
+        to_read = []
         for f, ta_exec_dir in zip(self.folders, self.ta_exec_dirs):  # Iterating over parallel runs
+            if f in runs:
+                continue
             self.logger.debug("--Processing folder \"{}\" (and ta_exec_dir \"{}\")".format(f, ta_exec_dir))
 
             if all([x in input_data[f] for x in ['new_path', 'config_space', 'runhistory', 'scenario', 'trajectory']]):
@@ -143,17 +200,123 @@ class RunsContainer(object):
                 # Any format-specific information
                 for k, v in input_data[f].items():
                     cr.share_information[k] = v
+                runs[f] = cr
             else:
                 # Data is in good readable SMAC3-format
-                cr = ConfiguratorRun.from_folder(f,
-                                                 ta_exec_dir,
-                                                 self.analyzing_options,
-                                                 file_format=self.file_format,
-                                                 validation_format=self.validation_format,
-                                                 output_dir = self.output_dir)
-            self.data[f] = cr
+                to_read.append((f, ta_exec_dir))
+        runs.update(self._read_folders(to_read))
+        self._save_to_cache({f: cr for f, cr in runs.items() if f not in cached}, fingerprints)
+        # Keep the order of the folders as passed, no matter in which order they have been read
+        for f in self.folders:
+            # Runs read in worker-processes or loaded from the cache carry their own copy of the scenario
+            runs[f].scenario = ScenarioCache.share(runs[f].scenario)
+            self.data[f] = runs[f]
+            if self.sqlite_store is not None and f not in self.sqlite_store.folders:
+                # Converted folders and folders loaded from the cache are moved from memory
+                runs[f].move_runs(self.sqlite_store, f)
         self.scenario = list(self.data.values())[0].scenario
 
+    def _load_from_cache(self):
+        """Load all folders with unchanged input from the persistent cache (if a cache_dir is specified).
+
+        Returns
+        -------
+        runs: Dict[str, ConfiguratorRun]
+            mapping folders to ConfiguratorRuns, for all folders that could be loaded from the cache
+        fingerprints: Dict[str, str]
+            mapping all folders to their fingerprint (empty, if no cache is used)
+        """
+        runs, fingerprints = {}, {}
+        if not self.input_cache:
+            return runs, fingerprints
+        for f, ta_exec_dir in zip(self.folders, self.ta_exec_dirs):
+            fingerprints[f] = self.input_cache.fingerprint(f,
+                                                           exclude=[self.output_dir],
+                                                           folder=f,
+                                                           ta_exec_dir=os.path.abspath(ta_exec_dir),
+                                                           file_format=self.file_format,
+                                                           validation_format=self.validation_format,
+                                                           save_converted=self.save_converted)
+            cr = self.input_cache.load(fingerprints[f])
+            if cr is not None:
+                # Data for analysis is written to this container's output_dir
+                cr.options = self.analyzing_options
+                cr.output_dir = os.path.join(self.output_dir, 'analysis_data', cr.get_identifier())
+                os.makedirs(cr.output_dir, exist_ok=True)
+                runs[f] = cr
+        self.logger.info("Loaded %d/%d folders from cache in %s", len(runs), len(self.folders),
+                         self.input_cache.cache_dir)
+        return runs, fingerprints
+
+    def _save_to_cache(self, runs, fingerprints):
+        """ Save newly read runs to the persistent cache (if a cache_dir is specified). """
+        if not self.input_cache:
+            return
+        for f, cr in runs.items():
+            # Files referenced in the scenario (relative to the ta_exec_dir) that are not part of the folder
+            scenario_files = [getattr(cr.scenario, attr, None) for attr in ['pcs_fn', 'train_inst_fn',
+                                                                           'test_inst_fn', 'feature_fn']]
+            scenario_files = [os.path.join(cr.ta_exec_dir if cr.ta_exec_dir else '.', fn)
+                              for fn in scenario_files if fn]
+            # Converted files in the output_dir are a product of the (fingerprinted) folder
+            scenario_files = [fn for fn in scenario_files if not os.path.abspath(fn).startswith(
+                os.path.abspath(self.output_dir))]
+            self.logger.debug("Saving folder %s to cache (depends on %s)", f, str(scenario_files))
+            self.input_cache.store(fingerprints[f], cr, dependencies=scenario_files)
+
+    def _read_folders(self, folders_and_ta_exec_dirs):
+        """Create ConfiguratorRuns from folders, using a pool of worker processes if `self.n_jobs` > 1. Workers hand
+        the runs and features of the folders over in shared memory, so they are not pickled (see `_read_folder`).
+
+        Parameters
+        ----------
+        folders_and_ta_exec_dirs: List[Tuple[str, str]]
+            folders (in a format readable by a reader) and the according ta_exec_dirs
+
+        Returns
+        -------
+        runs: Dict[str, ConfiguratorRun]
+            mapping folders to their ConfiguratorRuns
+        """
+        runs = {}
+        n_jobs = min(self.n_jobs, len(folders_and_ta_exec_dirs))
+        if n_jobs <= 1 or self.sqlite_store is not None:
+            for f, ta_exec_dir in folders_and_ta_exec_dirs:
+                runs[f] = ConfiguratorRun.from_folder(f,
+                                                      ta_exec_dir,
+                                                      self.analyzing_options,
+                                                      file_format=self.file_format,
+                                                      validation_format=self.validation_format,
+                                                      output_dir=self.output_dir,
+                                                      sqlite_store=self.sqlite_store)
+            return runs
+
+        self.logger.info("Reading %d folders using %d processes", len(folders_and_ta_exec_dirs), n_jobs)
+        # ConfigParser-objects are passed as plain dicts to the workers
+        options = {s: dict(self.analyzing_options[s]) for s in self.analyzing_options.sections()}
+        # Shared memory of runs that are not attached (e.g. if reading another folder fails) is removed with it
+        shared_dir = SharedArrays.make_directory()
+        try:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = {executor.submit(_read_folder,
+                                           f,
+                                           ta_exec_dir,
+                                           options,
+                                           self.file_format,
+                                           self.validation_format,
+                                           self.output_dir,
+                                           shared_dir): f for f, ta_exec_dir in folders_and_ta_exec_dirs}
+                for idx, future in enumerate(as_completed(futures)):
+                    f = futures[future]
+                    runs[f], handle = future.result()
+                    runs[f].attach_runs(handle)
+                    # Share the options-object of this container, so changes to the options apply to all runs
+                    runs[f].options = self.analyzing_options
+                    self.logger.info("Read folder %d/%d (%s)", idx + 1, len(futures), f)
+        finally:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+        return runs
+
     def __getitem__(self, key):
         """ Return highest budget for given folder. """
         return self.data[key]
@@ -171,12 +334,25 @@ class RunsContainer(object):
         return max(self.get_budgets()) if self.get_budgets() else None
 
     def get_budgets(self):
-        budgets = set()
-        for cr in self.data.values():
-            budgets.update(cr.get_budgets())
-        budgets = sorted([b for b in budgets if b is not None])
-        self.logger.debug("Budgets: " + str(budgets))
-        return budgets if len(budgets) > 0 else None
+        budgets = self.get_metadata().budgets
+        return list(budgets) if len(budgets) > 0 else None
+
+    def get_metadata(self):
+        """Metadata of all runs in this container (budgets, folders, run-counts, see
+        `RunsMetadata <apidoc/cave.reader.runs_metadata>`_), computed once.
+
+        Returns
+        -------
+        metadata: RunsMetadata
+            metadata of all runs
+        """
+        if self._metadata is None and self.sqlite_store is not None:
+            self._metadata = RunsMetadata.from_sqlite_store(self.sqlite_store, list(self.data.keys()))
+        elif self._metadata is None:
+            self._metadata = RunsMetadata(self._get_container_store(), self._folder_indices)
+            self.logger.debug("Budgets: %s, runs per budget: %s", str(self._metadata.budgets),
+                              str(dict(self._metadata.runs_per_budget)))
+        return self._metadata
 
     def get_runs_for_budget(self, target_b):
         runs = [self._reduce_cr_to_budget(cr, [target_b]) for cr in self.get_all_runs()]
@@ -189,6 +365,23 @@ class RunsContainer(object):
     def get_runs_for_folder(self, f):
         return self.data[f]
 
+    def get_run_store(self, folder=None):
+        """Columnar store of all real runs (see `RunStore <apidoc/cave.reader.run_store>`_).
+
+        Parameters
+        ----------
+        folder: str
+            folder of the parallel run, if None, the store of all folders aggregated is returned
+
+        Returns
+        -------
+        run_store: RunStore
+            store with all original (origin INTERNAL) and validated runs
+        """
+        if folder is None:
+            return self.get_aggregated(keep_budgets=False, keep_folders=False)[0].run_store
+        return self.data[folder].run_store
+
     def get_aggregated(self, keep_budgets=True, keep_folders=False):
         """ Collapse data-structure along a given "axis".
 
@@ -215,95 +408,212 @@ class RunsContainer(object):
         self.logger.debug("Aggregated: {}".format(str([r.get_identifier() for r in res])))
         return res
 
+    def _get_container_store(self):
+        """ Store with the runs of all folders, derived runs (budgets and aggregations) are views on this store. With
+        a sqlite-store, this is a `SQLiteRunView` on the runs of all folders and derived runs are views with filters
+        (see `_get_sqlite_view`). """
+        if self._container_store is None and self.sqlite_store is not None:
+            self._container_store = SQLiteRunView(self.sqlite_store, folders=list(self.data.keys()))
+        elif self._container_store is None:
+            self._container_store = RunStore()
+            for folder, cr in self.data.items():
+                self._folder_indices[folder] = self._container_store.extend(cr.run_store)
+        return self._container_store
+
+    def _get_sqlite_view(self, cr):
+        """ View on the runs of a ConfiguratorRun (of this container) in the sqlite-store """
+        if isinstance(cr.run_store, SQLiteRunView):
+            return cr.run_store
+        for folder, folder_cr in self.data.items():
+            if folder_cr is cr:
+                # The run-store was materialized (e.g. after validation), the real runs are still in the sqlite-store
+                return self._get_container_store().derive(folders=[folder])
+        raise ValueError("ConfiguratorRun {} is not part of this RunsContainer".format(cr.get_identifier()))
+
+    def _get_indices(self, cr):
+        """ Indices of the runs of a ConfiguratorRun (of this container) in the container-store """
+        store = self._get_container_store()
+        if isinstance(cr.run_store, RunStoreView) and cr.run_store.store is store:
+            return cr.run_store.indices
+        for folder, folder_cr in self.data.items():
+            if folder_cr is cr:
+                return self._folder_indices[folder]
+        raise ValueError("ConfiguratorRun {} is not part of this RunsContainer".format(cr.get_identifier()))
+
     def _aggregate(self, runs):
         # path_to_folder is the concatenation of all the paths of the individual runs
         path_to_folder = '-'.join(sorted(list(set([r.path_to_folder for r in runs]))))
         # budgets are the union of individual budgets. if they are not the same for all runs (no usecase atm),
         #   they get an additional entry of the hash over the string of the combination to avoid false-positives
         budgets = [r.reduced_to_budgets for r in runs]
-        budget_hash = ['budgetmix-%d' % (hash(str(budgets)))] if len(set([frozenset(b) for b in budgets])) != 1 else []
+        budget_hash = (['budgetmix-%s' % hashlib.sha1(str(budgets).encode()).hexdigest()[:16]]
+                       if len(set([frozenset(b) for b in budgets])) != 1 else [])
         budgets = [a for b in [x for x in budgets if x is not None] for a in b] + budget_hash
 
-        if ConfiguratorRun.identify(path_to_folder, budgets) in self.cache:
-            return self.cache[ConfiguratorRun.identify(path_to_folder, budgets)]
-
-        orig_rh, vali_rh = RunHistory(), RunHistory()
-        for run in runs:
-            orig_rh.update(run.original_runhistory, origin=DataOrigin.INTERNAL)
-            vali_rh.update(run.original_runhistory, origin=DataOrigin.INTERNAL)
-            if run.validated_runhistory:
-                vali_rh.update(run.validated_runhistory, origin=DataOrigin.EXTERNAL_SAME_INSTANCES)
+        cached = self.cache.get(ConfiguratorRun.identify(path_to_folder, budgets))
+        if cached is not None:
+            return cached
 
-        for rh_name, rh in [("original", orig_rh),
-                            ("validated", vali_rh),
-                            ]:
-            self.logger.debug('Combined number of %s RunHistory data points: %d '
-                              '# Configurations: %d. # Configurator runs: %d',
-                              rh_name, len(rh.data), len(rh.get_all_configs()), len(runs))
+        # The aggregated run is a view on the runs of all runs (without duplicates, original runs first)
+        store = self._get_container_store()
+        if self.sqlite_store is not None:
+            view = SQLiteRunView.union([self._get_sqlite_view(run) for run in runs])
+        else:
+            view = store.view(store.unique_indices(np.concatenate([self._get_indices(run) for run in runs])))
+        self.logger.debug('Combined number of RunHistory data points: %d (original: %d) '
+                          '# Configurations: %d. # Configurator runs: %d',
+                          len(view), len(view.select(origins=[DataOrigin.INTERNAL])),
+                          len(view.get_config_indices()), len(runs))
 
         traj = combine_trajectories([run.trajectory for run in runs], self.logger)
 
         new_cr = ConfiguratorRun(runs[0].scenario,
-                                 orig_rh,
-                                 vali_rh,
+                                 None,
+                                 None,
                                  traj,
                                  self.analyzing_options,
                                  output_dir=self.output_dir,
                                  path_to_folder=path_to_folder,
                                  reduced_to_budgets=budgets,
+                                 run_store=view,
                                  )
 
         self._cache(new_cr)
         return new_cr
 
     def _reduce_cr_to_budget(self, cr, keep_budgets):
-        """Creates a new ConfiguratorRun without all the target algorithm runs that are not in the list of budgets.
-        Will affect original, validated and epm-RunHistories as well as Trajectory"""
-        if ConfiguratorRun.identify(cr.path_to_folder, keep_budgets) in self.cache:
-            return self.cache[ConfiguratorRun.identify(cr.path_to_folder, keep_budgets)]
-
-        def reduce_runhistory(rh, keep_budgets):
-            if not isinstance(rh, RunHistory):
-                self.logger.debug("This is not a RunHistory: %s", rh)
-                return rh
-            new_rh = RunHistory()
-            for rk, rv in rh.data.items():
-                if rk.budget in keep_budgets or rh.ids_config[rk.config_id] in [cr.default]:
-                    new_rh.add(config=rh.ids_config[rk.config_id],
-                               cost=rv.cost,
-                               time=rv.time,
-                               status=rv.status,
-                               instance_id=rk.instance_id,
-                               seed=rk.seed,
-                               budget=rk.budget,
-                               additional_info=rv.additional_info,
-                               origin=rh.external[rk])
-            return new_rh
-
-        orig_rh = reduce_runhistory(cr.original_runhistory, keep_budgets)
-        vali_rh = reduce_runhistory(cr.validated_runhistory, keep_budgets)
-        trajectory = [entry for entry in cr.trajectory if (entry['incumbent'] in orig_rh.config_ids.keys())]
-
-        if any([len(x) == 0 for x in [orig_rh.data, trajectory]]):
-            self.logger.debug("Runhistory: %s, Trajectory: %s", str(orig_rh.data), str(trajectory))
+        """Creates a new ConfiguratorRun without all the target algorithm runs that are not in the list of budgets
+        (runs of the default configuration are kept). The new run is a view on the runs of the budgets, so no
+        runhistories are copied. Will affect original, validated and epm-RunHistories as well as Trajectory"""
+        cached = self.cache.get(ConfiguratorRun.identify(cr.path_to_folder, keep_budgets))
+        if cached is not None:
+            return cached
+
+        store = self._get_container_store()
+        default_idx = store.configs.index(cr.default)
+        if self.sqlite_store is not None:
+            view = self._get_sqlite_view(cr).derive(budgets=keep_budgets, keep_config_indices=[default_idx] if
+                                                    default_idx is not None else [])
+        else:
+            indices = self._get_indices(cr)
+            keep = np.union1d(store.select(budgets=keep_budgets, indices=indices),
+                              store.select(config_indices=[default_idx] if default_idx is not None else [],
+                                           indices=indices))
+            view = store.view(indices[np.isin(indices, keep)])
+
+        original_configs = set(view.get_config_indices(view.select(origins=[DataOrigin.INTERNAL])))
+        trajectory = [entry for entry in cr.trajectory if store.configs.index(entry['incumbent']) in original_configs]
+
+        if len(original_configs) == 0 or len(trajectory) == 0:
+            self.logger.debug("Runs: %d, Trajectory: %s", len(view), str(trajectory))
             raise ValueError("Reducing to budget {} for ConfiguratorRun {} failed for runhistory or trajectory. Are "
                              "same budgets used for all parallel runs?".format(str(keep_budgets), cr.path_to_folder))
 
         new_cr = ConfiguratorRun(scenario=cr.scenario,
-                                 original_runhistory=orig_rh,
-                                 validated_runhistory=vali_rh,
+                                 original_runhistory=None,
+                                 validated_runhistory=None,
                                  trajectory=trajectory,
                                  options=self.analyzing_options,
                                  output_dir=self.output_dir,
                                  path_to_folder=cr.path_to_folder,
                                  reduced_to_budgets=keep_budgets,
+                                 run_store=view,
                                  )
 
         self.logger.debug("Reduced CR %s to CR %s", cr.get_identifier(), new_cr.get_identifier())
 
-        self._cache(cr)
+        self._cache(new_cr)
 
         return new_cr
 
     def _cache(self, configurator_run):
-        self.cache[configurator_run.get_identifier()] = configurator_run
\ No newline at end of file
+        self.cache.put(configurator_run.get_identifier(), configurator_run)
+
+    def update(self):
+        """Ingest the data that was added to the folders since they were read (or last updated), while the
+        configurator is still running (CAVE's watch-mode). Only the new runs and trajectory-entries are read (see
+        `FolderWatcher <apidoc/cave.reader.folder_watcher>`_) and appended to the folders' ConfiguratorRuns and the
+        store of all runs. Derived runs (budgets and aggregations) and the metadata are recreated on next access.
+
+        Returns
+        -------
+        changed: Set[str]
+            the inputs that changed, from ['runs', 'configs', 'incumbent', 'trajectory'] (see `_get_changes`)
+        """
+        if self._watchers is None:
+            self._watchers = OrderedDict()
+            for f, ta_exec_dir in zip(self.folders, self.ta_exec_dirs):
+                watcher = FolderWatcher.create(f, self.data[f], self.file_format, ta_exec_dir)
+                if watcher is not None:
+                    self._watchers[f] = watcher
+
+        changed = set()
+        for f, watcher in self._watchers.items():
+            runs, trajectory = watcher.poll()
+            if len(runs) == 0 and not trajectory:
+                continue
+            self.logger.info("%d new runs and %d new trajectory-entries in %s", len(runs), len(trajectory), f)
+            changed |= self._get_changes(self.data[f], runs, trajectory)
+            self.data[f].append(runs, trajectory)
+            if len(runs) > 0:
+                if self._container_store is not None and self.sqlite_store is None:
+                    self._folder_indices[f] = np.concatenate([self._folder_indices[f],
+                                                              self._container_store.extend(runs)])
+                elif self.sqlite_store is not None and not isinstance(self.data[f].run_store, SQLiteRunView):
+                    # Runs of folders in the sqlite-store are added by the ConfiguratorRun (see `append`)
+                    self.sqlite_store.extend(runs, folder=f)
+
+        if changed:
+            self._metadata = None
+            self.cache.clear()
+        return changed
+
+    @staticmethod
+    def _get_changes(cr, runs, trajectory):
+        """Kinds of inputs that change, if the new runs and trajectory-entries are appended to a ConfiguratorRun.
+
+        Returns
+        -------
+        changed: Set[str]
+            'runs' for any new run, 'configs' if a new run is of a configuration without previous runs, 'incumbent'
+            if the incumbent changes or a new run is of the default or the incumbent and 'trajectory' for any new
+            trajectory-entry
+        """
+        changed = set()
+        if len(runs) > 0:
+            changed.add('runs')
+            store = cr.run_store
+            known = set(store.get_config_indices(store.select(origins=[DataOrigin.INTERNAL])).tolist())
+            new_configs = runs.get_all_configs()
+            if any([store.configs.index(c) not in known for c in new_configs]):
+                changed.add('configs')
+            if any([c == cr.default or c == cr.incumbent for c in new_configs]):
+                changed.add('incumbent')
+        if trajectory:
+            changed.add('trajectory')
+            if trajectory[-1]['incumbent'] != cr.incumbent:
+                changed.add('incumbent')
+        return changed
+
+    def get_cache_stats(self):
+        """ Hits, misses, evictions and estimated memory of the cache for aggregated and reduced ConfiguratorRuns """
+        return self.cache.get_stats()
+
+
+def _read_folder(folder, ta_exec_dir, options, file_format, validation_format, output_dir, directory):
+    """Create a ConfiguratorRun from a folder. Module-level, so it can be executed by worker processes. The runs and
+    features are returned in shared memory in `directory` (see `ConfiguratorRun.share_runs`), only the rest of the
+    run is pickled.
+
+    Returns
+    -------
+    configurator_run, handle: ConfiguratorRun, SharedRunDataHandle
+        run without runs and features and the handle to attach them with `ConfiguratorRun.attach_runs`
+    """
+    cr = ConfiguratorRun.from_folder(folder,
+                                     ta_exec_dir,
+                                     load_default_options(options, file_format),
+                                     file_format=file_format,
+                                     validation_format=validation_format,
+                                     output_dir=output_dir)
+    return cr, cr.share_runs(directory)
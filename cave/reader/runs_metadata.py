@@ -0,0 +1,114 @@
+from collections import OrderedDict
+
+import numpy as np
+from smac.runhistory.runhistory import DataOrigin
+
+
+class RunsMetadata(object):
+    """
+    Metadata of all runs of a RunsContainer (folders, budgets, number of runs per budget and configuration and ranges
+    of the runtimes), computed once from the container's `RunStore`.
+
+    Analyzers query budgets and folders over and over (e.g. to decide whether to analyze per budget), which would
+    otherwise iterate over the runs of all folders on every call. The metadata is only computed when the runs change
+    (see `RunsContainer.get_metadata`), queries are lookups.
+
+    Like `ConfiguratorRun.get_budgets`, only original runs (origin INTERNAL) are considered. Runs that exist in
+    multiple folders are counted once, like in the runs aggregated over all folders.
+
+    Attributes
+    ----------
+    folders: List[str]
+        all folders, in order of the container
+    budgets: List[float]
+        all budgets, sorted
+    folder_budgets: Dict[str, Set[float]]
+        budgets per folder
+    runs_per_budget: Dict[float, int]
+        number of runs per budget
+    runs_per_config: np.array
+        number of runs per configuration (one per instance-seed-pair, see `RunStore.count_runs_per_config`), indexed
+        by the configuration's id in the store, see `get_runs_per_config` for configurations interned later
+    time_range: Tuple[float, float]
+        minimum and maximum runtime of all runs (None, if there are no runs)
+    time_range_per_budget: Dict[float, Tuple[float, float]]
+        minimum and maximum runtime per budget
+    """
+
+    def __init__(self, store, folder_indices):
+        """
+        Parameters
+        ----------
+        store: RunStore
+            store with the runs of all folders
+        folder_indices: Dict[str, np.array]
+            mapping folders to the indices of their runs in the store
+        """
+        internal = store.select(origins=[DataOrigin.INTERNAL])
+        self.folders = list(folder_indices.keys())
+        self.budgets = store.get_budgets(internal)
+        self.folder_budgets = OrderedDict([(folder, set(store.get_budgets(store.select(origins=[DataOrigin.INTERNAL],
+                                                                                         indices=indices))))
+                                           for folder, indices in folder_indices.items()])
+
+        unique = store.unique_indices(internal)
+        budget, time = store.budget[unique], store.time[unique]
+        budgets, inverse, counts = np.unique(budget, return_inverse=True, return_counts=True)
+        self.runs_per_budget = OrderedDict([(float(b), int(n)) for b, n in zip(budgets, counts)])
+        self.runs_per_config = store.count_runs_per_config(only_max_observed_budget=True, indices=unique)
+
+        self.time_range = (float(np.min(time)), float(np.max(time))) if len(time) > 0 else None
+        minima, maxima = np.full(len(budgets), np.inf), np.full(len(budgets), -np.inf)
+        np.minimum.at(minima, inverse, time)
+        np.maximum.at(maxima, inverse, time)
+        self.time_range_per_budget = OrderedDict([(float(b), (float(lo), float(hi)))
+                                                  for b, lo, hi in zip(budgets, minima, maxima)])
+
+    def get_runs_per_config(self, n_configs):
+        """Number of runs per configuration for the first `n_configs` configurations of the store. The configuration
+        table grows with configurations interned after the metadata was computed (e.g. estimated by an epm), they have
+        no original runs.
+
+        Parameters
+        ----------
+        n_configs: int
+            number of configurations in the store's table
+
+        Returns
+        -------
+        runs_per_config: np.array
+            runs per configuration, indexed by the configuration's id in the store
+        """
+        if n_configs <= len(self.runs_per_config):
+            return self.runs_per_config
+        return np.concatenate([self.runs_per_config,
+                               np.zeros(n_configs - len(self.runs_per_config), dtype=self.runs_per_config.dtype)])
+
+    @classmethod
+    def from_sqlite_store(cls, store, folders):
+        """Compute the metadata with queries on a `SQLiteRunStore`, without loading the runs into memory.
+
+        Parameters
+        ----------
+        store: SQLiteRunStore
+            store with the runs of all folders
+        folders: List[str]
+            all folders, in order of the container
+
+        Returns
+        -------
+        metadata: RunsMetadata
+            metadata of all runs in the store
+        """
+        metadata = cls.__new__(cls)
+        internal = [DataOrigin.INTERNAL]
+        metadata.folders = list(folders)
+        metadata.budgets = store.get_budgets(origins=internal)
+        metadata.folder_budgets = OrderedDict([(folder, set(store.get_budgets(folders=[folder], origins=internal)))
+                                               for folder in folders])
+        metadata.runs_per_budget = OrderedDict(sorted(store.count_runs_per_budget(origins=internal).items()))
+        metadata.runs_per_config = store.count_runs_per_config(origins=internal)
+        metadata.time_range_per_budget = OrderedDict(sorted(store.get_time_ranges(origins=internal).items()))
+        ranges = list(metadata.time_range_per_budget.values())
+        metadata.time_range = (min([r[0] for r in ranges]), max([r[1] for r in ranges])) if ranges else None
+        return metadata
@@ -0,0 +1,128 @@
+import copy
+import hashlib
+import logging
+import os
+
+import numpy as np
+from smac.scenario.scenario import Scenario
+
+from cave.reader.base_reader import changedir
+
+
+class ScenarioCache(object):
+    """
+    Process-wide memo of parsed scenarios, keyed by their content.
+
+    Parallel runs of one optimization usually share the same scenario (same options, instance- and feature-files).
+    Parsing a scenario reads all of these files, which is expensive for large feature-files, so every scenario is
+    only parsed once and all runs with the same content share one Scenario-object. The key (see `fingerprint`) is
+    computed over all options and the content of all files the options point to, so scenarios that differ only in
+    the location of the (equal) files are shared as well.
+
+    Shared scenarios must not be changed. Their feature-arrays are set read-only, analysis-specific variants (e.g. with
+    PCA-reduced features) are created with `derive`, which replaces attributes on a shallow copy.
+    Scenarios that were pickled (e.g. read in worker-processes or loaded from the `InputCache`) are unified with
+    `share`.
+    """
+
+    _scenarios = {}    # fingerprint -> Scenario
+    _file_hashes = {}  # (path, size, mtime) -> sha1 of content
+
+    @classmethod
+    def get(cls, scen_dict, ta_exec_dir='.'):
+        """Return the scenario for the options, parsing it only if no scenario with the same content was parsed.
+
+        Parameters
+        ----------
+        scen_dict: dict
+            options of the scenario (as returned by smac's `InputReader.read_scenario_file`)
+        ta_exec_dir: str
+            directory the paths in the options are relative to
+
+        Returns
+        -------
+        scenario: Scenario
+            shared scenario-object
+        """
+        logger = logging.getLogger(cls.__module__ + '.' + cls.__name__)
+        ta_exec_dir = ta_exec_dir if ta_exec_dir else '.'
+        fingerprint = cls.fingerprint(scen_dict, ta_exec_dir)
+        if fingerprint in cls._scenarios:
+            logger.debug("Reusing scenario %s", fingerprint)
+            return cls._scenarios[fingerprint]
+        with changedir(ta_exec_dir):
+            logger.debug("Creating scenario from '%s'", ta_exec_dir)
+            scenario = Scenario(scen_dict)
+        scenario.cave_fingerprint = fingerprint
+        return cls.share(scenario)
+
+    @classmethod
+    def share(cls, scenario):
+        """ Return the shared scenario with the same content (registering this one, if there is none). """
+        fingerprint = getattr(scenario, 'cave_fingerprint', None)
+        if fingerprint is None:
+            return scenario
+        if fingerprint not in cls._scenarios:
+            _set_read_only(scenario)
+            cls._scenarios[fingerprint] = scenario
+        return cls._scenarios[fingerprint]
+
+    @classmethod
+    def clear(cls):
+        cls._scenarios.clear()
+        cls._file_hashes.clear()
+
+    @classmethod
+    def fingerprint(cls, scen_dict, ta_exec_dir='.'):
+        """ Hash over all options, options that point to files are replaced by the content of the files. """
+        sha = hashlib.sha1()
+        for key in sorted(scen_dict.keys()):
+            value = scen_dict[key]
+            path = os.path.join(ta_exec_dir, value) if isinstance(value, str) and value else None
+            if path and os.path.isfile(path):
+                value = 'file:' + cls._file_hash(path)
+            sha.update('{}={}\n'.format(key, value).encode())
+        return sha.hexdigest()
+
+    @classmethod
+    def _file_hash(cls, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key not in cls._file_hashes:
+            sha = hashlib.sha1()
+            with open(path, 'rb') as fh:
+                for chunk in iter(lambda: fh.read(1 << 20), b''):
+                    sha.update(chunk)
+            cls._file_hashes[key] = sha.hexdigest()
+        return cls._file_hashes[key]
+
+    @staticmethod
+    def derive(scenario, **attributes):
+        """Variant of a (shared) scenario with some attributes replaced, e.g. reduced features for an analysis. The
+        variant is a shallow copy, all other attributes (configuration space, instances, features) are shared.
+
+        Parameters
+        ----------
+        scenario: Scenario
+            scenario to derive from, remains unchanged
+        attributes: dict
+            attributes to replace in the variant
+
+        Returns
+        -------
+        variant: Scenario
+            shallow copy of the scenario with replaced attributes
+        """
+        variant = copy.copy(scenario)
+        variant.cave_fingerprint = None
+        for k, v in attributes.items():
+            setattr(variant, k, v)
+        return variant
+
+
+def _set_read_only(scenario):
+    """ Protect the feature-arrays of a shared scenario from (accidental) changes """
+    arrays = [scenario.feature_array] + list(scenario.feature_dict.values() if scenario.feature_dict else [])
+    for array in arrays:
+        if isinstance(array, np.ndarray):
+            array.flags.writeable = False
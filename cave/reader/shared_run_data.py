@@ -0,0 +1,134 @@
+import logging
+
+import numpy as np
+
+from cave.reader.config_table import ConfigTable
+from cave.reader.run_store import RunStore
+from cave.reader.scenario_cache import ScenarioCache
+from cave.utils.shared_arrays import SharedArrays
+
+
+class SharedRunData(object):
+    """
+    Runs of a RunStore, the vectors of its configurations and the instance-features of a scenario in shared memory
+    (see `SharedArrays`), to pass them between processes (e.g. the runs of folders read in worker-processes, see
+    `ConfiguratorRun.share_runs`).
+
+    Pickling a RunStore or Scenario copies all runs and features through a pipe and again on unpickling. Instead,
+    only the `handle` of a SharedRunData is sent, which holds the layout of the shared arrays and the (small)
+    python-objects: configurations, instances, additional infos of the runs and the scenario without its features.
+    The receiving process recreates store and scenario with `SharedRunDataHandle.attach`, whose arrays are
+    read-only views on the shared memory. Runs added to an attached store are appended to new (private) arrays.
+
+    Named index-arrays (e.g. of views on the store) can be shared with the runs.
+
+    Example
+    -------
+    .. code-block:: python
+
+        with SharedRunData(cr.run_store, cr.scenario) as shared:
+            executor.map(analyze_budget, [shared.handle] * len(budgets), budgets)
+
+        def analyze_budget(handle, budget):
+            run_store, scenario, _ = handle.attach()
+    """
+
+    def __init__(self, run_store, scenario=None, views=None, directory=None):
+        """
+        Parameters
+        ----------
+        run_store: RunStore
+            store (or view) with the runs to share
+        scenario: Scenario
+            optional, scenario whose features are shared
+        views: Dict[str, np.array]
+            optional, named index-arrays to share with the runs
+        directory: str
+            directory of the memory-mapped file (see `SharedArrays`)
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        arrays = {c: run_store.column(c) for c in RunStore.columns}
+        arrays['config_vectors'] = run_store.configs.vectors
+        views = views if views is not None else {}
+        arrays.update({'view_' + name: np.asarray(indices, dtype=np.int64) for name, indices in views.items()})
+        feature_instances, fingerprint = None, None
+        if scenario is not None:
+            fingerprint = getattr(scenario, 'cave_fingerprint', None)
+            if scenario.feature_dict:
+                feature_instances = list(scenario.feature_dict.keys())
+                arrays['feature_dict'] = np.array([scenario.feature_dict[i] for i in feature_instances])
+            if scenario.feature_array is not None:
+                arrays['feature_array'] = scenario.feature_array
+            # Features are attached from shared memory, everything else is pickled with the handle
+            scenario = ScenarioCache.derive(scenario, feature_dict={}, feature_array=None)
+        self._arrays = SharedArrays(arrays, directory=directory)
+        self.handle = SharedRunDataHandle(self._arrays.handle,
+                                          run_store.configs.configuration_space,
+                                          run_store.configs.get_origins(),
+                                          run_store.configs.get_created_configs(),
+                                          list(run_store.instances),
+                                          run_store.get_additional_info() if run_store.has_additional_info() else [],
+                                          scenario,
+                                          fingerprint,
+                                          feature_instances,
+                                          list(views.keys()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """ Remove the shared memory (see `SharedArrays.close`) """
+        self._arrays.close()
+
+
+class SharedRunDataHandle(object):
+    """ Picklable reference to `SharedRunData`, use `attach` in other processes. """
+
+    def __init__(self, arrays, configuration_space, config_origins, configs, instances, additional_info, scenario,
+                 scenario_fingerprint, feature_instances, views):
+        self.arrays = arrays
+        self.configuration_space = configuration_space
+        self.config_origins = config_origins
+        self.configs = configs
+        self.instances = instances
+        self.additional_info = additional_info
+        self.scenario = scenario
+        self.scenario_fingerprint = scenario_fingerprint
+        self.feature_instances = feature_instances
+        self.views = views
+
+    def attach(self):
+        """Recreate run-store and scenario on the shared arrays, without copying runs, vectors or features.
+
+        Returns
+        -------
+        run_store, scenario, views: RunStore, Scenario, Dict[str, np.array]
+            store with all shared runs, scenario with shared features (None if no scenario was shared) and the shared
+            index-arrays
+        """
+        arrays = self.arrays.attach()
+        store = RunStore()
+        store.configs = ConfigTable.from_vectors(self.configuration_space, arrays['config_vectors'],
+                                                 self.config_origins, self.configs)
+        store.instances = list(self.instances)
+        store.instance_ids = {instance: idx for idx, instance in enumerate(store.instances)}
+        store.additional_info = list(self.additional_info)
+        store._data = {c: arrays[c] for c in RunStore.columns}
+
+        scenario = self.scenario
+        if scenario is not None:
+            feature_dict = {}
+            if self.feature_instances is not None:
+                feature_dict = {i: arrays['feature_dict'][idx] for idx, i in enumerate(self.feature_instances)}
+            # The attached scenario has the same content, so it can be shared like the original one
+            scenario = ScenarioCache.derive(scenario, feature_dict=feature_dict,
+                                            feature_array=arrays.get('feature_array'),
+                                            cave_fingerprint=self.scenario_fingerprint)
+        return store, scenario, {name: arrays['view_' + name] for name in self.views}
+
+    def remove(self):
+        """ Remove the shared memory, e.g. once the runs handed over by another process are attached """
+        self.arrays.remove()
@@ -8,11 +8,12 @@ import pandas as pd
 from ConfigSpace import Configuration
 from ConfigSpace.util import deactivate_inactive_hyperparameters, fix_types
 from smac.runhistory.runhistory import RunHistory
-from smac.scenario.scenario import Scenario
 from smac.utils.io.input_reader import InputReader
 
-from cave.reader.base_reader import BaseReader, changedir
+from cave.reader.base_reader import BaseReader
 from cave.reader.conversion.csv2rh import CSV2RH
+from cave.reader.scenario_cache import ScenarioCache
+from cave.reader.trajectory_table import TrajectoryTable
 from cave.utils.io import load_csv_to_pandaframe
 
 
@@ -44,9 +45,7 @@ class SMAC2Reader(BaseReader):
             scen_fn = self.get_glob_file(self.folder, 'scenario.txt')
         scen_dict = in_reader.read_scenario_file(scen_fn)
         scen_dict['output_dir'] = ""
-        with changedir(self.ta_exec_dir):
-            self.logger.debug("Creating scenario from \"%s\"", self.ta_exec_dir)
-            scen = Scenario(scen_dict)
+        scen = ScenarioCache.get(scen_dict, self.ta_exec_dir)
 
         if (not run_1_existed) and os.path.exists('run_1'):
             shutil.rmtree('run_1')
@@ -73,8 +72,7 @@ class SMAC2Reader(BaseReader):
         csv_data = load_csv_to_pandaframe(rh_fn, self.logger)
         data = pd.DataFrame()
         data["config_id"] = csv_data["Run History Configuration ID"]
-        data["instance_id"] = csv_data["Instance ID"].apply(lambda x:
-                self.scen.train_insts[x-1])
+        data["instance_id"] = np.array(self.scen.train_insts, dtype=object)[csv_data["Instance ID"].astype(int) - 1]
         data["seed"] = csv_data["Seed"]
         data["time"] = csv_data["Runtime"]
         if self.scen.run_obj == 'runtime':
@@ -162,19 +160,21 @@ class SMAC2Reader(BaseReader):
 
         # Translate smac2-validation (RunResultString-matrix) to csv
         csv_data = load_csv_to_pandaframe(results_fn, self.logger, delimiter='\",\"')
-        data = pd.DataFrame()
-        for idx, row in csv_data.iterrows():
+        rows = []
+        config_ids = [int(re.match(r'^Run result line of validation config #(\d*)$', column).group(1))
+                      for column in csv_data.columns[2:]]
+        for row in csv_data.itertuples(index=False, name=None):
             instance, seed = row[0], row[1]
-            for column in csv_data.columns[2:]:
-                config_id = int(re.match(r'^Run result line of validation config #(\d*)$', column).group(1))
-                result = [e.strip() for e in row[column].split(',')]
-                data = data.append({"config_id" : config_id,
-                                    "instance_id" : instance,
-                                    "seed" : seed,
-                                    "time" : result[1],
-                                    "cost" : result[1] if self.scen.run_obj == 'runtime' else result[3],
-                                    "status" : result[0]},
-                                    ignore_index=True)
+            for config_id, run_result in zip(config_ids, row[2:]):
+                result = [e.strip() for e in run_result.split(',')]
+                rows.append({"config_id" : config_id,
+                             "instance_id" : instance,
+                             "seed" : seed,
+                             "time" : result[1],
+                             "cost" : result[1] if self.scen.run_obj == 'runtime' else result[3],
+                             "status" : result[0]})
+        # Create DataFrame at once (appending row by row copies the whole frame every time)
+        data = pd.DataFrame(rows)
 
         rh = CSV2RH().read_csv_to_rh(data,
                                      cs=cs,
@@ -192,29 +192,12 @@ class SMAC2Reader(BaseReader):
         """Expects the following files:
 
         - `self.folder/smac-output/aclib/state-run1/traj-run-(...).csv`
+
+        Incumbents are referenced by id, so the configurations of the runhistory are used (`get_runhistory` has to be
+        called first).
         """
         traj_fn = self.get_glob_file(self.folder, 'traj-run-*.txt')
-        with open(traj_fn, 'r') as csv_file:
-            csv_data = list(csv.reader(csv_file, delimiter=',',
-                                       skipinitialspace=True))
-        header, csv_data = csv_data[0][:-1], np.array([csv_data[1:]])[0]
-        csv_data = pd.DataFrame(np.delete(csv_data, np.s_[5:], axis=1), columns=header)
-        csv_data = csv_data.apply(pd.to_numeric, errors='ignore')
-        traj = []
-
-        def add_to_traj(row):
-            new_entry = {}
-            new_entry['cpu_time'] = row['CPU Time Used']
-            new_entry['total_cpu_time'] = None
-            new_entry["wallclock_time"] = row['Wallclock Time']
-            new_entry["evaluations"] = -1
-            new_entry["cost"] = row["Estimated Training Performance"]
-            new_entry["incumbent"] = self.id_to_config[row["Incumbent ID"]]
-            new_entry["budget"] = 0  # No budget-support for SMAC2!
-            traj.append(new_entry)
-        csv_data.apply(add_to_traj, axis=1)
-        return traj
-
+        return TrajectoryTable.read_smac2(traj_fn, self.id_to_config).to_list()
 
     @classmethod
     def check_for_files(cls, path):
@@ -1,16 +1,19 @@
 import os
 import shutil
 import typing
+from collections import deque
 
 from ConfigSpace.configuration_space import ConfigurationSpace, Configuration
 from ConfigSpace.hyperparameters import FloatHyperparameter, IntegerHyperparameter, Constant, CategoricalHyperparameter
 from ConfigSpace.read_and_write import json as pcs_json
-from smac.runhistory.runhistory import RunHistory
-from smac.scenario.scenario import Scenario
+from smac.runhistory.runhistory import RunHistory, RunKey, RunValue
+from smac.tae.execute_ta_run import StatusType
 from smac.utils.io.input_reader import InputReader
-from smac.utils.io.traj_logging import TrajLogger
 
 from cave.reader.base_reader import BaseReader, changedir
+from cave.reader.scenario_cache import ScenarioCache
+from cave.reader.trajectory_table import TrajectoryTable
+from cave.utils.json_stream import JsonStream
 
 
 class SMAC3Reader(BaseReader):
@@ -35,8 +38,7 @@ class SMAC3Reader(BaseReader):
                     scen_dict['cs'] = pcs_json.read(fh.read())
                     scen_dict['pcs_fn'] = cs_json
 
-            self.logger.debug("Creating scenario from '%s'", self.ta_exec_dir)
-            scen = Scenario(scen_dict)
+        scen = ScenarioCache.get(scen_dict, self.ta_exec_dir)
 
         if (not run_1_existed) and os.path.exists('run_1'):
             shutil.rmtree('run_1')
@@ -49,12 +51,9 @@ class SMAC3Reader(BaseReader):
         rh: RunHistory
             runhistory
         """
-        rh_fn = os.path.join(self.folder, 'runhistory.json')
-        if not os.path.isfile(rh_fn):
-            rh_fn = self.get_glob_file(self.folder, 'runhistory.json')
-        rh = RunHistory()
+        rh_fn = self.get_runhistory_fn()
         try:
-            rh.load_json(rh_fn, cs)
+            rh = self.load_runhistory(rh_fn, cs)
         except FileNotFoundError:
             self.logger.warning("%s not found. trying to read SMAC3-output, "
                                 "if that's not correct, change it with the "
@@ -62,6 +61,13 @@ class SMAC3Reader(BaseReader):
             raise
         return rh
 
+    def get_runhistory_fn(self):
+        """ Path to the runhistory.json of this folder """
+        rh_fn = os.path.join(self.folder, 'runhistory.json')
+        if not os.path.isfile(rh_fn):
+            rh_fn = self.get_glob_file(self.folder, 'runhistory.json')
+        return rh_fn
+
     def get_validated_runhistory(self, cs):
         """
         Returns
@@ -70,9 +76,8 @@ class SMAC3Reader(BaseReader):
             runhistory with validation-data, if available
         """
         rh_fn = os.path.join(self.folder, 'validated_runhistory.json')
-        rh = RunHistory()
         try:
-            rh.load_json(rh_fn, cs)
+            rh = self.load_runhistory(rh_fn, cs)
         except FileNotFoundError:
             self.logger.warning("%s not found. trying to read SMAC3-validation-output, "
                                 "if that's not correct, change it with the "
@@ -80,58 +85,128 @@ class SMAC3Reader(BaseReader):
             raise
         return rh
 
+    def load_runhistory(self, fn, cs):
+        """Load a runhistory.json incrementally (replaces `RunHistory.load_json`).
+
+        `RunHistory.load_json` decodes the whole document into python-objects before creating the runs, so peak
+        memory is several times the size of the runhistory. Here the "data"-section is streamed run by run into
+        (compact) RunKey/RunValue-tuples, which are added to the RunHistory as soon as the configurations are known
+        (in SMAC's format, the "configs"-section comes after the "data"-section).
+
+        Parameters
+        ----------
+        fn: str
+            path to runhistory.json
+        cs: ConfigurationSpace
+            configuration space of the runs
+
+        Returns
+        -------
+        rh: RunHistory
+            runhistory with all runs in the file
+        """
+        rh = RunHistory()
+        runs, configs, config_origins = deque(), {}, {}
+        with open(fn, 'r') as fh:
+            try:
+                for section, item in JsonStream(fh, sections=['data', 'configs', 'config_origins'],
+                                                object_hook=StatusType.enum_hook).items():
+                    if section == 'data':
+                        k, v = item
+                        runs.append((RunKey(int(k[0]), k[1], int(k[2]), float(k[3]) if len(k) == 4 else 0),
+                                     RunValue(float(v[0]), float(v[1]), StatusType(v[2]), v[3])))
+                    elif section == 'configs':
+                        configs[int(item[0])] = item[1]
+                    elif section == 'config_origins':
+                        config_origins[item[0]] = item[1]
+            except ValueError as err:
+                self.logger.warning("Encountered exception %s while reading runhistory from %s. Not adding any runs!",
+                                    err, fn)
+                return rh
+
+        ids_config = {id_: Configuration(cs, values=values, origin=config_origins.get(str(id_), None))
+                      for id_, values in configs.items()}
+        del configs
+        # Keep the config-ids of the file (RunHistory.add assigns new ids in order of appearance)
+        rh.ids_config = ids_config
+        rh.config_ids = {config: id_ for id_, config in ids_config.items()}
+        rh._n_id = len(rh.config_ids)
+        # Runs are removed from the queue while adding, so they are only held once in memory
+        while runs:
+            k, v = runs.popleft()
+            rh.add(config=ids_config[k.config_id],
+                   cost=v.cost,
+                   time=v.time,
+                   status=v.status,
+                   instance_id=k.instance_id,
+                   seed=k.seed,
+                   budget=k.budget,
+                   additional_info=v.additional_info)
+        return rh
+
     def get_trajectory(self, cs):
+        """Read the trajectory in bulk (see `TrajectoryTable`), Configurations are only created once per unique
+        incumbent. `traj.json` is preferred over the deprecated `traj_aclib2.json`.
 
-        def alternative_configuration_recovery(config_list: typing.List[str], cs: ConfigurationSpace):
-            """ Used to recover ints and bools as categoricals or constants from trajectory """
-            config_dict = {}
-            for param in config_list:
-                k,v = param.split("=")
-                v = v.strip("'")
-                hp = cs.get_hyperparameter(k)
-                if isinstance(hp, FloatHyperparameter):
-                    v = float(v)
-                elif isinstance(hp, IntegerHyperparameter):
-                    v = int(v)
-                ################# DIFFERENCE: ################
-                elif isinstance(hp, CategoricalHyperparameter) or isinstance(hp, Constant):
-                    if isinstance(hp.default_value, bool):
-                        v = True if v == 'True' else False
-                    elif isinstance(hp.default_value, int):
-                        v = int(v)
-                    elif isinstance(hp.default_value, float):
-                        v = float(v)
-                    else:
-                        v = v
-                ##############################################
-                config_dict[k] = v
-            config = Configuration(configuration_space=cs, values=config_dict)
-            config.origin = "External Trajectory"
-            return config
-
-        TrajLogger._convert_dict_to_config = alternative_configuration_recovery
+        Returns
+        -------
+        trajectory: List[dict]
+            trajectory-entries like returned by smac's TrajLogger
+        """
+        def from_dict(values):
+            return Configuration(cs, values)
+
+        def from_strings(config_list):
+            return self._recover_configuration(config_list, cs)
 
         # Try to find trajectory in "alljson"-format todo instead just convert "old" smac data to new smac data
         traj_fn = os.path.join(self.folder, 'traj.json')
         if os.path.isfile(traj_fn):
             self.logger.debug("Found trajectory file in alljson-format at %s", traj_fn)
-            return TrajLogger.read_traj_alljson_format(fn=traj_fn, cs=cs)
-        self.logger.debug("%s not found. Trying to find in subfolders.")
+            return TrajectoryTable.read_json(traj_fn, from_dict).to_list()
+        self.logger.debug("%s not found. Trying to find in subfolders.", traj_fn)
         try:
-            return TrajLogger.read_traj_alljson_format(fn=self.get_glob_file(self.folder, 'traj.json'), cs=cs)
+            return TrajectoryTable.read_json(self.get_glob_file(self.folder, 'traj.json'), from_dict).to_list()
         except FileNotFoundError:
             self.logger.info("Globbed approach failed. Trying old format.")
         old_traj_fn = os.path.join(self.folder, 'traj_aclib2.json')
         if os.path.isfile(old_traj_fn):
             self.logger.debug("Found trajectory file in aclib2-format (deprecated) at %s", old_traj_fn)
-            return TrajLogger.read_traj_aclib_format(fn=old_traj_fn, cs=cs)
+            return TrajectoryTable.read_json(old_traj_fn, from_strings).to_list()
         try:
-            return TrajLogger.read_traj_aclib_format(fn=self.get_glob_file(self.folder, 'traj_aclib2.json'), cs=cs)
+            return TrajectoryTable.read_json(self.get_glob_file(self.folder, 'traj_aclib2.json'),
+                                             from_strings).to_list()
         except FileNotFoundError:
             raise FileNotFoundError("Neither 'traj.json' nor 'traj_aclib2.json in %s or subdirectories.", self.folder)
 
-        traj = TrajLogger.read_traj_aclib_format(fn=traj_fn, cs=cs)
-        return traj
+    @staticmethod
+    def _recover_configuration(config_list: typing.List[str], cs: ConfigurationSpace):
+        """ Used to recover ints and bools as categoricals or constants from trajectory (aclib2-format, replaces
+        `TrajLogger._convert_dict_to_config`) """
+        config_dict = {}
+        for param in config_list:
+            k,v = param.split("=")
+            v = v.strip("'")
+            hp = cs.get_hyperparameter(k)
+            if isinstance(hp, FloatHyperparameter):
+                v = float(v)
+            elif isinstance(hp, IntegerHyperparameter):
+                v = int(v)
+            ################# DIFFERENCE: ################
+            elif isinstance(hp, CategoricalHyperparameter) or isinstance(hp, Constant):
+                if isinstance(hp.default_value, bool):
+                    v = True if v == 'True' else False
+                elif isinstance(hp.default_value, int):
+                    v = int(v)
+                elif isinstance(hp.default_value, float):
+                    v = float(v)
+                else:
+                    v = v
+            ##############################################
+            config_dict[k] = v
+        config = Configuration(configuration_space=cs, values=config_dict)
+        config.origin = "External Trajectory"
+        return config
 
     @classmethod
     def check_for_files(cls, path):
@@ -0,0 +1,570 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+from ConfigSpace.configuration_space import Configuration
+from smac.runhistory.runhistory import DataOrigin, RunHistory
+from smac.tae.execute_ta_run import StatusType
+
+from cave.reader.config_table import ConfigTable
+from cave.reader.run_store import RunStore, NO_SEED
+from cave.utils.json_stream import JsonStream
+
+
+class SQLiteRunStore(object):
+    """
+    Out-of-core storage of target algorithm runs in a SQLite-file.
+
+    Runs are rows in one (indexed) table with the same columns as `RunStore` and an additional *folder_idx*, so the
+    runs of all folders of a `RunsContainer` are kept in one file. Configurations and instances are interned in memory
+    (like in `RunStore`, they are much fewer than runs), the store's ConfigTable is shared with all in-memory stores
+    created from it.
+
+    SMAC3's runhistory.json can be ingested as a stream (see `ingest_runhistory_json`), so neither the decoded
+    document nor a RunHistory-object is ever held in memory. Aggregations (budgets, runs per budget and configuration,
+    runtime-ranges, costs per configuration and instance and the oracle) are indexed queries, that only return their
+    (small) results. They resemble the `RunStore`-methods of the same name, but filter runs by folders, budgets and
+    origins instead of by indices. Runs with the same configuration, instance, seed and budget (e.g. the same run in
+    multiple folders) are counted once.
+
+    In a `RunsContainer`, the runs stay in the store: the runs of folders, budgets and aggregations are
+    `SQLiteRunView`s, that query the store. Subsets of the runs can be loaded into an in-memory `RunStore` with
+    `to_run_store`.
+    """
+
+    _schema = """CREATE TABLE IF NOT EXISTS runs (folder_idx INTEGER, config_idx INTEGER, instance_idx INTEGER,
+                                                  seed INTEGER, budget REAL, cost REAL, time REAL, status INTEGER,
+                                                  origin INTEGER, additional_info TEXT)"""
+    _indices = ["CREATE INDEX IF NOT EXISTS runs_config ON runs (config_idx, instance_idx, seed, budget)",
+                "CREATE INDEX IF NOT EXISTS runs_budget ON runs (budget, origin)",
+                ]
+    columns = RunStore.columns
+
+    def __init__(self, path=None, chunk_size=100000):
+        """
+        Parameters
+        ----------
+        path: str
+            path to the SQLite-file (will be overwritten), if None, a temporary file is used
+        chunk_size: int
+            number of runs inserted or loaded at once (bounds the memory used for ingestion)
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix='.sqlite')
+            os.close(fd)
+        if os.path.exists(path):
+            os.remove(path)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.connection = sqlite3.connect(path)
+        # The file only holds derived data, so durability is traded for speed of ingestion
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute(self._schema)
+        self._indexed = False
+
+        self.configs = ConfigTable()
+        self.instances = []     # index -> instance (str or None)
+        self.instance_ids = {}  # instance -> index
+        self.folders = []       # index -> folder
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def _folder_idx(self, folder):
+        if folder not in self.folders:
+            self.folders.append(folder)
+        return self.folders.index(folder)
+
+    def intern_instance(self, instance):
+        """ Return the index of the instance, adding it to the table if necessary. """
+        idx = self.instance_ids.get(instance)
+        if idx is None:
+            idx = len(self.instances)
+            self.instances.append(instance)
+            self.instance_ids[instance] = idx
+        return idx
+
+    ################################################################################################################
+    #  Filling the store                                                                                           #
+    ################################################################################################################
+
+    def _insert(self, rows):
+        self.connection.executemany("INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._indexed = False
+
+    def extend(self, run_store, folder=None):
+        """Add all runs of an in-memory store (or view).
+
+        Parameters
+        ----------
+        run_store: RunStore
+            runs to add
+        folder: str
+            folder the runs belong to
+        """
+        folder_idx = self._folder_idx(folder)
+        config_map = np.array([self.configs.intern(c) for c in run_store.configs], dtype=np.int64)
+        instance_map = np.array([self.intern_instance(i) for i in run_store.instances], dtype=np.int64)
+        infos = run_store.get_additional_info() if run_store.has_additional_info() else None
+        columns = [np.full(len(run_store), folder_idx),
+                   config_map[run_store.config_idx],
+                   instance_map[run_store.instance_idx]] + [run_store.column(c) for c in self.columns[2:]]
+        for start in range(0, len(run_store), self.chunk_size):
+            chunk = slice(start, start + self.chunk_size)
+            rows = zip(*[c[chunk].tolist() for c in columns],
+                       [_encode(i) for i in infos[chunk]] if infos else [None] * len(columns[0][chunk]))
+            self._insert(rows)
+        self.connection.commit()
+
+    def consume(self, batches, folder=None, origin=DataOrigin.INTERNAL):
+        """Add runs from batches of run-records (see `BaseReader.iter_runs`), one batch at a time.
+
+        Parameters
+        ----------
+        batches: Iterable[List[dict]]
+            batches of run-records, keyword-arguments of `RunStore.add`
+        folder: str
+            folder the runs belong to
+        origin: DataOrigin
+            origin of all runs
+
+        Returns
+        -------
+        n_runs: int
+            number of added runs
+        """
+        n_runs = 0
+        for batch in batches:
+            self.extend(RunStore().consume([batch], origin=origin), folder=folder)
+            n_runs += len(batch)
+        return n_runs
+
+    def ingest_runhistory_json(self, fn, cs, folder=None, origin=DataOrigin.INTERNAL):
+        """Stream the runs of a SMAC3-runhistory.json into the store, in chunks of `self.chunk_size` runs.
+
+        In SMAC's format, the "configs"-section comes after the "data"-section, so runs are inserted with the ids of
+        the file and mapped to the ids of the store's ConfigTable, once all configurations are known.
+
+        Parameters
+        ----------
+        fn: str
+            path to runhistory.json
+        cs: ConfigurationSpace
+            configuration space of the runs
+        folder: str
+            folder the runs belong to
+        origin: DataOrigin
+            origin of all runs
+
+        Returns
+        -------
+        n_runs: int
+            number of ingested runs
+        """
+        folder_idx = self._folder_idx(folder)
+        first_rowid = self.connection.execute("SELECT COALESCE(MAX(rowid), 0) FROM runs").fetchone()[0]
+        configs, config_origins, rows, n_runs = {}, {}, [], 0
+        with open(fn, 'r') as fh:
+            for section, item in JsonStream(fh, sections=['data', 'configs', 'config_origins'],
+                                            object_hook=StatusType.enum_hook).items():
+                if section == 'data':
+                    k, v = item
+                    seed = int(k[2]) if k[2] is not None else NO_SEED
+                    rows.append((folder_idx, int(k[0]), self.intern_instance(k[1]), seed,
+                                 float(k[3]) if len(k) == 4 else 0.0, float(v[0]), float(v[1]),
+                                 StatusType(v[2]).value, origin.value, _encode(v[3])))
+                    if len(rows) >= self.chunk_size:
+                        n_runs += len(rows)
+                        self._insert(rows)
+                        rows = []
+                elif section == 'configs':
+                    configs[int(item[0])] = item[1]
+                elif section == 'config_origins':
+                    config_origins[item[0]] = item[1]
+        n_runs += len(rows)
+        self._insert(rows)
+
+        config_map = [(id_, self.configs.intern(Configuration(cs, values=values,
+                                                              origin=config_origins.get(str(id_), None))))
+                      for id_, values in configs.items()]
+        self.connection.execute("CREATE TEMP TABLE config_map (file_id INTEGER PRIMARY KEY, config_idx INTEGER)")
+        self.connection.executemany("INSERT INTO config_map VALUES (?, ?)", config_map)
+        self.connection.execute("UPDATE runs SET config_idx = (SELECT m.config_idx FROM config_map m WHERE "
+                                "m.file_id = runs.config_idx) WHERE rowid > ?", (first_rowid,))
+        self.connection.execute("DROP TABLE config_map")
+        self.connection.commit()
+        self.logger.debug("Ingested %d runs from %s", n_runs, fn)
+        return n_runs
+
+    ################################################################################################################
+    #  Accessing the store                                                                                         #
+    ################################################################################################################
+
+    def _ensure_indices(self):
+        if not self._indexed:
+            for statement in self._indices:
+                self.connection.execute(statement)
+            self.connection.commit()
+            self._indexed = True
+
+    def _where(self, folders=None, budgets=None, origins=None, config_indices=None, keep_config_indices=None):
+        """ WHERE-clause and parameters for the filters (runs of `keep_config_indices` are kept on all budgets) """
+        folder_indices = [self.folders.index(f) for f in folders if f in self.folders] if folders is not None else None
+        budgets = [b if b is not None else 0.0 for b in budgets] if budgets is not None else None
+        origins = [o.value if isinstance(o, DataOrigin) else o for o in origins] if origins is not None else None
+        config_indices = [int(c) for c in config_indices] if config_indices is not None else None
+        clauses, params = [], []
+        for column, values in [('folder_idx', folder_indices), ('budget', budgets), ('origin', origins),
+                               ('config_idx', config_indices)]:
+            if values is not None:
+                clause = "{} IN ({})".format(column, ', '.join(['?'] * len(values)))
+                params.extend(values)
+                if column == 'budget' and keep_config_indices:
+                    clause = "({} OR config_idx IN ({}))".format(clause, ', '.join(['?'] * len(keep_config_indices)))
+                    params.extend([int(c) for c in keep_config_indices])
+                clauses.append(clause)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _runs(self, unique=True, **filters):
+        """Subquery (and parameters) of the runs matching the filters, with their rowid as *run_id*. If `unique`, runs
+        with the same configuration, instance, seed and budget are only selected once, the kept run is chosen like in
+        `RunStore.unique_indices` (the first one that is not capped, original runs first)."""
+        where, params = self._where(**filters)
+        if not unique:
+            return "SELECT rowid AS run_id, * FROM runs" + where, params
+        return ("SELECT * FROM (SELECT rowid AS run_id, *, ROW_NUMBER() OVER (PARTITION BY config_idx, instance_idx, "
+                "seed, budget ORDER BY status = {capped}, CASE WHEN status = {capped} THEN -cost ELSE 0 END, "
+                "origin != {internal}, rowid) AS duplicate FROM runs{where}) WHERE duplicate = 1").format(
+                where=where, **self._constants), params
+
+    # Status and origins of runs, that are used in queries
+    _constants = {'capped': StatusType.CAPPED.value,
+                  'internal': DataOrigin.INTERNAL.value,
+                  'counted': '{}, {}'.format(DataOrigin.INTERNAL.value, DataOrigin.EXTERNAL_SAME_INSTANCES.value),
+                  }
+
+    # Runs considered by smac's RunHistory for the runs and costs of configurations (see `RunStore._counted_runs`),
+    # with the highest budget first (the last one of equal runs, like `RunStore._highest_budget_runs`)
+    _counted = ("SELECT * FROM (SELECT config_idx, instance_idx, seed, budget, cost, ROW_NUMBER() OVER (PARTITION BY "
+                "config_idx, instance_idx, seed ORDER BY budget DESC, run_id DESC) AS budget_rank FROM ({runs}) WHERE "
+                "status != {capped} AND origin IN ({counted})){highest_budget}")
+
+    def _execute(self, sql, unique=True, **filters):
+        """Execute a query on the runs matching the filters. The query refers to them as `{runs}` (see `_runs`),
+        `{order}` is the order of the runs in a `SQLiteRunView`: for unique runs original runs first, then all
+        others, each in order of insertion."""
+        self._ensure_indices()
+        runs, params = self._runs(unique, **filters)
+        order = "ORDER BY origin != {}, run_id".format(DataOrigin.INTERNAL.value) if unique else "ORDER BY run_id"
+        return self.connection.execute(sql.format(runs=runs, order=order, **self._constants), params)
+
+    def _query(self, sql, unique=True, **filters):
+        return self._execute(sql, unique, **filters).fetchall()
+
+    def _fetch_chunks(self, cursor):
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            yield rows
+
+    def count(self, unique=True, **filters):
+        """ Number of runs matching the filters """
+        return self._query("SELECT COUNT(*) FROM ({runs})", unique, **filters)[0][0]
+
+    def get_budgets(self, **filters):
+        """ Sorted list of all budgets """
+        return [float(b) for b, in self._query("SELECT DISTINCT budget FROM ({runs}) ORDER BY budget", False,
+                                                **filters)]
+
+    def count_runs_per_budget(self, **filters):
+        """ Number of runs (one per configuration-instance-seed-combination) per budget """
+        return {float(b): n for b, n in self._query("SELECT budget, COUNT(*) FROM ({runs}) GROUP BY budget",
+                                                    **filters)}
+
+    def get_time_ranges(self, **filters):
+        """ Minimum and maximum runtime per budget (one run per configuration-instance-seed-combination) """
+        return {float(b): (float(lo), float(hi)) for b, lo, hi in self._query(
+                "SELECT budget, MIN(time), MAX(time) FROM ({runs}) GROUP BY budget", **filters)}
+
+    def get_config_indices(self, unique=True, **filters):
+        """ Indices of all configurations with at least one run, in order of first appearance """
+        rows = self._query("SELECT config_idx FROM (SELECT config_idx, ROW_NUMBER() OVER ({order}) AS position FROM "
+                           "({runs})) GROUP BY config_idx ORDER BY MIN(position)", unique, **filters)
+        return np.array([c for c, in rows], dtype=RunStore.dtypes['config_idx'])
+
+    def count_runs_per_config(self, only_max_observed_budget=True, unique=True, **filters):
+        """ Number of runs per configuration (see `RunStore.count_runs_per_config`), as array indexed by
+        configuration-index """
+        counts = np.zeros(len(self.configs), dtype=np.int64)
+        counted = self._counted.format(runs='{runs}', highest_budget=' WHERE budget_rank = 1' if
+                                       only_max_observed_budget else '', **self._constants)
+        for config_idx, n in self._query("SELECT config_idx, COUNT(*) FROM ({}) GROUP BY config_idx".format(counted),
+                                         unique, **filters):
+            counts[config_idx] = n
+        return counts
+
+    def get_mean_instance_costs(self, unique=True, **filters):
+        """Average cost per configuration-instance-pair over seeds (see `RunStore.get_mean_instance_costs`).
+
+        Returns
+        -------
+        config_idx, instance_idx, cost: np.array, np.array, np.array
+            equally long arrays, one entry per evaluated configuration-instance-pair
+        """
+        counted = self._counted.format(runs='{runs}', highest_budget=' WHERE budget_rank = 1', **self._constants)
+        rows = self._query("SELECT config_idx, instance_idx, AVG(cost) FROM ({}) GROUP BY config_idx, instance_idx "
+                           "ORDER BY config_idx, instance_idx".format(counted), unique, **filters)
+        columns = list(zip(*rows)) if rows else [[], [], []]
+        return (np.array(columns[0], dtype=np.int32), np.array(columns[1], dtype=np.int32),
+                np.array(columns[2], dtype=np.float64))
+
+    def get_oracle(self, instances=None, unique=True, **filters):
+        """ Best average cost per instance over all configurations (see `RunStore.get_oracle`) """
+        counted = self._counted.format(runs='{runs}', highest_budget=' WHERE budget_rank = 1', **self._constants)
+        oracle = {self.instances[i]: float(c) for i, c in self._query(
+                  "SELECT instance_idx, MIN(cost) FROM (SELECT instance_idx, AVG(cost) AS cost FROM ({}) GROUP BY "
+                  "config_idx, instance_idx) GROUP BY instance_idx".format(counted), unique, **filters)}
+        if instances is not None:
+            oracle = {i: c for i, c in oracle.items() if i in set(instances)}
+        return oracle
+
+    def get_column(self, name, unique=True, **filters):
+        """ Array of column `name` of the runs matching the filters (in the order of a `SQLiteRunView`) """
+        if name not in self.columns:
+            raise ValueError("Unknown column %s" % name)
+        cursor = self._execute("SELECT {} FROM ({{runs}}) {{order}}".format(name), unique, **filters)
+        chunks = [np.array([v for v, in rows], dtype=RunStore.dtypes[name]) for rows in self._fetch_chunks(cursor)]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=RunStore.dtypes[name])
+
+    def has_additional_info(self, unique=True, **filters):
+        return bool(self._query("SELECT EXISTS (SELECT 1 FROM ({runs}) WHERE additional_info IS NOT NULL)", unique,
+                                **filters)[0][0])
+
+    def get_additional_info(self, unique=True, **filters):
+        """ Additional information per run (None for runs without) """
+        cursor = self._execute("SELECT additional_info FROM ({runs}) {order}", unique, **filters)
+        return [_decode(i) for rows in self._fetch_chunks(cursor) for i, in rows]
+
+    def _iter_runs(self, unique=True, **filters):
+        """ Chunks of runs (columns of `RunStore` and additional info) matching the filters """
+        cursor = self._execute("SELECT {}, additional_info FROM ({{runs}}) {{order}}".format(', '.join(self.columns)),
+                               unique, **filters)
+        return self._fetch_chunks(cursor)
+
+    def to_runhistory(self, runhistory=None, unique=True, **filters):
+        """Create a smac RunHistory-object with the runs matching the filters, streamed in chunks.
+
+        Parameters
+        ----------
+        runhistory: RunHistory
+            optional, add the runs to this runhistory instead of a new one (runs that are already in it are ignored)
+
+        Returns
+        -------
+        runhistory: RunHistory
+            runhistory with the selected runs
+        """
+        rh = RunHistory() if runhistory is None else runhistory
+        for rows in self._iter_runs(unique, **filters):
+            for config_idx, instance_idx, seed, budget, cost, time, status, origin, info in rows:
+                rh.add(config=self.configs[config_idx],
+                       cost=cost,
+                       time=time,
+                       status=StatusType(status),
+                       instance_id=self.instances[instance_idx],
+                       seed=None if seed == NO_SEED else seed,
+                       budget=budget,
+                       additional_info=_decode(info),
+                       origin=DataOrigin(origin))
+        return rh
+
+    def overlay(self):
+        """ Empty in-memory store sharing the configuration- and instance-tables with this store """
+        store = RunStore()
+        store.configs = self.configs
+        store.instances, store.instance_ids = self.instances, self.instance_ids
+        return store
+
+    def to_run_store(self, unique=False, **filters):
+        """In-memory store with (a subset of) the runs, loaded in chunks. The store shares the configuration- and
+        instance-tables with this store.
+
+        Returns
+        -------
+        run_store: RunStore
+            store with all runs matching the filters, in order of insertion (or in the order of a `SQLiteRunView`, if
+            `unique`)
+        """
+        store = self.overlay()
+        for rows in self._iter_runs(unique, **filters):
+            columns = list(zip(*rows))
+            infos = [_decode(i) for i in columns[-1]]
+            store.add_runs(additional_info=infos if any([i is not None for i in infos]) else None,
+                           **{c: np.array(columns[idx]) for idx, c in enumerate(self.columns)})
+        return store
+
+
+class SQLiteRunView(RunStore):
+    """
+    Read-only `RunStore` on the runs of a `SQLiteRunStore` that match filters (e.g. the runs of a folder on a budget),
+    the runs are kept in the SQLite-file. Aggregations (runs and costs per configuration, the oracle, ...) of all runs
+    of the view are queries, columns and RunHistories are loaded on access and not kept. Like a view on
+    `RunStore.unique_indices`, runs with the same configuration, instance, seed and budget are contained once (unless
+    `unique` is False), original runs come first.
+
+    All other methods of `RunStore` work on the loaded columns (indices passed to them refer to the order of the
+    view). Use `materialize` to get an independent in-memory store, a pickled view is materialized as well.
+    """
+
+    def __init__(self, sqlite_store, unique=True, **filters):
+        """
+        Parameters
+        ----------
+        sqlite_store: SQLiteRunStore
+            store with the runs
+        unique: bool
+            whether runs with the same configuration, instance, seed and budget are only contained once
+        filters: dict
+            filters of the runs (folders, budgets, origins, config_indices and keep_config_indices, see
+            `SQLiteRunStore._where`)
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        self.sqlite_store = sqlite_store
+        self.unique = unique
+        self.filters = filters
+
+    def __reduce__(self):
+        return _unpickle_view, (self.materialize(),)
+
+    def __len__(self):
+        return self.sqlite_store.count(self.unique, **self.filters)
+
+    @property
+    def configs(self):
+        return self.sqlite_store.configs
+
+    @property
+    def instances(self):
+        return self.sqlite_store.instances
+
+    @property
+    def instance_ids(self):
+        return self.sqlite_store.instance_ids
+
+    @property
+    def nbytes(self):
+        """ The runs are kept in the SQLite-file """
+        return 0
+
+    def column(self, name):
+        return self.sqlite_store.get_column(name, self.unique, **self.filters)
+
+    def _flush(self):
+        pass
+
+    def derive(self, unique=None, **filters):
+        """ View on the same store with changed filters """
+        return SQLiteRunView(self.sqlite_store, self.unique if unique is None else unique,
+                             **dict(self.filters, **filters))
+
+    @classmethod
+    def union(cls, views):
+        """View on the runs of all views (on the same store), e.g. to aggregate the runs of multiple folders. Every
+        filter is the union of the views' filters (no filter, if any view is not filtered by it)."""
+        filters = {}
+        for key in set([k for v in views for k in v.filters.keys()]):
+            values = [v.filters.get(key) for v in views]
+            if all([value is not None for value in values]):
+                filters[key] = list(OrderedDict.fromkeys([x for value in values for x in value]))
+        return cls(views[0].sqlite_store, all([v.unique for v in views]), **filters)
+
+    def _read_only(self, *args, **kwargs):
+        raise NotImplementedError("SQLiteRunViews are read-only, use `materialize` to get a writable store.")
+
+    add = add_runs = drop_duplicates = intern_config = intern_instance = _read_only
+
+    def extend(self, other):
+        """ Add runs to the SQLite-store, only possible for views on all runs of one folder """
+        if set(self.filters.keys()) != {'folders'} or len(self.filters['folders']) != 1:
+            self._read_only()
+        self.sqlite_store.extend(other, folder=self.filters['folders'][0])
+
+    def update(self, runhistory, origin=None):
+        """ Add the runs of a RunHistory to the SQLite-store (see `extend`) """
+        self.extend(RunStore.from_runhistory(runhistory, origin=origin))
+
+    def overlay(self):
+        return self.sqlite_store.overlay()
+
+    def materialize(self):
+        """ In-memory copy of the runs in this view (sharing the configuration- and instance-tables) """
+        return self.sqlite_store.to_run_store(self.unique, **self.filters)
+
+    def has_additional_info(self):
+        return self.sqlite_store.has_additional_info(self.unique, **self.filters)
+
+    def get_additional_info(self, indices=None):
+        infos = self.sqlite_store.get_additional_info(self.unique, **self.filters)
+        return infos if indices is None else [infos[i] for i in indices]
+
+    def get_budgets(self, indices=None):
+        if indices is not None:
+            return super().get_budgets(indices)
+        return self.sqlite_store.get_budgets(**self.filters)
+
+    def get_config_indices(self, indices=None):
+        if indices is not None:
+            return super().get_config_indices(indices)
+        return self.sqlite_store.get_config_indices(self.unique, **self.filters)
+
+    def count_runs_per_config(self, only_max_observed_budget=True, indices=None):
+        if indices is not None:
+            return super().count_runs_per_config(only_max_observed_budget, indices)
+        return self.sqlite_store.count_runs_per_config(only_max_observed_budget, self.unique, **self.filters)
+
+    def get_mean_instance_costs(self, indices=None):
+        if indices is not None:
+            return super().get_mean_instance_costs(indices)
+        return self.sqlite_store.get_mean_instance_costs(self.unique, **self.filters)
+
+    def get_instance_costs_for_config(self, config, indices=None):
+        if indices is not None:
+            return super().get_instance_costs_for_config(config, indices)
+        config_idx = self.configs.index(config)
+        if config_idx is None:
+            return {}
+        _, inst_idx, cost = self.derive(config_indices=[config_idx]).get_mean_instance_costs()
+        return {self.instances[i]: float(c) for i, c in zip(inst_idx, cost)}
+
+    def get_oracle(self, instances=None, indices=None):
+        if indices is not None:
+            return super().get_oracle(instances, indices)
+        return self.sqlite_store.get_oracle(instances, self.unique, **self.filters)
+
+    def to_runhistory(self, indices=None, runhistory=None):
+        if indices is not None:
+            return self.materialize().to_runhistory(indices, runhistory=runhistory)
+        return self.sqlite_store.to_runhistory(runhistory, self.unique, **self.filters)
+
+
+def _unpickle_view(run_store):
+    """ Pickled `SQLiteRunView`s are unpickled as the materialized in-memory store """
+    return run_store
+
+
+def _encode(additional_info):
+    return json.dumps(additional_info, default=str) if additional_info is not None else None
+
+
+def _decode(additional_info):
+    return json.loads(additional_info) if additional_info is not None else None
@@ -0,0 +1,153 @@
+import json
+import numbers
+
+import numpy as np
+
+
+class TrajectoryTable(object):
+    """
+    Columnar trajectory, read from a file line by line. Times, costs, evaluations and budgets are numpy-arrays with one
+    value per entry and incumbents are interned: every entry references its incumbent by an index into
+    `self.incumbents`, so a Configuration is only created once per unique incumbent (long runs list the same
+    incumbent over and over again, with updated cost-estimates).
+
+    The trajectory used throughout CAVE (a list of dicts like smac's TrajLogger returns it) is created with
+    `to_list`, entries with the same incumbent share the Configuration-object.
+    """
+
+    def __init__(self, keys, columns, incumbent_idx, incumbents):
+        """
+        Parameters
+        ----------
+        keys: List[str]
+            keys of the trajectory-entries in order (including 'incumbent')
+        columns: Dict[str, Union[np.array, List]]
+            values per key (except 'incumbent'), numeric columns as arrays
+        incumbent_idx: np.array
+            index of the incumbent of every entry in `incumbents`
+        incumbents: List[Configuration]
+            unique incumbents
+        """
+        self.keys = keys
+        self.columns = columns
+        self.incumbent_idx = incumbent_idx
+        self.incumbents = incumbents
+
+    def __len__(self):
+        return len(self.incumbent_idx)
+
+    def column(self, name):
+        """ Values of `name` for all entries (e.g. 'wallclock_time' or 'cost') """
+        return self.columns[name]
+
+    def to_list(self):
+        """ Trajectory as list of dicts (as returned by smac's TrajLogger) """
+        values = []
+        for k in self.keys:
+            if k == 'incumbent':
+                values.append([self.incumbents[idx] for idx in self.incumbent_idx.tolist()])
+            elif isinstance(self.columns[k], np.ndarray):
+                values.append(self.columns[k].tolist())
+            else:
+                values.append(self.columns[k])
+        return [dict(zip(self.keys, entry)) for entry in zip(*values)]
+
+    @classmethod
+    def from_entries(cls, entries, to_config):
+        """Create table from parsed entries, converting every unique incumbent only once. The entries are consumed one
+        by one into the columns, so they can be passed as a generator.
+
+        Parameters
+        ----------
+        entries: Iterable[dict]
+            trajectory-entries with the incumbent as dict or list of strings (as in the trajectory-file)
+        to_config: Callable
+            converts an incumbent of the file to a Configuration
+
+        Returns
+        -------
+        table: TrajectoryTable
+            trajectory
+        """
+        keys, values = [], {}
+        ids, unique, incumbent_idx = {}, [], []
+        for n, entry in enumerate(entries):
+            for k in entry.keys():
+                if k not in keys:
+                    keys.append(k)
+                    if k != 'incumbent':
+                        values[k] = [None] * n  # Missing in the previous entries
+            for k, column in values.items():
+                column.append(entry.get(k))
+            incumbent = entry['incumbent']
+            key = tuple(sorted(incumbent.items())) if isinstance(incumbent, dict) else tuple(incumbent)
+            idx = ids.get(key)
+            if idx is None:
+                idx = ids[key] = len(unique)
+                unique.append(incumbent)
+            incumbent_idx.append(idx)
+        columns = {k: _to_column(column) for k, column in values.items()}
+        return cls(keys, columns, np.array(incumbent_idx, dtype=np.int32),
+                   [to_config(incumbent) for incumbent in unique])
+
+    @classmethod
+    def read_json(cls, fn, to_config):
+        """Read a trajectory in one of SMAC3's json-formats (one json-object per line, `traj.json` with incumbents
+        as dicts or `traj_aclib2.json` with incumbents as lists of strings). The file is parsed line by line into the
+        columns, so only the unique incumbents are held as parsed objects.
+
+        Parameters
+        ----------
+        fn: str
+            path to the trajectory-file
+        to_config: Callable
+            converts an incumbent of the file to a Configuration
+
+        Returns
+        -------
+        table: TrajectoryTable
+            trajectory
+        """
+        with open(fn, 'r') as fh:
+            return cls.from_entries((json.loads(line) for line in fh if line.strip()), to_config)
+
+    @classmethod
+    def read_smac2(cls, fn, id_to_config):
+        """Read a SMAC2-trajectory (`traj-run-*.txt`). Only the numeric columns are parsed, incumbents are looked up
+        by their id.
+
+        Parameters
+        ----------
+        fn: str
+            path to the trajectory-file
+        id_to_config: Dict[int, Configuration]
+            configurations of the runhistory by their SMAC2-id
+
+        Returns
+        -------
+        table: TrajectoryTable
+            trajectory
+        """
+        with open(fn, 'r') as fh:
+            next(fh)  # header
+            # Columns: CPU Time Used, Estimated Training Performance, Wallclock Time, Incumbent ID, Configurator Time
+            rows = [line.split(',', 5)[:5] for line in fh if line.strip()]
+        values = np.array(rows, dtype=np.float64).reshape(-1, 5)
+        unique_ids, incumbent_idx = np.unique(values[:, 3].astype(np.int64), return_inverse=True)
+        n = len(values)
+        columns = {'cpu_time': values[:, 0],
+                   'total_cpu_time': [None] * n,
+                   'wallclock_time': values[:, 2],
+                   'evaluations': np.full(n, -1),
+                   'cost': values[:, 1],
+                   'budget': np.zeros(n, dtype=np.int64),  # No budget-support for SMAC2!
+                   }
+        keys = ['cpu_time', 'total_cpu_time', 'wallclock_time', 'evaluations', 'cost', 'incumbent', 'budget']
+        return cls(keys, columns, incumbent_idx.astype(np.int32), [id_to_config[i] for i in unique_ids.tolist()])
+
+
+def _to_column(values):
+    """ Numeric values as array, everything else (strings, None, ...) as list """
+    if all([isinstance(v, numbers.Number) and not isinstance(v, bool) for v in values]):
+        return np.asarray(values)
+    return values
@@ -1,8 +1,7 @@
 #!/bin/python3
 
 import numpy as np
-from ConfigSpace.util import impute_inactive_values
-from smac.epm.rf_with_instances import RandomForestWithInstances
+from ConfigSpace.configuration_space import Configuration
 from smac.epm.rfr_imputator import RFRImputator
 from smac.epm.util_funcs import get_types
 from smac.runhistory.runhistory import RunHistory
@@ -11,8 +10,13 @@ from smac.scenario.scenario import Scenario
 from smac.tae.execute_ta_run import StatusType
 from smac.utils.constants import MAXINT
 
+from cave.reader.config_table import ConfigTable
+from cave.utils.model_registry import ModelRegistry
+from cave.utils.surrogate_backend import get_backend
 
-def convert_data_for_epm(scenario: Scenario, runhistory: RunHistory, impute_inactive_parameters=False, rng=None, logger=None):
+
+def convert_data_for_epm(scenario: Scenario, runhistory: RunHistory, impute_inactive_parameters=False, rng=None, logger=None,
+                         backend=None):
     """
     converts data from runhistory into EPM format
 
@@ -24,6 +28,8 @@ def convert_data_for_epm(scenario: Scenario, runhistory: RunHistory, impute_inac
         smac.runhistory.runhistory.RunHistory Object with all necessary data
     impute_inactive_parameters: bool
         whether to impute all inactive parameters in all configurations - this is needed for random forests, as they do not accept nan-values
+    backend: SurrogateBackend
+        creates the model to impute censored runs (runtime-scenarios), if None, smac's RandomForestWithInstances
 
     Returns
     -------
@@ -36,6 +42,8 @@ def convert_data_for_epm(scenario: Scenario, runhistory: RunHistory, impute_inac
     """
     if rng is None:
         rng = np.random.RandomState(42)
+    if backend is None:
+        backend = get_backend()
 
     if impute_inactive_parameters:
         runhistory = force_finite_runhistory(runhistory)
@@ -43,7 +51,7 @@ def convert_data_for_epm(scenario: Scenario, runhistory: RunHistory, impute_inac
     types, bounds = get_types(scenario.cs, scenario.feature_array)
     if logger is not None:
         logger.debug("Types: " + str(types) + ", Bounds: " + str(bounds))
-    model = RandomForestWithInstances(scenario.cs, types, bounds, rng.randint(MAXINT))
+    model = backend.create(scenario.cs, types, bounds, rng.randint(MAXINT))
 
     params = scenario.cs.get_hyperparameters()
     num_params = len(params)
@@ -73,7 +81,11 @@ def convert_data_for_epm(scenario: Scenario, runhistory: RunHistory, impute_inac
                                         impute_state=[
                                             StatusType.TIMEOUT, ],
                                         imputor=imputor)
-        X, Y = rh2EPM.transform(runhistory)
+        # Imputing censored runs trains random forests, so the imputed data is shared for equal runs
+        fingerprint = ModelRegistry.fingerprint('imputation', backend, ModelRegistry.runhistory_fingerprint(runhistory),
+                                                ModelRegistry.scenario_fingerprint(scenario), *rng.get_state()[1:3])
+        X, Y = ModelRegistry.get(fingerprint, lambda: rh2EPM.transform(runhistory),
+                                 purpose='imputation of censored runs')
     else:
         rh2EPM = RunHistory2EPM4Cost(scenario=scenario,
                                      num_params=num_params,
@@ -86,16 +98,18 @@ def convert_data_for_epm(scenario: Scenario, runhistory: RunHistory, impute_inac
     return X, Y, types
 
 def force_finite_runhistory(runhistory):
-
-    def sanitize_config(config):
-        cs_no_forbidden = config.configuration_space
-        cs_no_forbidden.forbidden_clauses = []
-        config.configuration_space = cs_no_forbidden
-        return impute_inactive_values(config)
-
-
-    new_config_ids = {sanitize_config(config) : id for config, id in runhistory.config_ids.items()}
-    new_ids_config = {id : sanitize_config(config) for id, config in runhistory.ids_config.items()}
+    """ Impute the inactive values of all configurations in the runhistory (in place). The imputation is done on the
+    vector-representations of all configurations at once (see `ConfigTable.imputed_vectors`). The imputed
+    configurations are created directly from their vectors, so forbidden clauses are not checked (see #226). """
+    if len(runhistory.ids_config) == 0:
+        return runhistory
+    table = ConfigTable()
+    table_ids = {id_: table.intern(config) for id_, config in runhistory.ids_config.items()}
+    imputed = table.imputed_vectors()
+    new_ids_config = {id_: Configuration(config.configuration_space, vector=imputed[table_ids[id_]],
+                                         origin=config.origin)
+                      for id_, config in runhistory.ids_config.items()}
+    new_config_ids = {config: id_ for id_, config in new_ids_config.items()}
     runhistory.ids_config = new_ids_config
     runhistory.config_ids = new_config_ids
     return runhistory
@@ -3,6 +3,7 @@ import inspect
 import logging
 import os
 import typing
+from collections import OrderedDict
 
 import numpy as np
 from ConfigSpace.configuration_space import Configuration
@@ -130,6 +131,54 @@ def combine_runhistories(rhs, logger=None):
         logger.debug("number of elements in combined rh: " + str(len(combi_rh.data)))
     return combi_rh
 
+
+# Attributes of smac's RunHistory (as of smac 0.12) that `share_runhistory` knows how to share
+_RUNHISTORY_ATTRIBUTES = {'logger', 'data', '_configid_to_inst_seed_budget', 'config_ids', 'ids_config', '_n_id',
+                          '_cost_per_config', '_min_cost_per_config', 'num_runs_per_config', 'external',
+                          'overwrite_existing_runs'}
+
+
+def share_runhistory(rh, configs=None):
+    """Copy of a runhistory that shares the runs (keys, values and configurations) with the original, only the
+    containers are copied. Runs can be added to the copy without changing the original, e.g. to add estimated runs on
+    top of the real ones without holding every real run twice.
+
+    Parameters
+    ----------
+    rh: RunHistory
+        runhistory to copy
+    configs: List[Configuration]
+        configurations that runs will be added for in the copy, their per-configuration data is copied as well. If
+        None, it's copied for all configurations
+
+    Returns
+    -------
+    shared: RunHistory
+        runhistory with the same runs as rh
+    """
+    shared = RunHistory(overwrite_existing_runs=rh.overwrite_existing_runs)
+    if set(vars(shared).keys()) != _RUNHISTORY_ATTRIBUTES:
+        # A different smac-version, its runhistories might have data that wouldn't be shared (or copied)
+        raise ValueError("Attributes of RunHistory changed (%s), can't share runhistories with this smac-version" %
+                         str(sorted(set(vars(shared).keys()) ^ _RUNHISTORY_ATTRIBUTES)))
+    shared.data = OrderedDict(rh.data)
+    shared.external = dict(rh.external)
+    shared.config_ids, shared.ids_config = dict(rh.config_ids), dict(rh.ids_config)
+    shared._n_id = rh._n_id
+    shared._cost_per_config = dict(rh._cost_per_config)
+    shared._min_cost_per_config = dict(rh._min_cost_per_config)
+    shared.num_runs_per_config = dict(rh.num_runs_per_config)
+    # Instance-seed-budget-lists per configuration are modified in place by RunHistory.add
+    config_ids = rh._configid_to_inst_seed_budget.keys() if configs is None else \
+        [rh.config_ids[c] for c in configs if c in rh.config_ids]
+    shared._configid_to_inst_seed_budget = dict(rh._configid_to_inst_seed_budget)
+    for config_id in config_ids:
+        if config_id in shared._configid_to_inst_seed_budget:
+            shared._configid_to_inst_seed_budget[config_id] = {
+                k: list(v) for k, v in rh._configid_to_inst_seed_budget[config_id].items()}
+    return shared
+
+
 def combine_trajectories(trajs, logger=None):
     """Combine trajectories. Trajectories are expected as an iterable of sorted lists, which are increasing in time.
     A trajectory entry is expected as:
@@ -215,14 +264,18 @@ def load_default_options(options=None, file_format=None):
 
 def detect_fileformat(folders):
     from cave.reader.conversion.csv2smac import CSV2SMAC
+    from cave.reader.directory_index import DirectoryIndex
     from cave.reader.smac2_reader import SMAC2Reader
     from cave.reader.smac3_reader import SMAC3Reader
 
+    # All checks use the same (shared) index per folder, so every folder is only scanned once
+    indices = [DirectoryIndex.get(f) for f in folders]
+
     # First check if it's APT, else BOHB
     bohb_files = ["configs.json", "results.json", "configspace.json"]
     apt_files = ["autonet_config.json", "results_fit.json"]
-    if all([all([os.path.isfile(os.path.join(f, sub)) for sub in bohb_files]) for f in folders]):
-        if all([all([os.path.isfile(os.path.join(f, sub)) for sub in apt_files]) for f in folders]):
+    if all([all([index.isfile(sub) for sub in bohb_files]) for index in indices]):
+        if all([all([index.isfile(sub) for sub in apt_files]) for index in indices]):
             return "APT"
         else:
             return "BOHB"
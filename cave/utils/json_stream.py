@@ -0,0 +1,134 @@
+import json
+
+
+class JsonStream(object):
+    """
+    Incremental parser for large JSON-files with a top-level object (like SMAC's runhistory.json).
+
+    The file is read in chunks and only the top-level structure is parsed by hand. Every item of the top-level
+    values (elements of lists, key-value-pairs of dicts) is decoded on its own, so the memory used is bounded by
+    the largest single item instead of the whole document. The items are yielded in the order of the file.
+
+    Example
+    -------
+    .. code-block:: python
+
+        with open(fn) as fh:
+            for section, item in JsonStream(fh, sections=['data']).items():
+                k, v = item
+    """
+
+    _number_start = set('-0123456789')
+    _number_chars = set('-+.0123456789eE')
+
+    def __init__(self, fh, sections, chunk_size=1 << 20, object_hook=None):
+        """
+        Parameters
+        ----------
+        fh: file-object
+            opened (text-mode) file to read from
+        sections: List[str]
+            top-level keys whose values are streamed item by item, all other values are decoded as a whole
+        chunk_size: int
+            number of characters read from the file at once
+        object_hook: function
+            passed to the json-decoder
+        """
+        self.fh = fh
+        self.sections = set(sections)
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder(object_hook=object_hook)
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self._offset = 0  # number of characters dropped from the buffer
+
+    def _read_chunk(self):
+        """ Append a chunk to the buffer, dropping what has already been parsed. Returns False at end of file. """
+        if self.eof:
+            return False
+        chunk = self.fh.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self._offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def tell(self):
+        """ Number of characters parsed so far, e.g. the end of the last yielded item """
+        return self._offset + self.pos
+
+    def _peek(self):
+        """ Skip whitespace, return next character (without consuming it) or None at end of file """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\n\r':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_chunk():
+                return None
+
+    def _expect(self, chars):
+        c = self._peek()
+        if c is None or c not in chars:
+            raise ValueError("Expected one of '{}' but got '{}' at position {} of chunk".format(chars, c, self.pos))
+        self.pos += 1
+        return c
+
+    def _decode(self):
+        """ Decode the next complete JSON-value, reading more of the file if necessary """
+        if self._peek() in self._number_start:
+            # A number is only complete if something follows it, otherwise it might continue in the next chunk
+            end = self.pos
+            while True:
+                while end < len(self.buffer) and self.buffer[end] in self._number_chars:
+                    end += 1
+                offset = end - self.pos
+                if end < len(self.buffer) or not self._read_chunk():
+                    break
+                end = self.pos + offset
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                if self._read_chunk():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+    def items(self):
+        """Iterate over the items of the streamed sections.
+
+        Yields
+        ------
+        section, item: str, object
+            for list-sections, the item is the element, for dict-sections, the item is a tuple (key, value)
+            for all other top-level keys, the item is the complete value
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode()
+            self._expect(':')
+            if key in self.sections and self._peek() in '[{':
+                closing = ']' if self._expect('[{') == '[' else '}'
+                if self._peek() == closing:
+                    self.pos += 1
+                else:
+                    while True:
+                        if closing == ']':
+                            yield key, self._decode()
+                        else:
+                            item_key = self._decode()
+                            self._expect(':')
+                            yield key, (item_key, self._decode())
+                        if self._expect(',' + closing) == closing:
+                            break
+            else:
+                yield key, self._decode()
+            if self._expect(',}') == '}':
+                return
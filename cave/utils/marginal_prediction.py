@@ -0,0 +1,125 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Model and data of the running prediction, forked worker-processes inherit it (so the model is never pickled)
+_state = {}
+
+
+def tile_shape(n_configs, n_instances, n_features, memory_limit, n_jobs=1):
+    """Number of configurations and instances per tile, so that the inputs (and outputs) of the tiles that are
+    predicted at the same time (one per job) fit into the memory budget. Tiles span as many instances as possible.
+
+    Parameters
+    ----------
+    n_configs, n_instances: int
+        number of configurations and instances to predict
+    n_features: int
+        length of an input-row (configuration-vector and instance-features)
+    memory_limit: float
+        memory budget in MB
+    n_jobs: int
+        number of tiles predicted in parallel
+
+    Returns
+    -------
+    configs_per_tile, instances_per_tile: int, int
+        shape of the tiles (at least one pair)
+    """
+    # Per pair: input-row, mean and variance as float64
+    max_pairs = int(memory_limit * 2 ** 20 / max(1, n_jobs) / (8 * (n_features + 2)))
+    instances_per_tile = max(1, min(n_instances, max_pairs))
+    configs_per_tile = max(1, min(n_configs, max_pairs // instances_per_tile))
+    return configs_per_tile, instances_per_tile
+
+
+def predict_marginalized(model, vectors, instance_features, memory_limit=1024, n_jobs=1, weights=None):
+    """Predict mean and variance of configurations, marginalized over instances, without ever building the dense
+    configurations x instances input.
+
+    This is the marginalization of smac's `AbstractEPM.predict_marginalized_over_instances` (the mean of the
+    predictions on all instances, the variance of that mean for independent predictions), but the pairs are
+    predicted in tiles that fit into `memory_limit` and the sums are accumulated per configuration. With `n_jobs` > 1,
+    blocks of configurations are predicted in forked worker-processes (where forking is available).
+
+    Parameters
+    ----------
+    model: AbstractEPM
+        trained model, predicting on configuration-vectors with appended instance-features
+    vectors: np.array
+        configurations as vectors (see `convert_configurations_to_array`)
+    instance_features: np.array
+        features of the instances to marginalize over, one row per instance. If empty or None, the configurations
+        are predicted without instances.
+    memory_limit: float
+        memory budget in MB for the tiles predicted at the same time
+    n_jobs: int
+        number of worker-processes
+    weights: np.array
+        optional, weight per instance (e.g. the number of instances a representative instance stands for, see
+        `RepresentativeInstances`), the mean is weighted accordingly
+
+    Returns
+    -------
+    mean, var: np.array, np.array
+        marginal predictions, shape (n, 1)
+    """
+    logger = logging.getLogger(__name__)
+    vectors = np.asarray(vectors, dtype=np.float64)
+    if instance_features is None or len(instance_features) == 0:
+        mean, var = model.predict(vectors)
+        return np.reshape(mean, (-1, 1)), np.reshape(var, (-1, 1))
+    features = np.asarray(instance_features, dtype=np.float64)
+    weights = np.ones(len(features)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    configs_per_tile, instances_per_tile = tile_shape(len(vectors), len(features),
+                                                      vectors.shape[1] + features.shape[1], memory_limit, n_jobs)
+    blocks = [(start, min(start + configs_per_tile, len(vectors)))
+              for start in range(0, len(vectors), configs_per_tile)]
+    n_jobs = min(n_jobs, len(blocks))
+    if n_jobs > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+        logger.debug("Forking not available, predicting in this process")
+        n_jobs = 1
+    logger.debug("Marginalizing %d configurations over %d instances in tiles of %d x %d (%d processes)",
+                 len(vectors), len(features), configs_per_tile, instances_per_tile, n_jobs)
+
+    _state.update(model=model, vectors=vectors, features=features, weights=weights,
+                  instances_per_tile=instances_per_tile)
+    try:
+        if n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs, mp_context=multiprocessing.get_context('fork')) as executor:
+                sums = list(executor.map(_predict_block, blocks))
+        else:
+            sums = [_predict_block(block) for block in blocks]
+    finally:
+        _state.clear()
+
+    mean = np.concatenate([mean_sum for mean_sum, _ in sums]) / weights.sum()
+    var = np.concatenate([var_sum for _, var_sum in sums]) / weights.sum() ** 2
+    var = np.maximum(var, getattr(model, 'var_threshold', 0))
+    return mean.reshape(-1, 1), var.reshape(-1, 1)
+
+
+def _predict_block(block):
+    """ Weighted sums of means and variances (with squared weights) over all instances for the configurations
+    vectors[start:stop] (executed in a worker-process if n_jobs > 1) """
+    start, stop = block
+    model, features, weights = _state['model'], _state['features'], _state['weights']
+    instances_per_tile = _state['instances_per_tile']
+    configs = _state['vectors'][start:stop]
+    n_params = configs.shape[1]
+    mean_sum, var_sum = np.zeros(len(configs)), np.zeros(len(configs))
+    # One input-buffer for all tiles of the block
+    buffer = np.empty((len(configs) * min(instances_per_tile, len(features)), n_params + features.shape[1]))
+    for inst_start in range(0, len(features), instances_per_tile):
+        tile_features = features[inst_start:inst_start + instances_per_tile]
+        tile_weights = weights[inst_start:inst_start + instances_per_tile]
+        X = buffer[:len(configs) * len(tile_features)]
+        X[:, :n_params] = np.repeat(configs, len(tile_features), axis=0)
+        X[:, n_params:] = np.tile(tile_features, (len(configs), 1))
+        mean, var = model.predict(X)
+        mean_sum += np.reshape(mean, (len(configs), len(tile_features))) @ tile_weights
+        var_sum += np.reshape(var, (len(configs), len(tile_features))) @ tile_weights ** 2
+    return mean_sum, var_sum
@@ -0,0 +1,142 @@
+import hashlib
+import logging
+from collections import OrderedDict
+
+import numpy as np
+
+from cave.utils.surrogate_backend import get_backend
+
+
+class ModelRegistry(object):
+    """
+    Process-wide registry of trained surrogate models (random forests), keyed by a fingerprint of their training data,
+    feature representation, parameters and seed.
+
+    Random forests are trained by several analyzers (pimp's model for parameter importance and epm-validation, the
+    cost-over-time estimates, the configurator footprint's contour-plot, the imputation of censored runs), often
+    on the same data (e.g. a run aggregated over a single folder or reduced to its only budget has the same runs as
+    the original run). Every model is only trained once per fingerprint (see `get`), all analyzers that request a model
+    for the same data share the trained object, so shared models must not be changed (e.g. retrained).
+
+    How many models were trained and reused is counted per purpose (see `get_stats`), CAVE shows it in the report.
+    At most `max_models` models are kept, the least recently used ones are dropped first.
+    """
+
+    max_models = 32
+    _models = OrderedDict()  # fingerprint -> model
+    _stats = OrderedDict()   # purpose -> [trained, reused]
+
+    @classmethod
+    def get(cls, fingerprint, train, purpose='model'):
+        """Return the model with the fingerprint, training it if there is none.
+
+        Parameters
+        ----------
+        fingerprint: str
+            key of the model (see `fingerprint`), must cover everything that `train` depends on
+        train: Callable
+            creates and trains the model (called without arguments)
+        purpose: str
+            what the model is used for, only for the statistics
+
+        Returns
+        -------
+        model: object
+            trained model (shared, don't change it)
+        """
+        logger = logging.getLogger(cls.__module__ + '.' + cls.__name__)
+        stats = cls._stats.setdefault(purpose, [0, 0])
+        if fingerprint in cls._models:
+            logger.debug("Reusing model %s for %s", fingerprint, purpose)
+            cls._models.move_to_end(fingerprint)
+            stats[1] += 1
+            return cls._models[fingerprint]
+        logger.debug("Training model %s for %s", fingerprint, purpose)
+        model = train()
+        stats[0] += 1
+        cls._models[fingerprint] = model
+        while len(cls._models) > cls.max_models:
+            cls._models.popitem(last=False)
+        return model
+
+    @classmethod
+    def get_forest(cls, configuration_space, types, bounds, X, y, seed, instance_features=None,
+                   purpose='random forest', backend=None, **kwargs):
+        """Return a forest of the surrogate backend trained on X and y, training it only if no forest with the same
+        fingerprint exists.
+
+        Parameters
+        ----------
+        configuration_space, types, bounds, seed, instance_features, kwargs:
+            passed to the backend's `create`
+        X, y: np.array
+            training data
+        purpose: str
+            what the model is used for, only for the statistics
+        backend: SurrogateBackend
+            creates the model, if None, smac's RandomForestWithInstances is used
+
+        Returns
+        -------
+        model: AbstractEPM
+            trained forest (shared, don't change it)
+        """
+        backend = backend if backend is not None else get_backend()
+        fingerprint = cls.fingerprint(backend, configuration_space, types, bounds, X, y,
+                                      seed, instance_features, sorted(kwargs.items()))
+
+        def train():
+            model = backend.create(configuration_space, types=types, bounds=bounds, seed=seed,
+                                   instance_features=instance_features, **kwargs)
+            model.train(X, y)
+            return model
+
+        return cls.get(fingerprint, train, purpose=purpose)
+
+    @classmethod
+    def fingerprint(cls, *parts):
+        """ sha1-hash over all parts, numeric arrays are hashed by their content, everything else by its repr """
+        sha = hashlib.sha1()
+        for part in parts:
+            if isinstance(part, np.ndarray) and part.dtype != object:
+                sha.update(str((part.dtype, part.shape)).encode())
+                sha.update(np.ascontiguousarray(part).tobytes())
+            elif isinstance(part, np.ndarray):
+                sha.update(repr(part.tolist()).encode())
+            else:
+                sha.update(repr(part).encode())
+            sha.update(b'|')
+        return sha.hexdigest()
+
+    @classmethod
+    def scenario_fingerprint(cls, scenario):
+        """ Hash over the parts of a scenario that determine the training data of a model (configuration space,
+        instance-features and the performance-objective) """
+        return cls.fingerprint(scenario.cs, scenario.run_obj, getattr(scenario, 'cutoff', None),
+                               getattr(scenario, 'par_factor', None), scenario.feature_array)
+
+    @classmethod
+    def runhistory_fingerprint(cls, runhistory):
+        """ Hash over all runs of a RunHistory (in order), configurations are hashed by their vectors """
+        sha = hashlib.sha1()
+        vectors = {id_: config.get_array().tobytes() for id_, config in runhistory.ids_config.items()}
+        for k, v in runhistory.data.items():
+            sha.update(vectors[k.config_id])
+            sha.update(repr((k.instance_id, None if k.seed is None else int(k.seed), float(k.budget or 0),
+                             float(v.cost), float(v.time), int(v.status.value))).encode())
+        return sha.hexdigest()
+
+    @classmethod
+    def get_stats(cls):
+        """ Number of trained and reused models per purpose """
+        return OrderedDict([(purpose, OrderedDict([('trained', trained), ('reused', reused)]))
+                            for purpose, (trained, reused) in cls._stats.items()])
+
+    @classmethod
+    def reset_stats(cls):
+        cls._stats.clear()
+
+    @classmethod
+    def clear(cls):
+        cls._models.clear()
+        cls._stats.clear()
@@ -0,0 +1,195 @@
+import hashlib
+import itertools
+import logging
+from collections import OrderedDict
+
+import numpy as np
+from smac.configspace import convert_configurations_to_array
+from smac.tae.execute_ta_run import StatusType
+
+from cave.utils.marginal_prediction import predict_marginalized
+
+# Instance-key of predictions marginalized over all instances
+MARGINALIZED = '__marginalized__'
+
+
+class PredictionCache(object):
+    """
+    Process-wide, bounded memo of EPM-predictions, keyed by model, configuration (its vector) and instance.
+
+    Validating default and incumbent with the EPM, estimating the costs of all configurations for the parallel
+    coordinates and estimating the trajectory for the cost over time all predict costs for heavily overlapping
+    sets of configurations and instances with the same forest (see `ModelRegistry`). Predictions go through this
+    cache, only the missing pairs are predicted by the model, in one batched call.
+
+    Models are identified by an id that is assigned on first use (stored on the model-object), so a model must not
+    be retrained after predicting with it. At most `max_entries` predictions are kept, the least recently used ones
+    are dropped first.
+    """
+
+    max_entries = 10 ** 6
+    _entries = OrderedDict()  # (model-id, config-vector, instance) -> (mean, var)
+    _ids = itertools.count()
+    hits, misses = 0, 0
+
+    @classmethod
+    def predict(cls, model, vectors, instances=None, feature_dict=None):
+        """Predict mean and variance for pairs of configurations and instances.
+
+        Parameters
+        ----------
+        model: AbstractEPM
+            trained model
+        vectors: np.array
+            configurations as vectors (one row per pair, see `convert_configurations_to_array`)
+        instances: List[str]
+            instance per pair (None for pairs without instance), if None, no instance is used for any pair
+        feature_dict: Dict[str, np.array]
+            features of the instances, appended to the configuration-vectors
+
+        Returns
+        -------
+        mean, var: np.array, np.array
+            predictions, shape (n, 1)
+        """
+        vectors = np.asarray(vectors, dtype=np.float64)
+        instances = instances if instances is not None else [None] * len(vectors)
+
+        def predict_missing(indices):
+            X = np.array([np.hstack([vectors[i], feature_dict[instances[i]]])
+                          if feature_dict and instances[i] is not None else vectors[i] for i in indices])
+            return model.predict(X)
+
+        return cls._cached(model, vectors, instances, predict_missing)
+
+    @classmethod
+    def predict_marginalized(cls, model, vectors, instance_features=None, weights=None, memory_limit=1024, n_jobs=1):
+        """Predict mean and variance of configurations, marginalized over instances. Without `instance_features`, the
+        model marginalizes over its own instances (see `predict_marginalized_over_instances`), otherwise over the
+        given (weighted) instances in tiles (see `cave.utils.marginal_prediction.predict_marginalized`). Predictions
+        are cached per set of instances.
+
+        Parameters
+        ----------
+        model: AbstractEPM
+            trained model
+        vectors: np.array
+            configurations as vectors (see `convert_configurations_to_array`)
+        instance_features: np.array
+            optional, features of the instances to marginalize over, one row per instance
+        weights: np.array
+            optional, weight per instance
+        memory_limit, n_jobs:
+            passed to `predict_marginalized`, if `instance_features` are given
+
+        Returns
+        -------
+        mean, var: np.array, np.array
+            predictions, shape (n, 1)
+        """
+        vectors = np.asarray(vectors, dtype=np.float64)
+        if instance_features is None:
+            return cls._cached(model, vectors, [MARGINALIZED] * len(vectors),
+                               lambda indices: model.predict_marginalized_over_instances(vectors[indices]))
+        features = np.asarray(instance_features, dtype=np.float64)
+        digest = hashlib.sha1(features.tobytes())
+        if weights is not None:
+            digest.update(np.asarray(weights, dtype=np.float64).tobytes())
+        return cls._cached(model, vectors, [(MARGINALIZED, digest.hexdigest())] * len(vectors),
+                           lambda indices: predict_marginalized(model, vectors[indices], features,
+                                                                memory_limit=memory_limit, n_jobs=n_jobs,
+                                                                weights=weights))
+
+    @classmethod
+    def _cached(cls, model, vectors, instances, predict_missing):
+        """ Look up all pairs, predict the missing ones (each unique pair only once) with `predict_missing(indices)`
+        """
+        model_id = getattr(model, '_cave_prediction_id', None)
+        if model_id is None:
+            model_id = model._cave_prediction_id = next(cls._ids)
+        keys = [(model_id, vector.tobytes(), instance) for vector, instance in zip(vectors, instances)]
+        results = [cls._entries.get(key) for key in keys]
+
+        missing = OrderedDict()  # key -> indices of the pairs
+        for idx, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                missing.setdefault(key, []).append(idx)
+            else:
+                cls._entries.move_to_end(key)
+        cls.hits += len(keys) - sum([len(indices) for indices in missing.values()])
+        cls.misses += len(missing)
+        if missing:
+            logging.getLogger(cls.__module__ + '.' + cls.__name__).debug(
+                "Predicting %d of %d pairs (others are cached)", len(missing), len(keys))
+            mean, var = predict_missing(np.array([indices[0] for indices in missing.values()]))
+            for (key, indices), m, v in zip(missing.items(), np.ravel(mean).tolist(), np.ravel(var).tolist()):
+                cls._entries[key] = (m, v)
+                for idx in indices:
+                    results[idx] = (m, v)
+            while len(cls._entries) > cls.max_entries:
+                cls._entries.popitem(last=False)
+
+        mean = np.array([r[0] for r in results], dtype=np.float64).reshape(-1, 1)
+        var = np.array([r[1] for r in results], dtype=np.float64).reshape(-1, 1)
+        return mean, var
+
+    @classmethod
+    def get_stats(cls):
+        """ Hits, misses (pairs predicted by a model) and number of cached predictions """
+        return OrderedDict([('hits', cls.hits), ('misses', cls.misses), ('entries', len(cls._entries))])
+
+    @classmethod
+    def clear(cls):
+        cls._entries.clear()
+        cls.hits, cls.misses = 0, 0
+
+
+def validate_epm(validator, config_mode, instance_mode, repetitions=1, runhistory=None, representatives=None):
+    """Estimate runs with the validator's EPM, like smac's `Validator.validate_epm` (with `reuse_epm`), but the
+    predictions go through the `PredictionCache`. Falls back to smac's implementation (training a new EPM), if the
+    validator has none.
+
+    Parameters
+    ----------
+    validator: Validator
+        validator with scenario and (optionally) an EPM
+    config_mode: str or List[Configuration]
+        string from [def, inc, def+inc, wallclock_time, cpu_time, all] or directly a list of configurations
+    instance_mode: str or List[str]
+        string from [train, test, train+test] or directly a list of instances
+    repetitions: int
+        number of repetitions in nondeterministic algorithms
+    runhistory: RunHistory
+        optional, runhistory to reuse runs from
+    representatives: RepresentativeInstances
+        optional, predict every instance by its representative instead (only the representatives are predicted)
+
+    Returns
+    -------
+    runhistory: RunHistory
+        runhistory with the estimated runs
+    """
+    if validator.epm is None:
+        return validator.validate_epm(config_mode, instance_mode, repetitions, runhistory=runhistory)
+    scen = validator.scen
+    runs, rh_epm = validator._get_runs(config_mode, instance_mode, repetitions, runhistory)
+    if not runs:
+        return rh_epm
+    # Convert every configuration only once
+    config_rows = {}
+    rows = [config_rows.setdefault(run.config, len(config_rows)) for run in runs]
+    vectors = convert_configurations_to_array(list(config_rows.keys()))[rows]
+    instances = [run.inst for run in runs] if scen.feature_array is not None else None
+    if instances is not None and representatives is not None:
+        instances = [representatives.get_representative(inst) for inst in instances]
+    mean, _ = PredictionCache.predict(validator.epm, vectors, instances, scen.feature_dict)
+
+    for run, pred in zip(runs, mean[:, 0].tolist()):
+        rh_epm.add(config=run.config,
+                   cost=pred,
+                   time=pred,
+                   status=StatusType.SUCCESS,
+                   instance_id=run.inst,
+                   seed=-1,
+                   additional_info={"additional_info": "ESTIMATED USING EPM!"})
+    return rh_epm
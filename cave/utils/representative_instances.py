@@ -0,0 +1,178 @@
+import logging
+from collections import OrderedDict
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from cave.utils.model_registry import ModelRegistry
+from cave.utils.prediction_cache import PredictionCache
+
+
+class RepresentativeInstances(object):
+    """
+    Weighted subset of instances that approximates marginalizing epm-predictions over all instances.
+
+    The (standardized) instance-features are clustered with k-means into `n` clusters. Every cluster is represented by
+    the instance closest to its center, weighted by the size of the cluster. Marginalizing over the representatives
+    costs O(n) instead of O(#instances) predictions per configuration. How far the approximation is from the exact
+    marginalization is measured on a sample of configurations (see `estimate_error`), the errors are collected per
+    purpose (see `get_errors`) and shown in the report.
+
+    Representatives are computed once per instance-features, number of clusters and seed.
+    """
+
+    max_cached = 8
+    _cache = OrderedDict()   # fingerprint -> RepresentativeInstances
+    _errors = OrderedDict()  # purpose -> error-estimate
+
+    def __init__(self, instances, representatives, weights, assignment, features):
+        """
+        Parameters
+        ----------
+        instances: List[str]
+            all instances, in the order of `features`
+        representatives: np.array
+            indices of the representative instances
+        weights: np.array
+            number of instances each representative stands for
+        assignment: np.array
+            index of the representative of each instance
+        features: np.array
+            features of all instances
+        """
+        self.instances = instances
+        self.representatives = representatives
+        self.weights = weights
+        self.assignment = assignment
+        self.features = features
+        self._instance_to_representative = {inst: instances[rep] for inst, rep in zip(instances, assignment)}
+
+    def __len__(self):
+        return len(self.representatives)
+
+    @classmethod
+    def from_features(cls, instances, features, n, seed=42):
+        """Cluster the instances by their features into (at most) `n` representatives.
+
+        Parameters
+        ----------
+        instances: List[str]
+            instance names
+        features: np.array
+            one row of features per instance
+        n: int
+            number of representatives, if there are at most `n` instances, every instance represents itself
+        seed: int
+            seed for k-means
+
+        Returns
+        -------
+        representatives: RepresentativeInstances
+        """
+        features = np.asarray(features, dtype=np.float64)
+        fingerprint = ModelRegistry.fingerprint(list(instances), features, n, seed)
+        if fingerprint in cls._cache:
+            cls._cache.move_to_end(fingerprint)
+            return cls._cache[fingerprint]
+
+        if len(instances) <= n:
+            result = cls(list(instances), np.arange(len(instances)), np.ones(len(instances)),
+                         np.arange(len(instances)), features)
+        else:
+            scaled = StandardScaler().fit_transform(features)
+            kmeans = KMeans(n_clusters=n, random_state=seed, n_init=3).fit(scaled)
+            distances = np.linalg.norm(scaled - kmeans.cluster_centers_[kmeans.labels_], axis=1)
+            clusters = np.unique(kmeans.labels_)
+            # Member closest to the center of each (non-empty) cluster
+            representatives = np.array([np.flatnonzero(kmeans.labels_ == c)[
+                                            np.argmin(distances[kmeans.labels_ == c])] for c in clusters])
+            cluster_to_idx = np.full(n, -1)
+            cluster_to_idx[clusters] = np.arange(len(clusters))
+            assignment = representatives[cluster_to_idx[kmeans.labels_]]
+            weights = np.bincount(cluster_to_idx[kmeans.labels_], minlength=len(clusters)).astype(np.float64)
+            result = cls(list(instances), representatives, weights, assignment, features)
+        logging.getLogger(cls.__module__ + '.' + cls.__name__).debug(
+            "Representing %d instances by %d instances", len(instances), len(result))
+
+        cls._cache[fingerprint] = result
+        while len(cls._cache) > cls.max_cached:
+            cls._cache.popitem(last=False)
+        return result
+
+    @classmethod
+    def from_scenario(cls, scenario, n, seed=42):
+        """ Representatives of all instances with features in the scenario (sorted by name) """
+        instances = sorted(scenario.feature_dict.keys())
+        return cls.from_features(instances, [scenario.feature_dict[i] for i in instances], n, seed)
+
+    def get_representative(self, instance):
+        """ Name of the instance that represents `instance` (instances without features represent themselves) """
+        return self._instance_to_representative.get(instance, instance)
+
+    def predict_marginalized(self, model, vectors, memory_limit=1024, n_jobs=1):
+        """Approximate mean and variance of configurations, marginalized over all instances, by the weighted
+        marginalization over the representatives (see `PredictionCache.predict_marginalized`).
+
+        Returns
+        -------
+        mean, var: np.array, np.array
+            approximate marginal predictions, shape (n, 1)
+        """
+        return PredictionCache.predict_marginalized(model, vectors, self.features[self.representatives],
+                                                    weights=self.weights, memory_limit=memory_limit, n_jobs=n_jobs)
+
+    def estimate_error(self, model, vectors, n_samples=20, seed=42, purpose='marginalization', memory_limit=1024,
+                       n_jobs=1):
+        """Compare the approximate to the exact marginalization over all instances on a random sample of the
+        configurations. The estimate is recorded for `purpose` (see `get_errors`).
+
+        Parameters
+        ----------
+        model: AbstractEPM
+            trained model
+        vectors: np.array
+            configurations as vectors, the sample is drawn from them
+        n_samples: int
+            number of sampled configurations
+        seed: int
+            seed for the sample
+        purpose: str
+            what the approximation is used for, only for the report
+        memory_limit, n_jobs:
+            passed to `PredictionCache.predict_marginalized`
+
+        Returns
+        -------
+        error: OrderedDict
+            maximum and mean absolute error of the approximate marginal means on the sample, the maximum relative to
+            the range of the exact means and the sizes of the sample, instances and representatives
+        """
+        vectors = np.asarray(vectors, dtype=np.float64)
+        rng = np.random.RandomState(seed)
+        sample = vectors[rng.choice(len(vectors), min(n_samples, len(vectors)), replace=False)]
+        exact, _ = PredictionCache.predict_marginalized(model, sample, self.features, memory_limit=memory_limit,
+                                                        n_jobs=n_jobs)
+        approximate, _ = self.predict_marginalized(model, sample, memory_limit=memory_limit, n_jobs=n_jobs)
+        abs_error = np.abs(exact[:, 0] - approximate[:, 0])
+        spread = exact.max() - exact.min()
+        error = OrderedDict([('max abs. error', float(abs_error.max())),
+                             ('mean abs. error', float(abs_error.mean())),
+                             ('max error / range', float(abs_error.max() / spread) if spread > 0 else np.nan),
+                             ('sampled configurations', len(sample)),
+                             ('instances', len(self.instances)),
+                             ('representatives', len(self))])
+        logging.getLogger(self.__module__ + '.' + self.__class__.__name__).info(
+            "Approximating %d instances by %d for %s, max. abs. error on %d configurations: %f",
+            len(self.instances), len(self), purpose, len(sample), error['max abs. error'])
+        type(self)._errors[purpose] = error
+        return error
+
+    @classmethod
+    def get_errors(cls):
+        """ Error-estimates of the approximations used, per purpose """
+        return OrderedDict(cls._errors)
+
+    @classmethod
+    def reset_errors(cls):
+        cls._errors.clear()
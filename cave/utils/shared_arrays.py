@@ -0,0 +1,112 @@
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+# Arrays in a file start at multiples of this (in bytes), so all dtypes are aligned
+_ALIGNMENT = 64
+
+
+class SharedArrays(object):
+    """
+    Named numpy-arrays in one memory-mapped file, that other processes map without copying.
+
+    The arrays are copied once into the file, which is placed in /dev/shm where available (memory-backed, so it's
+    never written to disk). Only the (small, picklable) `handle` is sent to (or returned from) other processes, which
+    map the same memory with `SharedArraysHandle.attach`. So the cost of passing the arrays between processes doesn't
+    depend on their size.
+
+    The file is removed with `close` (or when used as a context-manager) by the creating process, or with
+    `SharedArraysHandle.remove` by the process the arrays were handed to. Mapped arrays stay valid until they are
+    released, the memory is freed with the last of them.
+
+    Example
+    -------
+    .. code-block:: python
+
+        with SharedArrays({'cost': cost}) as shared:
+            executor.map(func, [shared.handle] * n)  # func calls handle.attach()['cost']
+    """
+
+    def __init__(self, arrays, directory=None):
+        """
+        Parameters
+        ----------
+        arrays: Dict[str, np.array]
+            arrays to share, by name
+        directory: str
+            directory for the memory-mapped file, if None, /dev/shm (or the default temporary directory if that
+            doesn't exist)
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+        if any([array.dtype.hasobject for array in arrays.values()]):
+            raise ValueError("Arrays of python-objects can't be shared")
+        layout, size = {}, 0
+        for name, array in arrays.items():
+            if array.nbytes == 0:
+                layout[name] = (0, array.dtype.str, array.shape)
+                continue
+            size = -(-size // _ALIGNMENT) * _ALIGNMENT
+            layout[name] = (size, array.dtype.str, array.shape)
+            size += array.nbytes
+        size = max(size, 1)
+
+        fd, path = tempfile.mkstemp(prefix='cave_', suffix='.shared', dir=directory or _default_directory())
+        os.ftruncate(fd, size)
+        os.close(fd)
+        self.handle = SharedArraysHandle(path, layout)
+        mapped = _map_arrays(np.memmap(path, dtype=np.uint8, mode='r+', shape=(size,)), layout)
+        for name, array in arrays.items():
+            mapped[name][...] = array
+        self.logger.debug("Shared %d arrays (%d bytes) in %s", len(arrays), size, path)
+
+    @staticmethod
+    def make_directory():
+        """ New temporary directory for memory-mapped files (in /dev/shm where available), e.g. for all arrays handed
+        over by a pool of workers, so files of failed hand-overs can be removed with the directory """
+        return tempfile.mkdtemp(prefix='cave_', dir=_default_directory())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """ Remove the file. Arrays that are still mapped (in any process) remain valid. """
+        self.handle.remove()
+
+
+class SharedArraysHandle(object):
+    """ Picklable reference to `SharedArrays`, use `attach` to access the arrays in another process. """
+
+    def __init__(self, path, layout):
+        self.path = path
+        self.layout = layout
+
+    def attach(self):
+        """ Map the shared arrays into this process (without copying them).
+
+        Returns
+        -------
+        arrays: Dict[str, np.array]
+            read-only arrays, by name
+        """
+        return _map_arrays(np.memmap(self.path, dtype=np.uint8, mode='r'), self.layout)
+
+    def remove(self):
+        """ Remove the file, e.g. once the arrays handed over by another process are attached. """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _map_arrays(buffer, layout):
+    return {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=buffer, offset=offset)
+            for name, (offset, dtype, shape) in layout.items()}
+
+
+def _default_directory():
+    # /dev/shm is memory-backed on linux, so memory-mapped files there are never written to disk
+    return '/dev/shm' if os.path.isdir('/dev/shm') else None
@@ -0,0 +1,241 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from smac.epm.base_rf import BaseModel
+from smac.epm.rf_with_instances import RandomForestWithInstances
+from smac.utils.constants import N_TREES
+from sklearn.ensemble import RandomForestRegressor
+
+from cave.utils.marginal_prediction import predict_marginalized
+
+# Backends by name, see `register_backend`
+_backends = {}
+
+
+def register_backend(name, backend_cls):
+    """Make a surrogate backend available by name, e.g. for the analyzing option [EPM][surrogate_backend].
+
+    Parameters
+    ----------
+    name: str
+        name of the backend
+    backend_cls: type
+        subclass of SurrogateBackend
+    """
+    if not (isinstance(backend_cls, type) and issubclass(backend_cls, SurrogateBackend)):
+        raise ValueError("Surrogate backends must be subclasses of SurrogateBackend, not %s" % str(backend_cls))
+    _backends[name] = backend_cls
+
+
+def get_backend_names():
+    """ Names of all registered backends (see `register_backend`), sorted """
+    return sorted(_backends)
+
+
+def get_backend(name='smac', profile='default', n_jobs=1):
+    """Surrogate backend by name.
+
+    Parameters
+    ----------
+    name: str
+        registered name of the backend (see `register_backend`)
+    profile: str
+        profile of the backend, e.g. 'fast' for quick previews
+    n_jobs: int
+        number of threads for backends that can use multiple cores, -1 for all cores
+
+    Returns
+    -------
+    backend: SurrogateBackend
+    """
+    if name not in _backends:
+        raise ValueError("Surrogate backend %s is not available, choose from %s" % (name, str(get_backend_names())))
+    return _backends[name](profile=profile, n_jobs=n_jobs)
+
+
+def get_backend_from_options(options):
+    """ Surrogate backend as defined in the [EPM]-section of the analyzing options """
+    return get_backend(options['EPM'].get('surrogate_backend', 'smac'),
+                       options['EPM'].get('surrogate_profile', 'default'),
+                       options['EPM'].getint('surrogate_n_jobs', 1))
+
+
+class SurrogateBackend(object):
+    """
+    Creates the surrogate models (empirical performance models) that CAVE trains itself, i.e. for the imputation of
+    censored runs, the epm-validation, cost over time, parallel coordinates and the configurator footprint. pimp's
+    analyses (fANOVA, ablation, forward selection, LPI) train their own forests.
+
+    Models follow smac's AbstractEPM-interface (`train`, `predict` and `predict_marginalized_over_instances`). A
+    backend has named profiles of model-parameters, 'default' and 'fast' (fewer and shallower trees, for quick
+    previews). To add a backend, inherit from this class, implement `create` and make it available with
+    `register_backend`.
+    """
+
+    name = None
+    profiles = {'default': {}, 'fast': {}}
+
+    def __init__(self, profile='default', n_jobs=1):
+        """
+        Parameters
+        ----------
+        profile: str
+            one of `profiles`
+        n_jobs: int
+            number of threads, -1 for all cores (ignored by single-core backends)
+        """
+        self.logger = logging.getLogger(self.__module__ + '.' + self.__class__.__name__)
+        if profile not in self.profiles:
+            raise ValueError("Profile %s is not available for surrogate backend %s, choose from %s" %
+                             (profile, self.name, str(sorted(self.profiles))))
+        self.profile = profile
+        self.n_jobs = os.cpu_count() if n_jobs == -1 else max(1, n_jobs)
+
+    def __repr__(self):
+        # Used in fingerprints of models (see `ModelRegistry`), the number of threads doesn't change the model
+        return "%s(profile=%s)" % (self.name, self.profile)
+
+    def create(self, configuration_space, types, bounds, seed, instance_features=None, **kwargs):
+        """Create an untrained model.
+
+        Parameters
+        ----------
+        configuration_space, types, bounds, seed, instance_features:
+            as for smac's AbstractEPM
+        kwargs:
+            model-parameters, named as in smac's RandomForestWithInstances (e.g. num_trees, ratio_features), they
+            take precedence over the profile
+
+        Returns
+        -------
+        model: AbstractEPM
+            untrained model
+        """
+        raise NotImplementedError()
+
+    def _parameters(self, kwargs):
+        parameters = dict(self.profiles[self.profile])
+        parameters.update(kwargs)
+        return parameters
+
+
+class SMACForestBackend(SurrogateBackend):
+    """ smac's RandomForestWithInstances (pyrfr), trained and predicted on a single core """
+
+    name = 'smac'
+    profiles = {'default': {},
+                'fast': {'num_trees': N_TREES // 2, 'max_depth': 12}}
+
+    def create(self, configuration_space, types, bounds, seed, instance_features=None, **kwargs):
+        return RandomForestWithInstances(configuration_space, types=types, bounds=bounds, seed=seed,
+                                         instance_features=instance_features, **self._parameters(kwargs))
+
+
+class SklearnForestBackend(SurrogateBackend):
+    """ scikit-learn's RandomForestRegressor, trained and predicted with `n_jobs` threads """
+
+    name = 'sklearn'
+    profiles = {'default': {'num_trees': 50},
+                'fast': {'num_trees': 10, 'max_depth': 10}}
+
+    def create(self, configuration_space, types, bounds, seed, instance_features=None, **kwargs):
+        return SklearnForestWithInstances(configuration_space, types=types, bounds=bounds, seed=seed,
+                                          instance_features=instance_features, n_jobs=self.n_jobs,
+                                          **self._parameters(kwargs))
+
+
+class SklearnForestWithInstances(BaseModel):
+    """
+    Random forest on configurations and instance-features with scikit-learn, multi-threaded in training and
+    prediction. Mean and variance are computed over the predictions of the trees (like smac's
+    RandomForestWithInstances without log-transformation). Inactive parameters are imputed as in smac's forests.
+    """
+
+    def __init__(self, configspace, types, bounds, seed,
+                 num_trees=N_TREES,
+                 do_bootstrapping=True,
+                 ratio_features=5. / 6.,
+                 min_samples_split=3,
+                 min_samples_leaf=3,
+                 max_depth=None,
+                 instance_features=None,
+                 pca_components=None,
+                 n_jobs=1,
+                 memory_limit=1024,
+                 ):
+        """
+        Parameters
+        ----------
+        configspace, types, bounds, seed, instance_features, pca_components:
+            as for smac's AbstractEPM
+        num_trees, do_bootstrapping, ratio_features, min_samples_split, min_samples_leaf, max_depth:
+            as for smac's RandomForestWithInstances
+        n_jobs: int
+            number of threads for training and prediction
+        memory_limit: float
+            memory budget in MB for the tiles of `predict_marginalized_over_instances`
+        """
+        super().__init__(configspace=configspace, types=types, bounds=bounds, seed=seed,
+                         instance_features=instance_features, pca_components=pca_components)
+        self.n_jobs = n_jobs
+        self.memory_limit = memory_limit
+        self.rf = RandomForestRegressor(n_estimators=num_trees,
+                                        bootstrap=do_bootstrapping,
+                                        max_features=ratio_features,
+                                        min_samples_split=min_samples_split,
+                                        min_samples_leaf=min_samples_leaf,
+                                        max_depth=max_depth,
+                                        n_jobs=n_jobs,
+                                        random_state=seed)
+
+    def _train(self, X, y):
+        X = self._impute_inactive(X)
+        self.X = X
+        self.y = y.flatten()
+        self.rf.fit(self.X, self.y)
+        return self
+
+    def _predict(self, X, cov_return_type='diagonal_cov'):
+        if len(X.shape) != 2:
+            raise ValueError('Expected 2d array, got %dd array!' % len(X.shape))
+        if X.shape[1] != len(self.types):
+            raise ValueError('Rows in X should have %d entries but have %d!' % (len(self.types), X.shape[1]))
+        if cov_return_type != 'diagonal_cov':
+            raise ValueError("'cov_return_type' can only take 'diagonal_cov' for this model")
+        X = self._impute_inactive(X)
+
+        # Trees predict in parallel (scikit-learn releases the GIL), sums are accumulated to bound the memory
+        mean, sq_sum = np.zeros(len(X)), np.zeros(len(X))
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+            for pred in executor.map(lambda tree: tree.predict(X), self.rf.estimators_):
+                mean += pred
+                sq_sum += pred ** 2
+        mean /= len(self.rf.estimators_)
+        var = np.maximum(sq_sum / len(self.rf.estimators_) - mean ** 2, self.var_threshold)
+        return mean.reshape((-1, 1)), var.reshape((-1, 1))
+
+    def predict_marginalized_over_instances(self, X):
+        """Predict mean and variance marginalized over all instances, in memory-bounded tiles (see
+        `cave.utils.marginal_prediction.predict_marginalized`), every tile is predicted with all threads.
+
+        Parameters
+        ----------
+        X : np.ndarray
+            [n_samples, n_features (config)]
+
+        Returns
+        -------
+        means, vars : np.ndarray, np.ndarray
+            predictive mean and variance, shape (n_samples, 1)
+        """
+        if len(X.shape) != 2:
+            raise ValueError('Expected 2d array, got %dd array!' % len(X.shape))
+        if X.shape[1] != len(self.bounds):
+            raise ValueError('Rows in X should have %d entries but have %d!' % (len(self.bounds), X.shape[1]))
+        return predict_marginalized(self, X, self.instance_features, memory_limit=self.memory_limit)
+
+
+register_backend(SMACForestBackend.name, SMACForestBackend)
+register_backend(SklearnForestBackend.name, SklearnForestBackend)
@@ -0,0 +1,46 @@
+import copy
+import unittest
+
+import numpy as np
+from ConfigSpace.read_and_write import pcs
+from ConfigSpace.util import impute_inactive_values
+
+from cave.reader.config_table import ConfigTable
+
+
+class TestConfigTable(unittest.TestCase):
+
+    def setUp(self):
+        with open("examples/smac3/example_output/run_1/spear-params-mixed.pcs") as fh:
+            self.cs = pcs.read(fh.readlines())
+        self.configs = self.cs.sample_configuration(50)
+
+    def test_intern(self):
+        """ test that configurations are interned once and the matrix holds their vectors """
+        table = ConfigTable()
+        ids = [table.intern(c) for c in self.configs + self.configs[:10]]
+        self.assertEqual(len(table), len(set(self.configs)))
+        self.assertEqual(ids[:10], ids[-10:])
+        for c in self.configs:
+            self.assertEqual(table[table.index(c)], c)
+            np.testing.assert_array_equal(table.vectors[table.index(c)], c.get_array())
+        self.assertIsNone(table.index(self.cs.get_default_configuration()))
+        self.assertEqual(table.intern_vector(self.configs[3].get_array()), table.index(self.configs[3]))
+
+        # Configurations interned from vectors are created on access
+        idx = table.intern_vector(self.cs.get_default_configuration().get_array())
+        np.testing.assert_array_equal(table[idx].get_array(), self.cs.get_default_configuration().get_array())
+
+    def test_imputed_vectors(self):
+        """ test whether imputation on the vectors equals ConfigSpace's impute_inactive_values """
+        table = ConfigTable(self.cs)
+        for c in self.configs:
+            table.intern(c)
+        imputed = table.imputed_vectors()
+        self.assertFalse(np.isnan(imputed).any())
+        cs_no_forbidden = copy.deepcopy(self.cs)
+        cs_no_forbidden.forbidden_clauses = []
+        for c, vector in zip(self.configs, imputed):
+            c = copy.deepcopy(c)
+            c.configuration_space = cs_no_forbidden
+            np.testing.assert_array_almost_equal(impute_inactive_values(c).get_array(), vector)
@@ -0,0 +1,40 @@
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+from cave.reader.directory_index import DirectoryIndex
+
+
+class TestDirectoryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = "test/test_files/test_reader/SMAC2/run-1"
+        DirectoryIndex.invalidate()
+
+    def test_find_equals_glob(self):
+        """ test whether lookups in the index return the same as recursive globbing """
+        index = DirectoryIndex.get(self.folder)
+        for pattern in ['scenario.txt', 'runs_and_results*.csv', 'paramstrings*.txt', 'traj-run-*.txt', 'nonexisting']:
+            expected = sorted(glob.glob(os.path.join(self.folder, '**', pattern), recursive=True))
+            self.assertEqual(index.find(pattern), expected)
+
+    def test_isfile_and_invalidate(self):
+        """ test relative lookups and that the shared index is only rebuilt after invalidation """
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(tmp_dir, 'sub'))
+            open(os.path.join(tmp_dir, 'sub', 'a.txt'), 'w').close()
+            index = DirectoryIndex.get(tmp_dir)
+            self.assertTrue(index.isfile('sub/a.txt'))
+            self.assertFalse(index.isfile('a.txt'))
+            self.assertIs(DirectoryIndex.get(tmp_dir), index)
+
+            open(os.path.join(tmp_dir, 'b.txt'), 'w').close()
+            self.assertEqual(DirectoryIndex.get(tmp_dir).find('b.txt'), [])
+            DirectoryIndex.invalidate(tmp_dir)
+            self.assertEqual(DirectoryIndex.get(tmp_dir).find('b.txt'), [os.path.join(tmp_dir, 'b.txt')])
+        finally:
+            shutil.rmtree(tmp_dir)
+            DirectoryIndex.invalidate()
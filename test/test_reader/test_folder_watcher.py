@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from cave.reader.folder_watcher import FileTail
+from cave.reader.runs_container import RunsContainer
+
+
+class TestFolderWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_file_tail(self):
+        """ test that only new, complete lines are returned """
+        fn = os.path.join(self.tmp, 'lines.json')
+        tail = FileTail(fn, skip_lines=1)
+        self.assertEqual(tail.read_lines(), [])
+        with open(fn, 'w') as fh:
+            fh.write('a\nb\nc')
+        self.assertEqual(tail.read_lines(), ['b'])
+        with open(fn, 'a') as fh:
+            fh.write('d\ne\n')
+        self.assertEqual(tail.read_lines(), ['cd', 'e'])
+        self.assertEqual(tail.read_lines(), [])
+
+    def test_smac3(self):
+        """ test that runs and trajectory written after reading are appended """
+        original = "examples/smac3/example_output/run_1"
+        folder = os.path.join(self.tmp, 'run_1')
+        os.makedirs(folder)
+        shutil.copy(os.path.join(original, 'scenario.txt'), folder)
+        with open(os.path.join(original, 'runhistory.json')) as fh:
+            rh = json.load(fh)
+        with open(os.path.join(original, 'traj.json')) as fh:
+            traj = fh.readlines()
+        # Write a runhistory and trajectory like in the middle of the optimization
+        with open(os.path.join(folder, 'runhistory.json'), 'w') as fh:
+            json.dump(dict(rh, data=rh['data'][:100]), fh)
+        with open(os.path.join(folder, 'traj.json'), 'w') as fh:
+            fh.writelines(traj[:2])
+
+        rc = RunsContainer([folder], ta_exec_dirs=["examples/smac3"], file_format="SMAC3")
+        self.assertEqual(len(rc[folder].original_runhistory.data), 100)
+        self.assertEqual(rc.get_aggregated(False, False)[0].get_budgets(), {0.0})
+        self.assertEqual(rc.update(), set())
+
+        with open(os.path.join(folder, 'runhistory.json'), 'w') as fh:
+            json.dump(rh, fh)
+        with open(os.path.join(folder, 'traj.json'), 'w') as fh:
+            fh.writelines(traj)
+        changed = rc.update()
+        self.assertTrue({'runs', 'configs', 'trajectory'}.issubset(changed))
+        self.assertEqual('incumbent' in changed, json.loads(traj[1])['incumbent'] != json.loads(traj[-1])['incumbent'])
+        self.assertEqual(len(rc[folder].original_runhistory.data), 147)
+        self.assertEqual(len(rc[folder].trajectory), len(traj))
+        self.assertEqual(rc[folder].incumbent, rc[folder].trajectory[-1]['incumbent'])
+        self.assertEqual(len(rc.get_aggregated(False, False)[0].original_runhistory.data), 147)
+        self.assertEqual(rc.update(), set())
+
+    def test_smac3_resume(self):
+        """ test that runs appended to a runhistory written like by SMAC are read from the end of the known runs """
+        original = "examples/smac3/example_output/run_1"
+        folder = os.path.join(self.tmp, 'run_1')
+        os.makedirs(folder)
+        shutil.copy(os.path.join(original, 'scenario.txt'), folder)
+        with open(os.path.join(original, 'runhistory.json')) as fh:
+            rh = json.load(fh)
+
+        def write(n_runs):
+            with open(os.path.join(folder, 'runhistory.json'), 'w') as fh:
+                json.dump(dict(rh, data=rh['data'][:n_runs]), fh, indent=2)
+
+        write(100)
+        rc = RunsContainer([folder], ta_exec_dirs=["examples/smac3"], file_format="SMAC3")
+        self.assertEqual(rc.update(), set())
+        write(120)
+        self.assertIn('runs', rc.update())
+        self.assertEqual(len(rc[folder].original_runhistory.data), 120)
+        watcher = rc._watchers[folder]
+        self.assertIsNotNone(watcher._data_end)
+        write(147)
+        self.assertIn('runs', rc.update())
+        self.assertEqual(len(rc[folder].original_runhistory.data), 147)
+        self.assertEqual(watcher._n_file_runs, 147)
+        # Rewritten runs are diffed against the known ones
+        with open(os.path.join(folder, 'runhistory.json'), 'w') as fh:
+            json.dump(dict(rh, data=rh['data'][::-1]), fh, indent=2)
+        self.assertEqual(rc.update(), set())
+        self.assertEqual(len(rc[folder].original_runhistory.data), 147)
+
+    def test_bohb(self):
+        """ test that new results of hpbandster are converted like the ones read initially """
+        folder = os.path.join(self.tmp, 'bohb')
+        shutil.copytree("examples/bohb", folder)
+        with open(os.path.join(folder, 'results.json')) as fh:
+            results = fh.readlines()
+        with open(os.path.join(folder, 'results.json'), 'w') as fh:
+            fh.writelines(results[:len(results) // 2])
+
+        rc = RunsContainer([folder], file_format="BOHB")
+        n_runs = len(rc[folder].original_runhistory.data)
+        self.assertEqual(rc.update(), set())
+        with open(os.path.join(folder, 'results.json'), 'a') as fh:
+            fh.writelines(results[len(results) // 2:])
+        self.assertIn('runs', rc.update())
+        self.assertGreater(len(rc[folder].original_runhistory.data), n_runs)
+
+        def runs(rh):
+            # Config-ids depend on the order the runs are added in
+            return {(rh.ids_config[k.config_id], k.budget, v.cost, v.time) for k, v in rh.data.items()}
+
+        expected = RunsContainer(["examples/bohb"], file_format="BOHB")["examples/bohb"]
+        self.assertEqual(runs(rc[folder].original_runhistory), runs(expected.original_runhistory))
+        self.assertEqual([(e['cost'], e['budget'], e['incumbent']) for e in rc[folder].trajectory],
+                         [(e['cost'], e['budget'], e['incumbent']) for e in expected.trajectory])
+
+    def test_bohb_without_result(self):
+        """ test that new results are recognized by the read runs, if hpbandster's result is not shared """
+        folder = os.path.join(self.tmp, 'bohb')
+        shutil.copytree("examples/bohb", folder)
+        with open(os.path.join(folder, 'results.json')) as fh:
+            results = fh.readlines()
+        with open(os.path.join(folder, 'results.json'), 'w') as fh:
+            fh.writelines(results[:len(results) // 2])
+
+        rc = RunsContainer([folder], file_format="BOHB")
+        rc[folder].share_information['hpbandster_result'] = None
+        n_runs = len(rc[folder].original_runhistory.data)
+        self.assertEqual(rc.update(), set())
+        with open(os.path.join(folder, 'results.json'), 'a') as fh:
+            fh.writelines(results[len(results) // 2:])
+        self.assertIn('runs', rc.update())
+        expected = RunsContainer(["examples/bohb"], file_format="BOHB")["examples/bohb"]
+        self.assertGreater(len(rc[folder].original_runhistory.data), n_runs)
+        self.assertEqual(len(rc[folder].original_runhistory.data), len(expected.original_runhistory.data))
@@ -37,3 +37,15 @@ class TestReader(unittest.TestCase):
         self.assertEqual(len(cr.validated_runhistory.get_all_configs()), 3)
         self.assertEqual(len(cr.combined_runhistory.data), 126)
         self.assertEqual(len(cr.combined_runhistory.get_all_configs()), 45)
+
+    def test_lazy_epm(self):
+        """ test whether pimp, validator and epm-runhistory are only created on first access """
+        folder = "examples/smac3/example_output/run_1"
+        ta_exec_dir = "examples/smac3/"
+        cr = ConfiguratorRun.from_folder(folder, ta_exec_dir, self.options, file_format="SMAC3", validation_format=None)
+        self.assertIsNone(cr._pimp)
+        self.assertIsNone(cr._validator)
+        self.assertIsNone(cr._epm_runhistory)
+        self.assertGreaterEqual(len(cr.epm_runhistory.data), len(cr.combined_runhistory.data))
+        self.assertIsNotNone(cr._pimp)
+        self.assertIs(cr.validator.epm, cr.pimp.model)
@@ -0,0 +1,60 @@
+import unittest
+
+from cave.reader.run_cache import RunCache
+
+
+class DummyRun(object):
+
+    def __init__(self, size):
+        self.size = size
+
+    def estimate_memory(self):
+        return self.size
+
+
+class TestRunCache(unittest.TestCase):
+
+    def test_hits_and_misses(self):
+        cache = RunCache()
+        self.assertIsNone(cache.get('a'))
+        run = DummyRun(10)
+        cache.put('a', run)
+        self.assertIs(cache.get('a'), run)
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+
+    def test_lru_eviction(self):
+        """ test that least recently used runs are evicted when exceeding the memory budget """
+        cache = RunCache(max_memory=25)
+        cache.put('a', DummyRun(10))
+        cache.put('b', DummyRun(10))
+        cache.get('a')  # 'b' is now least recently used
+        cache.put('c', DummyRun(10))
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(cache.evictions, 1)
+
+        # Runs grow when used, estimates are updated on insertion
+        cache.get('a').size = 20
+        cache.put('d', DummyRun(1))
+        self.assertEqual(list(cache._entries.keys()), ['a', 'd'])
+
+        # The last inserted run is kept, even if it exceeds the budget alone
+        cache.put('e', DummyRun(100))
+        self.assertEqual(list(cache._entries.keys()), ['e'])
+
+    def test_shared_information(self):
+        """ test that information shared through a run survives its eviction """
+        cache = RunCache(max_memory=15)
+        run = DummyRun(10)
+        run.share_information = {'parameter_importance': {}}
+        cache.put('a', run)
+        cache.get('a').share_information['parameter_importance']['fanova'] = {'x': 1.0}
+        cache.put('b', DummyRun(10))
+        self.assertNotIn('a', cache)
+
+        recreated = DummyRun(10)
+        recreated.share_information = {'parameter_importance': {}}
+        cache.put('a', recreated)
+        self.assertEqual(recreated.share_information['parameter_importance'], {'fanova': {'x': 1.0}})
@@ -0,0 +1,159 @@
+import unittest
+
+import numpy as np
+from ConfigSpace.read_and_write import pcs
+from smac.runhistory.runhistory import RunHistory, DataOrigin
+from smac.tae.execute_ta_run import StatusType
+
+from cave.reader.run_store import RunStore
+from cave.utils.helpers import share_runhistory
+
+
+class TestRunStore(unittest.TestCase):
+
+    def setUp(self):
+        with open("examples/smac3/example_output/run_1/spear-params-mixed.pcs") as fh:
+            self.cs = pcs.read(fh.readlines())
+        self.rh = RunHistory()
+        self.rh.load_json("examples/smac3/example_output/run_1/runhistory.json", self.cs)
+
+    def test_runhistory_roundtrip(self):
+        """ test whether converting a runhistory into a store and back is lossless """
+        store = RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)
+        self.assertEqual(len(store), len(self.rh.data))
+        self.assertEqual(store.get_all_configs(), self.rh.get_all_configs())
+
+        rh = store.to_runhistory()
+        self.assertEqual(set(rh.data.keys()), set(self.rh.data.keys()))
+        for k, v in self.rh.data.items():
+            self.assertEqual(rh.data[k].cost, v.cost)
+            self.assertEqual(rh.data[k].status, v.status)
+
+    def test_aggregation(self):
+        """ test whether aggregations on the store match the runhistory-methods """
+        store = RunStore.from_runhistory(self.rh)
+        counts = store.count_runs_per_config()
+        for config in self.rh.get_all_configs():
+            self.assertEqual(counts[store.configs.index(config)],
+                             len(self.rh.get_runs_for_config(config, only_max_observed_budget=True)))
+            costs = store.get_instance_costs_for_config(config)
+            expected = self.rh.get_instance_costs_for_config(config)
+            self.assertEqual(set(costs.keys()), set(expected.keys()))
+            for inst, cost in expected.items():
+                self.assertAlmostEqual(costs[inst], cost)
+
+        oracle = store.get_oracle()
+        for inst, cost in oracle.items():
+            self.assertAlmostEqual(cost, min(self.rh.get_instance_costs_for_config(c).get(inst, float('inf'))
+                                       for c in self.rh.get_all_configs()))
+
+    def test_drop_duplicates(self):
+        """ test whether duplicate runs are removed, keeping the first occurrence """
+        store = RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)
+        store.update(self.rh, origin=DataOrigin.EXTERNAL_SAME_INSTANCES)
+        self.assertEqual(len(store), 2 * len(self.rh.data))
+        store.drop_duplicates()
+        self.assertEqual(len(store), len(self.rh.data))
+        self.assertEqual(len(store.select(origins=[DataOrigin.EXTERNAL_SAME_INSTANCES])), 0)
+
+        config = self.rh.get_all_configs()[0]
+        store.add(config, 1.0, 1.0, StatusType.SUCCESS, instance_id='new_instance', seed=1)
+        self.assertEqual(len(store), len(self.rh.data) + 1)
+        self.assertIn('new_instance', store.get_instance_costs_for_config(config))
+
+    def test_views(self):
+        """ test that views on a store behave like a store with a copy of the runs """
+        parent = RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)
+        # Add all runs a second time as validated runs, views remove duplicates and prefer original runs
+        offset = len(parent)
+        parent.extend(RunStore.from_runhistory(self.rh, origin=DataOrigin.EXTERNAL_SAME_INSTANCES))
+        self.assertEqual(len(parent), 2 * offset)
+        unique = parent.unique_indices(np.arange(len(parent))[::-1])
+        self.assertEqual(len(unique), offset)
+        self.assertTrue(all(unique < offset))
+
+        config = self.rh.get_all_configs()[0]
+        indices = parent.select(config_indices=[parent.configs.index(config)], indices=unique)
+        view = parent.view(indices)
+        copy = view.materialize()
+        self.assertEqual(len(view), len(copy))
+        self.assertEqual(view.nbytes, indices.nbytes)
+        np.testing.assert_array_equal(view.cost, copy.cost)
+        self.assertEqual(view.get_instance_costs_for_config(config), copy.get_instance_costs_for_config(config))
+        self.assertEqual(view.get_oracle(), copy.get_oracle())
+        self.assertEqual(set(view.to_runhistory().data.keys()), set(copy.to_runhistory().data.keys()))
+        self.assertEqual(len(view.view([0]).to_runhistory().data), 1)
+        self.assertRaises(NotImplementedError, view.update, self.rh)
+
+    def test_overlay(self):
+        """ test that overlays share the tables of their store and only add their own runs to runhistories """
+        store = RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)
+        view = store.view(store.unique_indices())
+        overlay = view.overlay()
+        self.assertIs(overlay.configs, store.configs)
+        self.assertEqual(len(overlay), 0)
+
+        config = self.rh.get_all_configs()[0]
+        existing = next(k for k in self.rh.data.keys() if k.config_id == self.rh.config_ids[config])
+        estimated = RunHistory()
+        # smac uses seed -1 for estimated runs, which must not be confused with runs without seed
+        estimated.add(config, 1.0, 1.0, StatusType.SUCCESS, instance_id='new_instance', seed=-1)
+        estimated.add(config, 1.0, 1.0, StatusType.SUCCESS, instance_id=existing.instance_id, seed=existing.seed,
+                      budget=existing.budget)
+        overlay.update(estimated, origin=DataOrigin.EXTERNAL_SAME_INSTANCES)
+        self.assertEqual(len(overlay), 2)
+        self.assertEqual(len(store.configs), len(self.rh.get_all_configs()))
+
+        rh = overlay.to_runhistory(runhistory=view.to_runhistory())
+        self.assertEqual(len(rh.data), len(self.rh.data) + 1)
+        self.assertEqual(rh.data[existing].cost, self.rh.data[existing].cost)
+        self.assertIn(-1, [k.seed for k in rh.data.keys() if k.instance_id == 'new_instance'])
+
+        # Estimated runs on top of a runhistory that shares the real runs leave the original untouched
+        combined = view.to_runhistory()
+        n_before = len(combined.data)
+        cost_before = combined.get_cost(config)
+        runs_before = combined.get_runs_for_config(config, only_max_observed_budget=True)
+        rh = overlay.to_runhistory(runhistory=share_runhistory(combined, overlay.get_all_configs()))
+        self.assertEqual(len(rh.data), n_before + 1)
+        self.assertIs(rh.data[existing], combined.data[existing])
+        self.assertEqual(len(combined.data), n_before)
+        self.assertEqual(combined.get_cost(config), cost_before)
+        self.assertEqual(combined.get_runs_for_config(config, only_max_observed_budget=True), runs_before)
+        self.assertEqual(len(rh.get_runs_for_config(config, only_max_observed_budget=True)), len(runs_before) + 1)
+
+    def test_select_unknown(self):
+        """ test that runs read again are recognized by their keys """
+        store = RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)
+        runs = store.overlay()
+        runs.update(self.rh)
+        config = self.rh.get_all_configs()[0]
+        runs.add(config, 1.0, 1.0, StatusType.SUCCESS, instance_id='new_instance', seed=1)
+        np.testing.assert_array_equal(runs.select_unknown(store), [len(self.rh.data)])
+        np.testing.assert_array_equal(runs.select_unknown(store, known_indices=[]), np.arange(len(runs)))
+
+    def test_capped_runs(self):
+        """ test that capped runs and runs on different instances are treated like in smac's RunHistory """
+        config, other = self.rh.get_all_configs()[:2]
+        runs = [dict(config=config, cost=5.0, time=5.0, status=StatusType.CAPPED, instance_id='a', seed=1),
+                dict(config=config, cost=2.0, time=2.0, status=StatusType.SUCCESS, instance_id='a', seed=1),
+                dict(config=config, cost=3.0, time=3.0, status=StatusType.CAPPED, instance_id='b', seed=1),
+                dict(config=config, cost=4.0, time=4.0, status=StatusType.CAPPED, instance_id='b', seed=1),
+                dict(config=config, cost=1.0, time=1.0, status=StatusType.CAPPED, instance_id='c', seed=1),
+                dict(config=other, cost=1.0, time=1.0, status=StatusType.SUCCESS, instance_id='a', seed=1,
+                     origin=DataOrigin.EXTERNAL_DIFFERENT_INSTANCES),
+                dict(config=other, cost=6.0, time=6.0, status=StatusType.SUCCESS, instance_id='b', seed=1)]
+        rh = RunHistory()
+        store = RunStore()
+        for run in runs:
+            rh.add(**run)
+            store.add(**run)
+
+        view = store.view(store.unique_indices())
+        self.assertEqual({k: v.cost for k, v in view.to_runhistory().data.items()},
+                         {k: v.cost for k, v in rh.data.items()})
+        counts = view.count_runs_per_config()
+        for c in [config, other]:
+            self.assertEqual(counts[store.configs.index(c)], len(rh.get_runs_for_config(c, True)))
+            self.assertEqual(view.get_instance_costs_for_config(c), rh.get_instance_costs_for_config(c))
+        self.assertEqual(view.get_oracle(), {'a': 2.0, 'b': 6.0})
@@ -1,7 +1,12 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 
 from cave.reader.configurator_run import ConfiguratorRun
+from cave.reader.input_cache import InputCache
 from cave.reader.runs_container import RunsContainer
+from cave.reader.sqlite_run_store import SQLiteRunView
 
 
 class TestRunContainer(unittest.TestCase):
@@ -54,3 +59,90 @@ class TestRunContainer(unittest.TestCase):
         rc = RunsContainer(folders, ta_exec_dirs=ta_exec_dir, file_format="BOHB")
 
         self.assertEqual(len(rc["examples/bohb"].original_runhistory.data), 256)
+
+    def test_sqlite_backend(self):
+        """ test that runs of folders, budgets and aggregations are kept in the sqlite-store, with the same runs """
+        smac3_folders = ["examples/smac3/example_output/run_1", "examples/smac3/example_output/run_2"]
+        for folders, ta_exec_dirs, file_format in [(smac3_folders, ["examples/smac3"], "SMAC3"),
+                                                   (["examples/bohb"], ["."], "BOHB")]:
+            memory = RunsContainer(folders, ta_exec_dirs=ta_exec_dirs, file_format=file_format)
+            rc = RunsContainer(folders, ta_exec_dirs=ta_exec_dirs, file_format=file_format,
+                               output_dir=tempfile.mkdtemp(), run_store_backend='sqlite')
+            for keep_budgets in [True, False]:
+                expected = memory.get_aggregated(keep_budgets=keep_budgets, keep_folders=False)
+                runs = rc.get_aggregated(keep_budgets=keep_budgets, keep_folders=False)
+                self.assertEqual(len(runs), len(expected))
+                for run, expected_run in zip(runs, expected):
+                    self.assertIsInstance(run.run_store, SQLiteRunView)
+                    self.assertEqual(len(run.original_runhistory.data), len(expected_run.original_runhistory.data))
+                    oracle = run.run_store.get_oracle()
+                    self.assertEqual(oracle.keys(), expected_run.run_store.get_oracle().keys())
+                    for instance, cost in expected_run.run_store.get_oracle().items():
+                        self.assertAlmostEqual(oracle[instance], cost)
+            for f in folders:
+                self.assertIsInstance(rc[f].run_store, SQLiteRunView)
+                self.assertEqual(len(rc[f].combined_runhistory.data), len(memory[f].combined_runhistory.data))
+
+    def test_shared_information_after_eviction(self):
+        """ test that analyzers read shared results from aggregated runs that were evicted in between """
+        rc = RunsContainer(["examples/bohb"], file_format="BOHB", cache_memory_limit=0)
+        runs = rc.get_aggregated(keep_budgets=True, keep_folders=False)
+        runs[0].share_information['parameter_importance']['fanova'] = {'x': 1.0}
+        rc.get_aggregated(keep_budgets=False, keep_folders=False)  # evicts the runs per budget
+        self.assertGreater(rc.cache.evictions, 0)
+        recreated = rc.get_aggregated(keep_budgets=True, keep_folders=False)[0]
+        self.assertIsNot(recreated, runs[0])
+        self.assertEqual(recreated.share_information['parameter_importance'], {'fanova': {'x': 1.0}})
+
+    def test_parallel_reading(self):
+        """ test whether reading folders in parallel keeps the order and the data """
+        folders = ["examples/smac3/example_output/run_1", "examples/smac3/example_output/run_2"]
+        ta_exec_dir = ["examples/smac3"]
+        rc_serial = RunsContainer(folders, ta_exec_dirs=ta_exec_dir, file_format="SMAC3")
+        rc_parallel = RunsContainer(folders, ta_exec_dirs=ta_exec_dir, file_format="SMAC3", n_jobs=2)
+
+        self.assertEqual(rc_parallel.get_folders(), folders)
+        for f in folders:
+            self.assertEqual(len(rc_serial[f].original_runhistory.data), len(rc_parallel[f].original_runhistory.data))
+            self.assertIs(rc_parallel[f].options, rc_parallel.analyzing_options)
+            # The runs were handed over in shared memory
+            self.assertFalse(rc_parallel[f].run_store.store.column('cost').flags.writeable)
+
+    def test_input_cache(self):
+        """ test whether folders are loaded from the persistent cache on a warm start """
+        folders = ["examples/smac3/example_output/run_1", "examples/smac3/example_output/run_2"]
+        ta_exec_dir = ["examples/smac3"]
+        cache_dir = tempfile.mkdtemp()
+        rc_cold = RunsContainer(folders, ta_exec_dirs=ta_exec_dir, file_format="SMAC3", cache_dir=cache_dir)
+
+        with mock.patch.object(RunsContainer, '_read_folders', return_value={}) as read_folders:
+            rc_warm = RunsContainer(folders, ta_exec_dirs=ta_exec_dir, file_format="SMAC3", cache_dir=cache_dir)
+        read_folders.assert_called_once_with([])
+
+        self.assertEqual(rc_warm.get_folders(), folders)
+        for f in folders:
+            self.assertEqual(rc_cold[f].original_runhistory.data, rc_warm[f].original_runhistory.data)
+            self.assertEqual(rc_cold[f].incumbent, rc_warm[f].incumbent)
+            self.assertIs(rc_warm[f].options, rc_warm.analyzing_options)
+
+        # Different reading-parameters lead to a different fingerprint
+        self.assertNotEqual(rc_cold.input_cache.fingerprint(folders[0], file_format='SMAC3'),
+                            rc_cold.input_cache.fingerprint(folders[0], file_format='SMAC2'))
+
+    def test_input_cache_excluded_dirs(self):
+        """ test that output- and cache-directories inside of an input-folder don't change its fingerprint """
+        folder = tempfile.mkdtemp()
+        with open(os.path.join(folder, 'runhistory.json'), 'w') as fh:
+            fh.write('{}')
+        cache = InputCache(os.path.join(folder, 'cache'))
+        output_dir = os.path.join(folder, 'output')
+        fingerprint = cache.fingerprint(folder, exclude=[output_dir])
+        os.makedirs(output_dir)
+        with open(os.path.join(output_dir, 'report.html'), 'w') as fh:
+            fh.write('<html></html>')
+        cache.store(fingerprint, 'data')
+        self.assertEqual(cache.fingerprint(folder, exclude=[output_dir]), fingerprint)
+        self.assertEqual(cache.load(fingerprint), 'data')
+        with open(os.path.join(folder, 'runhistory.json'), 'w') as fh:
+            fh.write('{"data": []}')
+        self.assertNotEqual(cache.fingerprint(folder, exclude=[output_dir]), fingerprint)
@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+from ConfigSpace.read_and_write import pcs
+from smac.runhistory.runhistory import RunHistory, DataOrigin
+from smac.tae.execute_ta_run import StatusType
+
+from cave.reader.run_store import RunStore
+from cave.reader.runs_metadata import RunsMetadata
+
+
+class TestRunsMetadata(unittest.TestCase):
+
+    def setUp(self):
+        with open("examples/smac3/example_output/run_1/spear-params-mixed.pcs") as fh:
+            self.cs = pcs.read(fh.readlines())
+        self.rh = RunHistory()
+        self.rh.load_json("examples/smac3/example_output/run_1/runhistory.json", self.cs)
+
+    def test_metadata(self):
+        """ test budgets and counts over folders, with duplicate runs counted once """
+        store = RunStore()
+        folder_indices = {'a': store.extend(RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL))}
+        # Second folder contains all runs of the first one and two more on another budget
+        folder_b = RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)
+        config = self.rh.get_all_configs()[0]
+        folder_b.add(config, 1.0, 10.0, StatusType.SUCCESS, instance_id='inst', seed=1, budget=5.0)
+        folder_b.add(config, 1.0, 20.0, StatusType.SUCCESS, instance_id='inst', seed=2, budget=5.0)
+        folder_indices['b'] = store.extend(folder_b)
+
+        metadata = RunsMetadata(store, folder_indices)
+        self.assertEqual(metadata.folders, ['a', 'b'])
+        self.assertEqual(metadata.budgets, [0.0, 5.0])
+        self.assertEqual(metadata.folder_budgets, {'a': {0.0}, 'b': {0.0, 5.0}})
+        self.assertEqual(dict(metadata.runs_per_budget), {0.0: len(self.rh.data), 5.0: 2})
+        self.assertEqual(metadata.time_range_per_budget[5.0], (10.0, 20.0))
+
+        expected = store.count_runs_per_config(indices=store.unique_indices())
+        np.testing.assert_array_equal(metadata.runs_per_config, expected)
+        self.assertEqual(metadata.runs_per_config[store.configs.index(config)],
+                         len(self.rh.get_runs_for_config(config, only_max_observed_budget=True)) + 2)
+
+        # Configurations interned after the metadata was computed have no runs
+        new_config = store.configs.intern_vector(np.full(store.configs.vectors.shape[1], 0.4242))
+        runs_per_config = metadata.get_runs_per_config(len(store.configs))
+        self.assertEqual(len(runs_per_config), len(store.configs))
+        self.assertEqual(runs_per_config[new_config], 0)
+        np.testing.assert_array_equal(runs_per_config[:len(expected)], expected)
@@ -0,0 +1,37 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from cave.reader.scenario_cache import ScenarioCache
+from cave.reader.smac3_reader import SMAC3Reader
+
+
+class TestScenarioCache(unittest.TestCase):
+
+    def setUp(self):
+        ScenarioCache.clear()
+
+    def test_shared_by_content(self):
+        """ test that runs with equal scenarios (but different paths to equal files) share one scenario """
+        ta_exec_dir = "examples/smac3"
+        scen_1 = SMAC3Reader("examples/smac3/example_output/run_1", ta_exec_dir).get_scenario()
+        scen_2 = SMAC3Reader("examples/smac3/example_output/run_2", ta_exec_dir).get_scenario()
+        self.assertIs(scen_1, scen_2)
+        self.assertFalse(scen_1.feature_array.flags.writeable)
+        self.assertRaises(ValueError, scen_1.feature_array.__setitem__, (0, 0), 1.0)
+
+        # Pickled copies (e.g. from worker-processes) are unified
+        self.assertIs(ScenarioCache.share(pickle.loads(pickle.dumps(scen_1))), scen_1)
+
+    def test_derive(self):
+        """ test that variants replace attributes without changing or copying the shared scenario """
+        scen = SMAC3Reader("examples/smac3/example_output/run_1", "examples/smac3").get_scenario()
+        reduced = np.zeros((scen.feature_array.shape[0], 2))
+        variant = ScenarioCache.derive(scen, feature_array=reduced, n_features=2)
+        self.assertIs(variant.feature_array, reduced)
+        self.assertEqual(variant.n_features, 2)
+        self.assertIs(variant.cs, scen.cs)
+        self.assertIs(variant.feature_dict, scen.feature_dict)
+        self.assertNotEqual(scen.feature_array.shape[1], 2)
+        self.assertIs(ScenarioCache.share(variant), variant)
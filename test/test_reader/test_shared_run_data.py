@@ -0,0 +1,78 @@
+import os
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from smac.runhistory.runhistory import DataOrigin
+
+from cave.reader.configurator_run import ConfiguratorRun
+from cave.reader.run_store import RunStore
+from cave.reader.runs_container import _read_folder
+from cave.reader.scenario_cache import ScenarioCache
+from cave.reader.shared_run_data import SharedRunData
+from cave.reader.smac3_reader import SMAC3Reader
+from cave.utils.helpers import load_default_options
+from cave.utils.shared_arrays import SharedArrays
+
+
+def _oracle_in_worker(handle):
+    run_store, scenario, _ = handle.attach()
+    return run_store.get_oracle(), scenario.feature_array.shape
+
+
+class TestSharedRunData(unittest.TestCase):
+
+    def setUp(self):
+        ScenarioCache.clear()
+        reader = SMAC3Reader("examples/smac3/example_output/run_1", "examples/smac3")
+        self.scenario = reader.get_scenario()
+        self.store = RunStore.from_runhistory(reader.get_runhistory(self.scenario.cs), origin=DataOrigin.INTERNAL)
+
+    def test_attach(self):
+        """ test that attached stores and scenarios equal the shared ones """
+        views = {'first': np.arange(3)}
+        with SharedRunData(self.store, self.scenario, views=views) as shared:
+            store, scenario, attached_views = pickle.loads(pickle.dumps(shared.handle)).attach()
+            for c in RunStore.columns:
+                np.testing.assert_array_equal(store.column(c), self.store.column(c))
+                self.assertFalse(store.column(c).flags.writeable)
+            self.assertEqual(store.get_oracle(), self.store.get_oracle())
+            self.assertEqual(store.get_all_configs(), self.store.get_all_configs())
+            np.testing.assert_array_equal(attached_views['first'], views['first'])
+            np.testing.assert_array_equal(scenario.feature_array, self.scenario.feature_array)
+            self.assertEqual(scenario.feature_dict.keys(), self.scenario.feature_dict.keys())
+            self.assertEqual(scenario.cs, self.scenario.cs)
+            self.assertEqual(scenario.cave_fingerprint, self.scenario.cave_fingerprint)
+            # The shared scenario is not changed
+            self.assertIsNotNone(self.scenario.feature_array)
+
+            # Attached stores are extended in the worker only
+            overlay = store.overlay()
+            overlay.extend(store)
+            self.assertEqual(len(overlay), len(self.store))
+
+    def test_workers(self):
+        """ test attaching in worker-processes """
+        with SharedRunData(self.store, self.scenario) as shared:
+            with ProcessPoolExecutor(max_workers=2) as executor:
+                for oracle, shape in executor.map(_oracle_in_worker, [shared.handle] * 2):
+                    self.assertEqual(oracle, self.store.get_oracle())
+                    self.assertEqual(shape, self.scenario.feature_array.shape)
+
+    def test_configurator_run(self):
+        """ test handing the runs of a ConfiguratorRun read in a worker over to this process """
+        folder = "examples/smac3/example_output/run_1"
+        directory = SharedArrays.make_directory()
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(_read_folder, folder, "examples/smac3", None, 'SMAC3', 'NONE', None, directory)
+            cr, handle = future.result()
+        self.assertIsNone(cr.run_store)
+        cr.attach_runs(handle)
+        self.assertEqual(os.listdir(directory), [])
+
+        serial = ConfiguratorRun.from_folder(folder, "examples/smac3", load_default_options(None, 'SMAC3'),
+                                             file_format='SMAC3')
+        self.assertEqual(cr.original_runhistory.data, serial.original_runhistory.data)
+        self.assertFalse(cr.run_store.store.column('cost').flags.writeable)
+        np.testing.assert_array_equal(cr.scenario.feature_array, serial.scenario.feature_array)
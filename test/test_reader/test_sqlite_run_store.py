@@ -0,0 +1,111 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+import numpy as np
+from ConfigSpace.read_and_write import pcs
+from smac.runhistory.runhistory import RunHistory, DataOrigin
+
+from cave.reader.run_store import RunStore
+from cave.reader.runs_metadata import RunsMetadata
+from cave.reader.sqlite_run_store import SQLiteRunStore, SQLiteRunView
+
+
+class TestSQLiteRunStore(unittest.TestCase):
+
+    def setUp(self):
+        self.rh_fn = "examples/smac3/example_output/run_1/runhistory.json"
+        with open("examples/smac3/example_output/run_1/spear-params-mixed.pcs") as fh:
+            self.cs = pcs.read(fh.readlines())
+        self.rh = RunHistory()
+        self.rh.load_json(self.rh_fn, self.cs)
+        self.path = os.path.join(tempfile.mkdtemp(), 'runs.sqlite')
+        # Small chunks to test chunked ingestion and loading
+        self.store = SQLiteRunStore(self.path, chunk_size=7)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_ingest_runhistory_json(self):
+        """ test streaming a runhistory.json against the in-memory store """
+        n_runs = self.store.ingest_runhistory_json(self.rh_fn, self.cs, folder='a')
+        self.assertEqual(n_runs, len(self.rh.data))
+        self.assertEqual(len(self.store), len(self.rh.data))
+
+        memory = RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)
+        self.assertEqual(self.store.get_budgets(), memory.get_budgets())
+        for config in self.rh.get_all_configs():
+            self.assertEqual(self.store.count_runs_per_config()[self.store.configs.index(config)],
+                             len(self.rh.get_runs_for_config(config, only_max_observed_budget=True)))
+
+    def test_to_run_store(self):
+        """ test loading runs into memory, with filters and without changing the order """
+        self.store.ingest_runhistory_json(self.rh_fn, self.cs, folder='a')
+        loaded = self.store.to_run_store(folders=['a'])
+        self.assertIs(loaded.configs, self.store.configs)
+        self.assertEqual(loaded.to_runhistory().data, self.rh.data)
+        self.assertEqual(len(self.store.to_run_store(folders=['b'])), 0)
+        self.assertEqual(len(self.store.to_run_store(origins=[DataOrigin.EXTERNAL_SAME_INSTANCES])), 0)
+
+    def test_extend(self):
+        """ test adding in-memory runs of multiple folders, duplicate runs are counted once """
+        memory = RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)
+        self.store.extend(memory, folder='a')
+        self.store.extend(memory, folder='b')
+        self.assertEqual(len(self.store), 2 * len(memory))
+        self.assertEqual(len(self.store.to_run_store(folders=['b'])), len(memory))
+        np.testing.assert_array_equal(self.store.count_runs_per_config(),
+                                      memory.count_runs_per_config()[:len(self.store.configs)])
+
+        container = RunStore()
+        folder_indices = {f: container.extend(memory) for f in ['a', 'b']}
+        expected = RunsMetadata(container, folder_indices)
+        metadata = RunsMetadata.from_sqlite_store(self.store, ['a', 'b'])
+        for attr in ['folders', 'budgets', 'folder_budgets', 'runs_per_budget', 'time_range',
+                     'time_range_per_budget']:
+            self.assertEqual(getattr(metadata, attr), getattr(expected, attr))
+        np.testing.assert_array_equal(metadata.runs_per_config, expected.runs_per_config)
+
+    def test_views(self):
+        """ test views on the runs of folders against views on in-memory stores, aggregations are queries """
+        rh_2 = RunHistory()
+        rh_2.load_json("examples/smac3/example_output/run_2/runhistory.json", self.cs)
+        # The stores share the configuration- and instance-tables, so ids are comparable
+        memory = self.store.overlay()
+        folder_indices = {'a': memory.extend(RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)),
+                          'b': memory.extend(RunStore.from_runhistory(rh_2, origin=DataOrigin.INTERNAL))}
+        self.store.ingest_runhistory_json(self.rh_fn, self.cs, folder='a')
+        self.store.extend(RunStore.from_runhistory(rh_2, origin=DataOrigin.INTERNAL), folder='b')
+
+        views = [(memory.view(memory.unique_indices(folder_indices['a'])), SQLiteRunView(self.store, folders=['a'])),
+                 (memory.view(memory.unique_indices(np.concatenate(list(folder_indices.values())))),
+                  SQLiteRunView.union([SQLiteRunView(self.store, folders=[f]) for f in ['a', 'b']]))]
+        for expected, view in views:
+            self.assertEqual(len(view), len(expected))
+            for column in RunStore.columns:
+                np.testing.assert_array_equal(view.column(column), expected.column(column))
+            self.assertEqual(view.get_all_configs(), expected.get_all_configs())
+            np.testing.assert_array_equal(view.count_runs_per_config(), expected.count_runs_per_config())
+            for queried, computed in zip(view.get_mean_instance_costs(), expected.get_mean_instance_costs()):
+                np.testing.assert_array_almost_equal(queried, computed)
+            self.assertEqual(view.get_oracle().keys(), expected.get_oracle().keys())
+            for instance, cost in expected.get_oracle().items():
+                self.assertAlmostEqual(view.get_oracle()[instance], cost)
+            self.assertEqual(view.to_runhistory().data, expected.to_runhistory().data)
+            # Pickled views are materialized
+            self.assertEqual(pickle.loads(pickle.dumps(view)).fingerprint(), expected.fingerprint())
+
+    def test_view_filters(self):
+        """ test views reduced to budgets (keeping some configurations) and writing runs of a folder """
+        memory = RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)
+        self.store.extend(memory, folder='a')
+        config_idx = self.store.configs.index(self.rh.get_all_configs()[0])
+        view = SQLiteRunView(self.store, folders=['a']).derive(budgets=[1], keep_config_indices=[config_idx])
+        self.assertEqual(set(view.get_config_indices().tolist()), {config_idx})
+        self.assertEqual(len(SQLiteRunView(self.store, folders=['a']).derive(budgets=[1])), 0)
+        self.assertRaises(NotImplementedError, view.extend, memory)
+
+        SQLiteRunView(self.store, folders=['a']).extend(memory)
+        self.assertEqual(len(SQLiteRunView(self.store, folders=['a'])), len(memory))
+        self.assertEqual(len(SQLiteRunView(self.store, unique=False, folders=['a'])), 2 * len(memory))
@@ -0,0 +1,99 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from ConfigSpace.configuration_space import Configuration
+from smac.tae.execute_ta_run import StatusType
+
+from cave.reader.base_reader import register_reader
+from cave.reader.runs_container import RunsContainer
+from cave.reader.smac3_reader import SMAC3Reader
+
+
+class JsonLinesReader(SMAC3Reader):
+    """ Reads runs from append-only line-records (runs.jsonl), scenario and trajectory like SMAC3 """
+
+    batch_size = 10
+
+    def __init__(self, folder, ta_exec_dir):
+        super().__init__(folder, ta_exec_dir)
+        self.lines_read = 0
+
+    def iter_runs(self, config_space, batch_size=None):
+        batch = []
+        with open(os.path.join(self.folder, 'runs.jsonl')) as fh:
+            for line in fh:
+                self.lines_read += 1
+                record = json.loads(line)
+                batch.append(dict(config=Configuration(config_space, record['config']),
+                                  cost=record['cost'],
+                                  time=record['time'],
+                                  status=StatusType[record['status']],
+                                  instance_id=record['instance'],
+                                  seed=record['seed'],
+                                  budget=record['budget'],
+                                  additional_info=None))
+                if len(batch) == (batch_size or self.batch_size):
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+
+class TestStreamingReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.folder = os.path.join(self.tmp, 'run_1')
+        shutil.copytree("examples/smac3/example_output/run_1", self.folder)
+        with open(os.path.join(self.folder, 'runhistory.json')) as fh:
+            rh = json.load(fh)
+        configs = rh['configs']
+        with open(os.path.join(self.folder, 'runs.jsonl'), 'w') as fh:
+            for k, v in rh['data']:
+                fh.write(json.dumps({'config': configs[str(k[0])], 'instance': k[1], 'seed': k[2],
+                                     'budget': k[3] if len(k) == 4 else 0.0, 'cost': v[0], 'time': v[1],
+                                     'status': v[2]['__enum__'].split('.')[-1],
+                                     }) + '\n')
+        self.n_runs = len(rh['data'])
+        register_reader('JSONL', JsonLinesReader)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_iter_runs(self):
+        """ test that batches are bounded and read lazily """
+        reader = JsonLinesReader(self.folder, "examples/smac3")
+        self.assertTrue(reader.streams_runs)
+        cs = reader.get_scenario().cs
+        batches = reader.iter_runs(cs)
+        self.assertEqual(len(next(batches)), 10)
+        self.assertEqual(reader.lines_read, 10)
+        self.assertEqual(sum([len(b) for b in batches]) + 10, self.n_runs)
+
+    def test_default_iter_runs(self):
+        """ test that readers without streaming yield the runs of their runhistory """
+        reader = SMAC3Reader(self.folder, "examples/smac3")
+        self.assertFalse(reader.streams_runs)
+        cs = reader.get_scenario().cs
+        batches = list(reader.iter_runs(cs, batch_size=100))
+        self.assertEqual([len(b) for b in batches], [100, self.n_runs - 100])
+        trajectory = [e for b in reader.iter_trajectory(cs, batch_size=1) for e in b]
+        self.assertEqual(trajectory, reader.get_trajectory(cs))
+
+    def test_runs_container(self):
+        """ test that streamed runs are the same as the ones of the SMAC3-reader, in memory and in SQLite """
+        def runs(rh):
+            return {(rh.ids_config[k.config_id], k.instance_id, k.seed, k.budget, v.cost, v.status)
+                    for k, v in rh.data.items()}
+
+        expected = RunsContainer([self.folder], ta_exec_dirs=["examples/smac3"], file_format="SMAC3")[self.folder]
+        for backend in ['memory', 'sqlite']:
+            rc = RunsContainer([self.folder], ta_exec_dirs=["examples/smac3"], file_format="JSONL",
+                               output_dir=os.path.join(self.tmp, backend), run_store_backend=backend)
+            self.assertEqual(len(rc[self.folder].original_runhistory.data), self.n_runs)
+            self.assertEqual(runs(rc[self.folder].original_runhistory), runs(expected.original_runhistory))
+            self.assertEqual(rc[self.folder].trajectory, expected.trajectory)
+            self.assertEqual(rc[self.folder].incumbent, expected.incumbent)
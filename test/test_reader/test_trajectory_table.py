@@ -0,0 +1,58 @@
+import json
+import unittest
+
+from ConfigSpace.configuration_space import Configuration
+from ConfigSpace.read_and_write import pcs
+from smac.utils.io.traj_logging import TrajLogger
+
+from cave.reader.smac3_reader import SMAC3Reader
+from cave.reader.trajectory_table import TrajectoryTable
+
+
+class TestTrajectoryTable(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = "examples/smac3/example_output/run_1"
+        with open(self.folder + "/spear-params-mixed.pcs") as fh:
+            self.cs = pcs.read(fh.readlines())
+
+    def test_read_json(self):
+        """ test line-by-line reading against smac's TrajLogger """
+        table = TrajectoryTable.read_json(self.folder + "/traj.json", lambda values: Configuration(self.cs, values))
+        expected = TrajLogger.read_traj_alljson_format(self.folder + "/traj.json", self.cs)
+        self.assertEqual(table.to_list(), expected)
+        self.assertEqual(table.column('cost').tolist(), [e['cost'] for e in expected])
+
+    def test_read_aclib(self):
+        """ test that the aclib2-format yields the same trajectory as the alljson-format """
+        reader = SMAC3Reader(self.folder, "examples/smac3")
+        table = TrajectoryTable.read_json(self.folder + "/traj_aclib2.json",
+                                          lambda config_list: reader._recover_configuration(config_list, self.cs))
+        expected = TrajLogger.read_traj_alljson_format(self.folder + "/traj.json", self.cs)
+        self.assertEqual([e['incumbent'] for e in table.to_list()], [e['incumbent'] for e in expected])
+
+    def test_interning(self):
+        """ test that configurations are only created once per unique incumbent """
+        with open(self.folder + "/traj.json") as fh:
+            entries = [json.loads(line) for line in fh]
+        entries = entries + [dict(e, cost=e['cost'] / 2) for e in entries]
+        created = []
+
+        def to_config(values):
+            created.append(values)
+            return Configuration(self.cs, values)
+
+        traj = TrajectoryTable.from_entries(iter(entries), to_config).to_list()
+        self.assertEqual(len(created), len(entries) // 2)
+        self.assertIs(traj[0]['incumbent'], traj[len(entries) // 2]['incumbent'])
+        self.assertEqual([e['cost'] for e in traj], [e['cost'] for e in entries])
+
+    def test_read_smac2(self):
+        """ test that incumbents are looked up by id """
+        fn = "examples/smac2/smac-output/aclib/traj-run-1.txt"
+        with open(fn) as fh:
+            ids = [int(line.split(',')[3]) for line in fh.readlines()[1:]]
+        table = TrajectoryTable.read_smac2(fn, {i: 'config %d' % i for i in set(ids)})
+        self.assertEqual(len(table), len(ids))
+        self.assertEqual([e['incumbent'] for e in table.to_list()], ['config %d' % i for i in ids])
+        self.assertEqual(table.to_list()[0]['budget'], 0)
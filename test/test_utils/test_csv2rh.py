@@ -3,6 +3,11 @@ import os
 import unittest
 
 import numpy as np
+import pandas as pd
+from ConfigSpace.read_and_write import json as pcs_json
+from smac.tae.execute_ta_run import StatusType
+
+from cave.reader.conversion.csv2rh import CSV2RH
 
 
 class TestCSV2RH(unittest.TestCase):
@@ -17,3 +22,27 @@ class TestCSV2RH(unittest.TestCase):
             writer = csv.writer(csvfile, delimiter=',')
             for row in data:
                 writer.writerow(row)
+
+    def test_read_csv_to_rh(self):
+        """ Testing whether configurations, instances and status are correctly extracted from parameter-columns """
+        with open("examples/csv_allinone/run_0/configspace.json", 'r') as fh:
+            cs = pcs_json.read(fh.read())
+        data = pd.DataFrame({'cost': ['1', '2', '3', '4', '5'],
+                             'status': ['SAT', 'TIMEOUT', ' crashed', 'SUCCESS', 'no_valid_status'],
+                             'seed': ['1', '1', '2', '1', '3'],
+                             'random_parameter_1': ['0.6', '0.9', '0.6', '0.6', '0.9'],
+                             'random_parameter_2': ['0', '-3', '0', '0', '-3'],
+                             'random_parameter_3': ['500', '207', '500', '500', '207'],
+                             'feat_1': ['0', '0', '1', '1', '0'],
+                             })
+        rh = CSV2RH().read_csv_to_rh(data, cs=cs)
+
+        self.assertEqual(len(rh.data), 5)
+        self.assertEqual(len(rh.get_all_configs()), 2)
+        self.assertEqual([k.config_id for k in rh.data.keys()], [1, 2, 1, 1, 2])
+        self.assertEqual([k.instance_id for k in rh.data.keys()], [0, 0, 1, 1, 0])
+        self.assertEqual([k.seed for k in rh.data.keys()], [1, 1, 2, 1, 3])
+        self.assertEqual([v.cost for v in rh.data.values()], [1, 2, 3, 4, 5])
+        self.assertEqual([v.status for v in rh.data.values()], [StatusType.SUCCESS, StatusType.TIMEOUT,
+                                                                  StatusType.CRASHED, StatusType.SUCCESS,
+                                                                  StatusType.CRASHED])
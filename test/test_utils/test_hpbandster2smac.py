@@ -1,3 +1,6 @@
+import os
+import shutil
+import tempfile
 import unittest
 
 import numpy as np
@@ -24,3 +27,27 @@ class TestHpbandster2Smac(unittest.TestCase):
         except ImportError:
             pass
 
+    def test_in_memory_conversion(self):
+        """ Converting in memory (and in parallel) yields the same data as writing to disk, but writes nothing """
+        try:
+            input_dir = tempfile.mkdtemp()
+            folders = [shutil.copytree("examples/bohb", os.path.join(input_dir, run)) for run in ["run_1", "run_2"]]
+            on_disk_dir, in_memory_dir = tempfile.mkdtemp(), tempfile.mkdtemp()
+            on_disk = HpBandSter2SMAC(write_to_disk=True).convert(folders, output_dir=on_disk_dir)
+            in_memory = HpBandSter2SMAC(n_jobs=2).convert(folders, output_dir=in_memory_dir)
+        except ImportError:
+            return
+        self.assertEqual(os.listdir(in_memory_dir), [])
+        for f in folders:
+            self.assertTrue(os.path.isfile(os.path.join(on_disk[f]['new_path'], 'runhistory.json')))
+            self.assertEqual(on_disk[f]['runhistory'].data, in_memory[f]['runhistory'].data)
+            self.assertEqual(on_disk[f]['trajectory'], in_memory[f]['trajectory'])
+
+    def test_categorical_type_inference(self):
+        """ Types of categoricals in pcs-files are inferred individually from the observed configurations """
+        cs_options = HpBandSter2SMAC().load_configspace(self.path_to_result_mixed_categorical_pcs)
+        self.assertEqual(len(cs_options), 1)
+        cs = cs_options[0]
+        self.assertEqual(list(cs.get_hyperparameter('activation').choices), [7, 8, 9])
+        self.assertEqual(list(cs.get_hyperparameter('randombool').choices), [True, False])
+        self.assertEqual(list(cs.get_hyperparameter('solver').choices), ['sgd', 'adam'])
@@ -0,0 +1,63 @@
+import io
+import json
+import unittest
+
+from ConfigSpace.read_and_write import pcs
+from smac.runhistory.runhistory import RunHistory
+from smac.tae.execute_ta_run import StatusType
+
+from cave.reader.smac3_reader import SMAC3Reader
+from cave.utils.json_stream import JsonStream
+
+
+class TestJsonStream(unittest.TestCase):
+
+    def setUp(self):
+        self.rh_fn = "examples/smac3/example_output/run_1/runhistory.json"
+
+    def test_stream_sections(self):
+        """ Testing whether streamed items match the completely loaded document, independent of the chunk size. """
+        with open(self.rh_fn) as fh:
+            expected = json.load(fh, object_hook=StatusType.enum_hook)
+        for chunk_size in [1, 7, 1 << 20]:
+            result = {}
+            with open(self.rh_fn) as fh:
+                stream = JsonStream(fh, sections=['data', 'configs'], chunk_size=chunk_size,
+                                    object_hook=StatusType.enum_hook)
+                for section, item in stream.items():
+                    if section == 'data':
+                        result.setdefault(section, []).append(item)
+                    elif section == 'configs':
+                        result.setdefault(section, {})[item[0]] = item[1]
+                    else:
+                        result[section] = item
+            self.assertEqual(result, expected)
+
+        self.assertEqual(list(JsonStream(io.StringIO('{"a": 12345, "data": []}'), ['data'], chunk_size=2).items()),
+                         [('a', 12345)])
+        # Numbers split at any position of the chunk
+        document = '{"a": 12345.678e3, "b": -0.5, "data": [1, 2.5e-3, -7]}'
+        for chunk_size in range(1, 12):
+            self.assertEqual(list(JsonStream(io.StringIO(document), ['data'], chunk_size=chunk_size).items()),
+                             [('a', 12345678.0), ('b', -0.5), ('data', 1), ('data', 2.5e-3), ('data', -7)])
+        with self.assertRaises(ValueError):
+            list(JsonStream(io.StringIO('{"data": [1, 2'), ['data']).items())
+
+        # Positions of the yielded items in the document
+        stream = JsonStream(io.StringIO(document), ['data'], chunk_size=3)
+        ends = [stream.tell() for section, _ in stream.items() if section == 'data']
+        self.assertEqual([document[:end][-2:] for end in ends], ['[1', '-3', '-7'])
+
+    def test_load_runhistory(self):
+        """ Testing whether the streaming runhistory-loader yields the same runhistory as RunHistory.load_json. """
+        with open("examples/smac3/example_output/run_1/spear-params-mixed.pcs") as fh:
+            cs = pcs.read(fh.readlines())
+        expected = RunHistory()
+        expected.load_json(self.rh_fn, cs)
+        rh = SMAC3Reader("examples/smac3/example_output/run_1", "examples/smac3").load_runhistory(self.rh_fn, cs)
+
+        self.assertEqual(list(rh.data.items()), list(expected.data.items()))
+        self.assertEqual(rh.ids_config, expected.ids_config)
+        self.assertEqual(rh.get_all_configs(), expected.get_all_configs())
+        for config in expected.get_all_configs():
+            self.assertEqual(rh.get_cost(config), expected.get_cost(config))
@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from cave.utils.marginal_prediction import predict_marginalized, tile_shape
+
+
+class LinearModel(object):
+    """ Predicts a fixed linear function of each row and records the sizes of the predicted inputs """
+
+    var_threshold = 1e-5
+
+    def __init__(self, n_features):
+        self.weights = np.random.RandomState(1).rand(n_features)
+        self.predicted = []
+
+    def predict(self, X):
+        self.predicted.append(len(X))
+        return (X @ self.weights).reshape(-1, 1), X[:, :1] ** 2
+
+
+class TestMarginalPrediction(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.RandomState(2)
+        self.vectors = rng.rand(30, 4)
+        self.features = rng.rand(11, 3)
+        self.model = LinearModel(7)
+        mean, var = [], []
+        for vector in self.vectors:
+            m, v = self.model.predict(np.hstack([np.tile(vector, (len(self.features), 1)), self.features]))
+            mean.append(m.mean())
+            var.append(max(v.sum() / len(v) ** 2, self.model.var_threshold))
+        self.expected = np.array(mean).reshape(-1, 1), np.array(var).reshape(-1, 1)
+        self.model.predicted = []
+
+    def test_tile_shape(self):
+        """ test that tiles span as many instances as possible and fit into the memory budget """
+        self.assertEqual(tile_shape(100, 10, 8, memory_limit=1), (100, 10))
+        configs, instances = tile_shape(10 ** 5, 5000, 18, memory_limit=10)
+        self.assertEqual(instances, 5000)
+        self.assertLessEqual(configs * instances * 8 * 20, 10 * 2 ** 20)
+        self.assertLessEqual(tile_shape(10 ** 5, 5000, 18, memory_limit=10, n_jobs=4)[0] * 4, configs)
+        self.assertEqual(tile_shape(10, 10 ** 6, 18, memory_limit=1), (1, 2 ** 20 // 160))
+
+    def test_predict_marginalized(self):
+        """ test that tiled predictions equal the marginalization over the dense input """
+        for memory_limit in [1, 0.001]:
+            mean, var = predict_marginalized(self.model, self.vectors, self.features, memory_limit=memory_limit)
+            np.testing.assert_array_almost_equal(mean, self.expected[0])
+            np.testing.assert_array_almost_equal(var, self.expected[1])
+        # With the small budget, the pairs are predicted in tiles of at most 0.001 MB
+        self.assertLessEqual(max(self.model.predicted[1:]), int(0.001 * 2 ** 20 / (8 * 9)))
+        self.assertEqual(sum(self.model.predicted[1:]), len(self.vectors) * len(self.features))
+
+    def test_parallel(self):
+        """ test that blocks of configurations predicted in worker-processes give the same results """
+        mean, var = predict_marginalized(self.model, self.vectors, self.features, memory_limit=0.01, n_jobs=2)
+        np.testing.assert_array_almost_equal(mean, self.expected[0])
+        np.testing.assert_array_almost_equal(var, self.expected[1])
+
+    def test_without_instances(self):
+        model = LinearModel(4)
+        mean, _ = predict_marginalized(model, self.vectors, None)
+        self.assertEqual(mean.shape, (len(self.vectors), 1))
+        self.assertEqual(model.predicted, [len(self.vectors)])
+
+    def test_weights(self):
+        """ test that weighting an instance equals repeating it """
+        weights = np.arange(1, len(self.features) + 1)
+        repeated = np.repeat(self.features, weights, axis=0)
+        expected, _ = predict_marginalized(self.model, self.vectors, repeated)
+        mean, _ = predict_marginalized(self.model, self.vectors, self.features, memory_limit=0.001, weights=weights)
+        np.testing.assert_array_almost_equal(mean, expected)
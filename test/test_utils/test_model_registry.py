@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+from ConfigSpace.read_and_write import pcs
+from smac.epm.util_funcs import get_types
+from smac.runhistory.runhistory import RunHistory, DataOrigin
+
+from cave.reader.run_store import RunStore
+from cave.utils.model_registry import ModelRegistry
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        ModelRegistry.clear()
+        with open("examples/smac3/example_output/run_1/spear-params-mixed.pcs") as fh:
+            self.cs = pcs.read(fh.readlines())
+        self.rh = RunHistory()
+        self.rh.load_json("examples/smac3/example_output/run_1/runhistory.json", self.cs)
+
+    def tearDown(self):
+        ModelRegistry.clear()
+
+    def test_get(self):
+        """ test that models are trained once per fingerprint and counted per purpose """
+        calls = []
+        for fingerprint in ['a', 'b', 'a', 'a']:
+            model = ModelRegistry.get(fingerprint, lambda: calls.append(fingerprint) or fingerprint.upper(),
+                                      purpose='test')
+            self.assertEqual(model, fingerprint.upper())
+        self.assertEqual(calls, ['a', 'b'])
+        self.assertEqual(ModelRegistry.get_stats(), {'test': {'trained': 2, 'reused': 2}})
+        ModelRegistry.reset_stats()
+        self.assertEqual(ModelRegistry.get('a', lambda: None), 'A')
+        self.assertEqual(ModelRegistry.get_stats(), {'model': {'trained': 0, 'reused': 1}})
+
+    def test_max_models(self):
+        """ test that least recently used models are dropped """
+        ModelRegistry.max_models = 2
+        try:
+            for fingerprint in ['a', 'b', 'a', 'c']:
+                ModelRegistry.get(fingerprint, lambda: fingerprint)
+            self.assertEqual(list(ModelRegistry._models.keys()), ['a', 'c'])
+        finally:
+            ModelRegistry.max_models = 32
+
+    def test_get_forest(self):
+        """ test that forests for equal data and seed are shared """
+        rng = np.random.RandomState(1)
+        types, bounds = get_types(self.cs, None)
+        X = np.array([c.get_array() for c in self.rh.get_all_configs()])
+        X[np.isnan(X)] = -1
+        y = rng.rand(len(X), 1)
+        first = ModelRegistry.get_forest(self.cs, types, bounds, X, y, seed=1)
+        self.assertIs(ModelRegistry.get_forest(self.cs, types, bounds, X.copy(), y.copy(), seed=1), first)
+        self.assertIsNot(ModelRegistry.get_forest(self.cs, types, bounds, X, y, seed=2), first)
+        self.assertIsNot(ModelRegistry.get_forest(self.cs, types, bounds, X, y * 2, seed=1), first)
+        self.assertEqual(ModelRegistry.get_stats()['random forest'], {'trained': 3, 'reused': 1})
+        mean, _ = first.predict(X)
+        self.assertEqual(mean.shape, (len(X), 1))
+
+    def test_fingerprints(self):
+        """ test that the fingerprint of runs doesn't depend on the order of interning """
+        store = RunStore.from_runhistory(self.rh, origin=DataOrigin.INTERNAL)
+        reversed_store = RunStore()
+        for config in reversed(self.rh.get_all_configs()):
+            reversed_store.intern_config(config)
+        reversed_store.update(self.rh, origin=DataOrigin.INTERNAL)
+        self.assertEqual(store.fingerprint(), reversed_store.fingerprint())
+        self.assertNotEqual(store.fingerprint(), store.fingerprint(np.arange(len(store) - 1)))
+        self.assertEqual(store.fingerprint(np.arange(10)), store.view(np.arange(10)).fingerprint())
+
+        self.assertEqual(ModelRegistry.runhistory_fingerprint(self.rh),
+                         ModelRegistry.runhistory_fingerprint(store.to_runhistory()))
+        self.assertEqual(ModelRegistry.fingerprint(np.arange(3), None, 'a'),
+                         ModelRegistry.fingerprint(np.arange(3), None, 'a'))
+        self.assertNotEqual(ModelRegistry.fingerprint(np.arange(3)), ModelRegistry.fingerprint(np.arange(3.)))
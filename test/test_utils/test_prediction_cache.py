@@ -0,0 +1,103 @@
+import unittest
+
+import numpy as np
+from smac.epm.util_funcs import get_types
+from smac.runhistory.runhistory2epm import RunHistory2EPM4Cost
+from smac.utils.validate import Validator
+
+from cave.reader.smac3_reader import SMAC3Reader
+from cave.utils.model_registry import ModelRegistry
+from cave.utils.prediction_cache import PredictionCache, validate_epm
+
+
+class CountingModel(object):
+    """ Predicts the sum of each row and counts the predicted rows """
+
+    def __init__(self):
+        self.predicted = []
+
+    def predict(self, X):
+        self.predicted.append(len(X))
+        return X.sum(axis=1, keepdims=True), np.zeros((len(X), 1))
+
+    def predict_marginalized_over_instances(self, X):
+        self.predicted.append(len(X))
+        return X.sum(axis=1, keepdims=True) + 100, np.ones((len(X), 1))
+
+
+class TestPredictionCache(unittest.TestCase):
+
+    def setUp(self):
+        PredictionCache.clear()
+
+    def tearDown(self):
+        PredictionCache.clear()
+        ModelRegistry.clear()
+
+    def test_predict(self):
+        """ test that only missing pairs are predicted, each only once and in one call """
+        model = CountingModel()
+        features = {'a': np.array([10.]), 'b': np.array([20.])}
+        vectors = np.array([[1., 2.], [3., 4.], [1., 2.]])
+        mean, var = PredictionCache.predict(model, vectors, ['a', 'b', 'a'], features)
+        self.assertEqual(mean.ravel().tolist(), [13., 27., 13.])
+        self.assertEqual(var.shape, (3, 1))
+        self.assertEqual(model.predicted, [2])
+        mean, _ = PredictionCache.predict(model, vectors, ['b', 'b', 'a'], features)
+        self.assertEqual(mean.ravel().tolist(), [23., 27., 13.])
+        self.assertEqual(model.predicted, [2, 1])
+        # Marginalized predictions and other models are cached separately
+        mean, _ = PredictionCache.predict_marginalized(model, vectors)
+        self.assertEqual(mean.ravel().tolist(), [103., 107., 103.])
+        self.assertEqual(PredictionCache.predict(CountingModel(), vectors[:1], ['a'], features)[0][0, 0], 13.)
+        self.assertEqual(model.predicted, [2, 1, 2])
+        self.assertEqual(PredictionCache.get_stats(), {'hits': 3, 'misses': 6, 'entries': 6})
+
+    def test_predict_marginalized_over_features(self):
+        """ test that marginal predictions are cached per (weighted) set of instances """
+        model = CountingModel()
+        vectors = np.array([[1., 2.], [3., 4.]])
+        features = np.array([[10.], [20.]])
+        mean, _ = PredictionCache.predict_marginalized(model, vectors, features)
+        self.assertEqual(mean.ravel().tolist(), [18., 22.])
+        self.assertEqual(model.predicted, [4])
+        mean, _ = PredictionCache.predict_marginalized(model, vectors[::-1], features, memory_limit=0.001)
+        self.assertEqual(mean.ravel().tolist(), [22., 18.])
+        self.assertEqual(model.predicted, [4])
+        mean, _ = PredictionCache.predict_marginalized(model, vectors, features, weights=[3., 1.])
+        self.assertEqual(mean.ravel().tolist(), [15.5, 19.5])
+        self.assertEqual(model.predicted, [4, 4])
+
+    def test_max_entries(self):
+        """ test that least recently used predictions are dropped """
+        PredictionCache.max_entries = 2
+        try:
+            model = CountingModel()
+            for vectors in [[[1.]], [[2.]], [[1.]], [[3.]], [[1.], [2.]]]:
+                PredictionCache.predict(model, vectors)
+            self.assertEqual(model.predicted, [1, 1, 1, 1])
+        finally:
+            PredictionCache.max_entries = 10 ** 6
+
+    def test_validate_epm(self):
+        """ test that estimates are the same as with smac's validator """
+        reader = SMAC3Reader("examples/smac3/example_output/run_1", "examples/smac3")
+        scen = reader.get_scenario()
+        rh = reader.get_runhistory(scen.cs)
+        traj = reader.get_trajectory(scen.cs)
+        X, y = RunHistory2EPM4Cost(num_params=len(scen.cs.get_hyperparameters()), scenario=scen).transform(rh)
+        types, bounds = get_types(scen.cs, scen.feature_array)
+        epm = ModelRegistry.get_forest(scen.cs, types, bounds, X, y, seed=1, instance_features=scen.feature_array)
+
+        validator = Validator(scen, traj)
+        validator.epm = epm
+        expected = validator.validate_epm('def+inc', 'train+test', 1, runhistory=rh)
+        validator = Validator(scen, traj)
+        validator.epm = epm
+        estimated = validate_epm(validator, 'def+inc', 'train+test', 1, runhistory=rh)
+        self.assertEqual(set(estimated.data.keys()), set(expected.data.keys()))
+        for k, v in expected.data.items():
+            self.assertAlmostEqual(estimated.data[k].cost, v.cost)
+        n_misses = PredictionCache.get_stats()['misses']
+        validate_epm(validator, 'def+inc', 'train+test', 1, runhistory=rh)
+        self.assertEqual(PredictionCache.get_stats()['misses'], n_misses)
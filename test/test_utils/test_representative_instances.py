@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from cave.utils.representative_instances import RepresentativeInstances
+
+
+class LinearModel(object):
+    """ Predicts a fixed linear function of configuration-vector and instance-features """
+
+    def __init__(self, n_features):
+        self.weights = np.random.RandomState(1).rand(n_features)
+
+    def predict(self, X):
+        return (X @ self.weights).reshape(-1, 1), np.ones((len(X), 1))
+
+
+class TestRepresentativeInstances(unittest.TestCase):
+
+    def setUp(self):
+        RepresentativeInstances.reset_errors()
+        rng = np.random.RandomState(2)
+        # Four well separated groups of instances of different sizes
+        self.sizes = [50, 100, 150, 200]
+        self.features = np.vstack([rng.normal(5 * group, 0.1, (size, 3)) for group, size in enumerate(self.sizes)])
+        self.instances = ['inst_%d' % i for i in range(len(self.features))]
+        self.vectors = rng.rand(30, 2)
+
+    def tearDown(self):
+        RepresentativeInstances.reset_errors()
+
+    def test_from_features(self):
+        """ test that every cluster is represented by one of its instances, weighted by its size """
+        representatives = RepresentativeInstances.from_features(self.instances, self.features, 4)
+        self.assertEqual(len(representatives), 4)
+        self.assertEqual(sorted(representatives.weights.tolist()), self.sizes)
+        groups = np.repeat(np.arange(4), self.sizes)
+        for inst, group in zip(self.instances, groups):
+            representative = self.instances.index(representatives.get_representative(inst))
+            self.assertEqual(groups[representative], group)
+        self.assertEqual(representatives.get_representative('unknown'), 'unknown')
+        self.assertIs(RepresentativeInstances.from_features(self.instances, self.features, 4), representatives)
+        # With enough representatives, every instance represents itself
+        identity = RepresentativeInstances.from_features(self.instances, self.features, 1000)
+        self.assertEqual(len(identity), len(self.instances))
+        self.assertEqual(identity.get_representative('inst_7'), 'inst_7')
+
+    def test_estimate_error(self):
+        """ test that the weighted marginalization over the representatives is close to the exact one """
+        model = LinearModel(5)
+        representatives = RepresentativeInstances.from_features(self.instances, self.features, 4)
+        mean, _ = representatives.predict_marginalized(model, self.vectors)
+        self.assertEqual(mean.shape, (len(self.vectors), 1))
+        error = representatives.estimate_error(model, self.vectors, n_samples=10, purpose='test')
+        self.assertLess(error['max abs. error'], 0.1)
+        self.assertEqual(error['sampled configurations'], 10)
+        self.assertEqual(error['representatives'], 4)
+        self.assertEqual(list(RepresentativeInstances.get_errors().keys()), ['test'])
+
+        identity = RepresentativeInstances.from_features(self.instances, self.features, 1000)
+        self.assertAlmostEqual(identity.estimate_error(model, self.vectors)['max abs. error'], 0)
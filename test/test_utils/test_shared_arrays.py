@@ -0,0 +1,54 @@
+import os
+import pickle
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cave.utils.shared_arrays import SharedArrays
+
+
+def _sum_in_worker(handle):
+    arrays = handle.attach()
+    return float(arrays['cost'].sum()), arrays['cost'].flags.writeable
+
+
+class TestSharedArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.arrays = {'cost': np.arange(10, dtype=np.float64),
+                       'status': np.arange(10, dtype=np.int8),
+                       'vectors': np.random.RandomState(1).rand(5, 3),
+                       'empty': np.empty(0, dtype=np.int32)}
+
+    def _check(self, shared):
+        attached = pickle.loads(pickle.dumps(shared.handle)).attach()
+        for name, array in self.arrays.items():
+            np.testing.assert_array_equal(attached[name], array)
+            self.assertEqual(attached[name].dtype, array.dtype)
+            self.assertFalse(attached[name].flags.writeable)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            for result in executor.map(_sum_in_worker, [shared.handle] * 2):
+                self.assertEqual(result, (45.0, False))
+
+    def test_attach(self):
+        """ test attaching to the shared arrays in this and in worker-processes, the file is removed on close """
+        directory = tempfile.mkdtemp()
+        with SharedArrays(self.arrays, directory=directory) as shared:
+            self._check(shared)
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_remove(self):
+        """ test that attached arrays stay valid after the receiving process removed the file """
+        shared = SharedArrays(self.arrays)
+        attached = shared.handle.attach()
+        shared.handle.remove()
+        self.assertFalse(os.path.exists(shared.handle.path))
+        np.testing.assert_array_equal(attached['vectors'], self.arrays['vectors'])
+        # Removing twice (e.g. on close after the hand-over) is fine
+        shared.close()
+
+    def test_objects(self):
+        """ test that arrays of python-objects are rejected """
+        self.assertRaises(ValueError, SharedArrays, {'info': np.array([{}, None])})
@@ -0,0 +1,79 @@
+import os
+import unittest
+
+import numpy as np
+from smac.epm.rf_with_instances import RandomForestWithInstances
+from smac.epm.util_funcs import get_types
+from smac.runhistory.runhistory2epm import RunHistory2EPM4Cost
+
+from cave.reader.smac3_reader import SMAC3Reader
+from cave.utils.model_registry import ModelRegistry
+from cave.utils.surrogate_backend import (SurrogateBackend, SklearnForestWithInstances, get_backend,
+                                          get_backend_names, register_backend)
+
+
+class TestSurrogateBackend(unittest.TestCase):
+
+    def setUp(self):
+        ModelRegistry.clear()
+        reader = SMAC3Reader("examples/smac3/example_output/run_1", "examples/smac3")
+        self.scen = reader.get_scenario()
+        rh = reader.get_runhistory(self.scen.cs)
+        self.X, self.y = RunHistory2EPM4Cost(num_params=len(self.scen.cs.get_hyperparameters()),
+                                             scenario=self.scen).transform(rh)
+        self.types, self.bounds = get_types(self.scen.cs, self.scen.feature_array)
+        self.configs = np.array([c.get_array() for c in rh.get_all_configs()[:5]])
+
+    def tearDown(self):
+        ModelRegistry.clear()
+
+    def test_get_backend(self):
+        """ test that backends are looked up by name and validate their profiles """
+        self.assertIsInstance(get_backend('smac').create(self.scen.cs, self.types, self.bounds, 1),
+                              RandomForestWithInstances)
+        self.assertEqual(get_backend('sklearn', n_jobs=-1).n_jobs, os.cpu_count())
+        self.assertRaises(ValueError, get_backend, 'unknown')
+        self.assertRaises(ValueError, get_backend, 'smac', profile='unknown')
+        self.assertRaises(ValueError, register_backend, 'invalid', object)
+
+        class ConstantBackend(SurrogateBackend):
+            name = 'constant'
+
+        register_backend('constant', ConstantBackend)
+        self.assertEqual(repr(get_backend('constant', 'fast')), 'constant(profile=fast)')
+        self.assertTrue({'constant', 'sklearn', 'smac'}.issubset(get_backend_names()))
+        self.assertEqual(get_backend_names(), sorted(get_backend_names()))
+
+    def test_sklearn_forest(self):
+        """ test that the multi-threaded forest predicts and marginalizes like smac's models """
+        backend = get_backend('sklearn', n_jobs=2)
+        model = ModelRegistry.get_forest(self.scen.cs, self.types, self.bounds, self.X, self.y, seed=1,
+                                         instance_features=self.scen.feature_array, backend=backend)
+        self.assertIsInstance(model, SklearnForestWithInstances)
+        self.assertEqual(len(model.rf.estimators_), 50)
+        mean, var = model.predict(self.X[:10])
+        self.assertEqual(mean.shape, (10, 1))
+        self.assertTrue((var > 0).all())
+        # Same seed, same trees, regardless of the number of threads
+        single = get_backend('sklearn', n_jobs=1).create(self.scen.cs, self.types, self.bounds, seed=1,
+                                                         instance_features=self.scen.feature_array)
+        single.train(self.X, self.y)
+        np.testing.assert_array_almost_equal(single.predict(self.X[:10])[0], mean)
+
+        marginal, _ = model.predict_marginalized_over_instances(self.configs)
+        expected = [model.predict(np.hstack([np.tile(c, (len(self.scen.feature_array), 1)),
+                                             self.scen.feature_array]))[0].mean() for c in self.configs]
+        np.testing.assert_array_almost_equal(marginal[:, 0], expected)
+
+    def test_profiles(self):
+        """ test that the fast profile trains fewer and shallower trees and models don't share fingerprints """
+        fast = ModelRegistry.get_forest(self.scen.cs, self.types, self.bounds, self.X, self.y, seed=1,
+                                        backend=get_backend('sklearn', 'fast'))
+        self.assertEqual(len(fast.rf.estimators_), 10)
+        self.assertLessEqual(max([tree.tree_.max_depth for tree in fast.rf.estimators_]), 10)
+        default = ModelRegistry.get_forest(self.scen.cs, self.types, self.bounds, self.X, self.y, seed=1,
+                                           backend=get_backend('sklearn'))
+        self.assertIsNot(default, fast)
+        smac_fast = get_backend('smac', 'fast').create(self.scen.cs, self.types, self.bounds, 1, num_trees=3)
+        self.assertEqual(smac_fast.rf_opts.num_trees, 3)
+        self.assertEqual(smac_fast.rf_opts.tree_opts.max_depth, 12)